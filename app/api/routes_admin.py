@@ -0,0 +1,18 @@
+import logging
+from fastapi import APIRouter,Depends,Query,Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.dependecies import get_api_key,get_db
+from app.services.provisioning import iter_lines,provision_users
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+logger = logging.getLogger(__name__)
+
+@router.post("/users/bulk", dependencies=[Depends(get_api_key)])
+async def bulk_provision_users(
+    request:Request,
+    input_format:str = Query("jsonl", alias="format", pattern="^(csv|jsonl)$"),
+    db:AsyncSession = Depends(get_db),
+):
+    # The body is streamed , a tenant file never has to fit in memory at once
+    report = await provision_users(db, iter_lines(request.stream()), input_format)
+    return report.as_dict()
@@ -1,12 +1,14 @@
 import logging
+import uuid
 from fastapi import APIRouter,HTTPException,status,Depends,Request
 from fastapi.responses import JSONResponse
-from app.core.security import create_access_tokens, create_refresh_tokens,verify_refresh_token,verify_password,hash_password,hash_refresh_token,verify_hashed_refresh_token
+from app.core.security import create_access_tokens, create_refresh_tokens,verify_refresh_token,hash_refresh_token
+from app.core.password_executor import password_executor
 from app.schemas.users_auth import UserCreate,UserLogin
 from app.core.dependecies import get_db
+from app.core.database import dialect_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select,update,delete
 from app.db.models.users import User
 from app.db.models.refresh_token import RefreshToken
 from datetime import datetime, timezone
@@ -15,31 +17,50 @@ from app.core.rate_limiter import login_rate_limiter , refresh_rate_limiter
 router = APIRouter(prefix="/auth",tags=["Auth"])
 logger = logging.getLogger(__name__)
 
+def parse_user_id(payload:dict) -> uuid.UUID:
+    # Token subjects are user UUIDs , anything else is treated like a bad token
+    try:
+        return uuid.UUID(payload["sub"])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token"
+        )
+
+async def store_refresh_token(db:AsyncSession , user_id , hashed_token:str , expires_at:datetime):
+    # One statement instead of select + insert / update , refresh_tokens.user_id is unique
+    stmt = dialect_insert(db, RefreshToken).values(
+        user_id=user_id,
+        token=hashed_token,
+        expires_at=expires_at,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RefreshToken.user_id],
+        set_={"token": stmt.excluded.token, "expires_at": stmt.excluded.expires_at},
+    )
+    await db.execute(stmt)
+
 @router.post("/signup")
 async def signup(user_input:UserCreate , db:AsyncSession = Depends(get_db)):
 
-    stmt = select(User).where(User.email == user_input.email)
-    result = await db.execute(stmt)
-    existing_user = result.scalar_one_or_none()
+    # CPU Based Operation , on the dedicated bcrypt pool
+    password_hash = await password_executor.hash(user_input.password)
 
-    if existing_user:
-        raise HTTPException(
-            status_code = status.HTTP_400_BAD_REQUEST,
-            detail = "User Already Exists"
+    # The unique index on users.email decides , no check-then-insert race
+    stmt = (
+        dialect_insert(db, User)
+        .values(
+            username = user_input.username,
+            email = user_input.email,
+            password_hash = password_hash
         )
-    # CPU Based Operation
-    password_hash = await run_in_threadpool(
-        hash_password, user_input.password
-    )
-    new_user = User(
-        username = user_input.username,
-        email = user_input.email,
-        password_hash = password_hash
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User.id)
     )
     try:
-        db.add(new_user)
+        result = await db.execute(stmt)
+        user_id = result.scalar_one_or_none()
         await db.commit()
-        await db.refresh(new_user)
     except Exception:
         await db.rollback()
         logger.error(
@@ -51,25 +72,31 @@ async def signup(user_input:UserCreate , db:AsyncSession = Depends(get_db)):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail = "Could not create user , please try again"
         )
+
+    if user_id is None:
+        raise HTTPException(
+            status_code = status.HTTP_400_BAD_REQUEST,
+            detail = "User Already Exists"
+        )
     
     return {
         "message":"User Created Successfully"
     }
 
 @router.post("/login")
-async def login(request:Request , user_input:UserLogin , db:AsyncSession = Depends(get_db) , _ = Depends(login_rate_limiter)):
+async def login(request:Request , user_input:UserLogin , db:AsyncSession = Depends(get_db) , rate_limit = Depends(login_rate_limiter)):
 
-    stmt = select(User).where(User.email == user_input.email)
+    # Only the two columns login needs , no full ORM object
+    stmt = select(User.id, User.password_hash).where(User.email == user_input.email)
     result = await db.execute(stmt)
-    db_user = result.scalar_one_or_none()
+    db_user = result.one_or_none()
 
     if not db_user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail = "Invalid credentials"
         )
-    password_valid = await run_in_threadpool(
-        verify_password,
+    password_valid = await password_executor.verify(
         user_input.password,
         db_user.password_hash,
     )
@@ -79,32 +106,14 @@ async def login(request:Request , user_input:UserLogin , db:AsyncSession = Depen
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail = "Invalid credentials"
         )
-    
+
     access_token = create_access_tokens(str(db_user.id))
     refresh_token,expires_at = create_refresh_tokens(str(db_user.id))
-    
-    hashed_refresh_token = await run_in_threadpool(
-        hash_refresh_token, refresh_token
-    )
-    stmt = select(RefreshToken).where(
-        RefreshToken.user_id == db_user.id
-    )
-    result = await db.execute(stmt)
-    existing_token = result.scalar_one_or_none()
-    
+    # SHA-256 of a short token , cheaper inline than a threadpool hop
+    hashed_refresh_token = hash_refresh_token(refresh_token)
+
     try:
-        if existing_token:
-            existing_token.token = hashed_refresh_token
-            existing_token.expires_at = expires_at
-        else :
-            db.add(
-                RefreshToken(
-                    user_id=db_user.id,
-                    token=hashed_refresh_token,
-                    expires_at=expires_at,
-                )
-            )
-            
+        await store_refresh_token(db, db_user.id, hashed_refresh_token, expires_at)
         await db.commit()
     except Exception:
         await db.rollback()
@@ -124,6 +133,7 @@ async def login(request:Request , user_input:UserLogin , db:AsyncSession = Depen
             "token_type" : "bearer"
         }
     )
+    rate_limit.apply(response)
     max_age = int((expires_at - datetime.now(timezone.utc)).total_seconds())
     response.set_cookie(
         key = "refresh_token",
@@ -138,7 +148,7 @@ async def login(request:Request , user_input:UserLogin , db:AsyncSession = Depen
 
 
 @router.post("/refresh")
-async def refresh_access_tokens(request:Request, db:AsyncSession = Depends(get_db), _= Depends(refresh_rate_limiter)):
+async def refresh_access_tokens(request:Request, db:AsyncSession = Depends(get_db), rate_limit = Depends(refresh_rate_limiter)):
     refresh_token = request.cookies.get("refresh_token")
     if not refresh_token:
      raise HTTPException(
@@ -153,84 +163,62 @@ async def refresh_access_tokens(request:Request, db:AsyncSession = Depends(get_d
             detail = "Invalid or expired refresh token"
         )
     
-    user_id = payload["sub"]
+    user_id = parse_user_id(payload)
     # refresh_rate_limiter(user_id)
 
+    # ROTATE TOKENS
+    new_access_token = create_access_tokens(str(user_id))
+    new_refresh_token, expires_at = create_refresh_tokens(str(user_id))
+
     try:
-        # BEGIN TRANSACTION
+        # Compare and swap in one statement , no row lock is held across Python code.
+        # Of several requests presenting the same token exactly one matches the old hash.
         stmt = (
-            select(RefreshToken)
-            .where(RefreshToken.user_id == user_id)
-            .with_for_update()
-            # It does row_locking
-        )
-
-        result = await db.execute(stmt)
-        db_token = result.scalar_one_or_none()
-
-        if not db_token:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Refresh token not found. Please login again",
+            update(RefreshToken)
+            .where(
+                RefreshToken.user_id == user_id,
+                RefreshToken.token == hash_refresh_token(refresh_token),
+                RefreshToken.expires_at > datetime.now(timezone.utc),
             )
-        
-        is_valid_token = await run_in_threadpool(
-            verify_hashed_refresh_token,
-            refresh_token,
-            db_token.token
-        )
-
-        if not is_valid_token:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid refresh token",
-            )
-
-        if db_token.expires_at < datetime.now(timezone.utc):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Refresh token expired",
-            )
-
-        # ROTATE TOKENS
-        new_access_token = create_access_tokens(user_id)
-        new_refresh_token, expires_at = create_refresh_tokens(user_id)
-        hash_new_token = await run_in_threadpool(
-            hash_refresh_token,
-            new_refresh_token
+            .values(token=hash_refresh_token(new_refresh_token), expires_at=expires_at)
+            .returning(RefreshToken.id)
+            .execution_options(synchronize_session=False)
         )
-        db_token.token = hash_new_token
-        db_token.expires_at = expires_at
-
+        result = await db.execute(stmt)
+        rotated = result.scalar_one_or_none()
         await db.commit()
 
-        logger.info(
-            "Tokens refreshed successfully",
-            extra={"user_id": user_id}
-        )
-
-    except HTTPException:
-        await db.rollback()
-        raise
-
     except Exception:
         await db.rollback()
         logger.error(
             "Refresh token rotation failed",
             exc_info=True,
-            extra={"user_id": user_id},
+            extra={"user_id": str(user_id)},
         )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Could not refresh tokens",
         )
 
+    if rotated is None:
+        # Unknown , already rotated or expired token
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token. Please login again",
+        )
+
+    logger.info(
+        "Tokens refreshed successfully",
+        extra={"user_id": str(user_id)}
+    )
+
     response = JSONResponse(
         content={
             "access_token": new_access_token,
             "token_type": "bearer",
         }
     )
+    rate_limit.apply(response)
 
     max_age = int((expires_at - datetime.now(timezone.utc)).total_seconds())
 
@@ -257,35 +245,36 @@ async def logout(
         payload = verify_refresh_token(refresh_token)
         
         if payload:
-            user_id = payload["sub"]
+            user_id = parse_user_id(payload)
             
             try:
-                # Find and delete refresh token
-                stmt = select(RefreshToken).where(
-                    RefreshToken.user_id == user_id
+                # Find and delete refresh token in one statement
+                stmt = (
+                    delete(RefreshToken)
+                    .where(RefreshToken.user_id == user_id)
+                    .returning(RefreshToken.id)
+                    .execution_options(synchronize_session=False)
                 )
                 result = await db.execute(stmt)
-                db_token = result.scalar_one_or_none()
+                deleted = result.scalar_one_or_none()
+                await db.commit()
                 
-                if db_token:
-                    await db.delete(db_token)
-                    await db.commit()
-                    
+                if deleted:
                     logger.info(
                         "User logged out - token deleted",
-                        extra={"user_id": user_id}
+                        extra={"user_id": str(user_id)}
                     )
                 else:
                     logger.info(
                         "User logged out - token already gone",
-                        extra={"user_id": user_id}
+                        extra={"user_id": str(user_id)}
                     )
                     
             except Exception:
                 await db.rollback()
                 logger.exception(
                     "Logout DB operation failed - continuing anyway",
-                    extra={"user_id": user_id}
+                    extra={"user_id": str(user_id)}
                 )
                 # Don't raise - still clear cookie and return success
         else:
@@ -1,22 +1,31 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy import text
-from sqlalchemy.orm import Session
-from app.core.dependecies import get_db, get_redis_client, get_model
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+from app.services.health import health_monitor
 
 router = APIRouter(prefix="/health", tags=["Health"])
 
-@router.get("")
-def health_check(db: Session = Depends(get_db)):
-    # DB check
-    db.execute(text("SELECT 1"))
+# Every endpoint answers from the background snapshot , no probe touches
+# Postgres , Redis or the threadpool on the request path.
+
+def _snapshot_response():
+    snapshot = health_monitor.snapshot or {"status": "starting"}
+    if not health_monitor.is_ready():
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={**snapshot, "status": "stale" if snapshot["status"] == "ok" else snapshot["status"]}
+        )
+    return snapshot
 
-    # Redis check
-    redis = get_redis_client()
-    redis.ping()
+@router.get("")
+async def health_check():
+    return _snapshot_response()
 
-    # Model check
-    _ = get_model()
+@router.get("/live")
+async def liveness_check():
+    # The event loop answered , that is all liveness means. Dependencies belong to readiness
+    return {"status": "alive"}
 
-    return {
-        "status": "ok"
-    }
+@router.get("/ready")
+async def readiness_check():
+    # Not ready until every dependency passed its last probe and the model is warmed up
+    return _snapshot_response()
@@ -1,8 +1,9 @@
-from fastapi import APIRouter,HTTPException,Depends,status
-from app.core.dependecies import get_current_user,get_api_key
-from app.schemas.model_schema import ModelInputSchema
-from app.services.model_service import predict_flower
-from app.core.rate_limiter import predict_rate_limiter
+from fastapi import APIRouter,HTTPException,Depends,Response,status
+from app.core.dependecies import get_current_user,get_api_key,get_redis_client
+from app.schemas.model_schema import ModelInputSchema,ModelBatchInputSchema
+from app.services.model_service import predict_flower,predict_flowers_batch
+from app.core.rate_limiter import predict_rate_limiter,predict_batch_rate_limiter
+from redis.asyncio import Redis
 import logging
 
 logger = logging.getLogger("Prediction")
@@ -20,3 +21,20 @@ async def predict(data:ModelInputSchema , user = Depends(get_current_user) , _=D
             status_code= status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail = "Error Occured During Prediction"
         )
+
+@router.post("/predict/batch")
+async def predict_batch(data:ModelBatchInputSchema , response:Response , user = Depends(get_current_user) , redis:Redis = Depends(get_redis_client)):
+    # Rate limit on rows , not on HTTP calls
+    rate_limit = await predict_batch_rate_limiter(user,len(data.rows),redis)
+    rate_limit.apply(response)
+    try :
+        results = await predict_flowers_batch([row.model_dump() for row in data.rows])
+        return {
+            "predictions": [result["prediction"] for result in results]
+        }
+    except Exception as e:
+        logger.error(f"Batch prediction error: {e}")
+        raise HTTPException(
+            status_code= status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail = "Error Occured During Prediction"
+        )
\ No newline at end of file
@@ -0,0 +1,44 @@
+import time
+from collections import OrderedDict
+from app.core.metrics import CACHE_EVICTIONS
+
+
+class TTLCache:
+    """
+    Bounded in-process LRU cache with a TTL per entry.
+    Only touched from the event loop thread , so no locking is needed.
+    """
+
+    def __init__(self, max_entries:int , name:str = "memory"):
+        self.max_entries = max_entries
+        self.name = name
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl:float):
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            CACHE_EVICTIONS.labels(tier=self.name).inc()
+
+    def clear(self):
+        self._entries.clear()
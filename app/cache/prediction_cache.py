@@ -0,0 +1,60 @@
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS,labelled
+from app.cache.memory_cache import TTLCache
+from app.cache import redis_cache
+
+# Lookup order in "tiered" mode : memory -> redis -> model.
+# A redis hit fills memory with the key's remaining redis TTL so both tiers expire together.
+# "redis" mode skips the memory tier entirely , useful to compare hit ratios and latency.
+
+memory_cache = TTLCache(max_entries=settings.MEMORY_CACHE_MAX_ENTRIES)
+
+
+def _tiered() -> bool:
+    return settings.PREDICTION_CACHE_BACKEND == "tiered"
+
+def _record(tier:str , hits:int , total:int):
+    if hits:
+        labelled(CACHE_REQUESTS, tier, "hit").inc(hits)
+    if total - hits:
+        labelled(CACHE_REQUESTS, tier, "miss").inc(total - hits)
+
+
+async def get_cached_predictions(keys:list):
+    results = [None] * len(keys)
+    pending = list(range(len(keys)))
+
+    if _tiered():
+        for i in pending:
+            results[i] = memory_cache.get(keys[i])
+        pending = [i for i in pending if results[i] is None]
+        _record("memory", len(keys) - len(pending), len(keys))
+        if not pending:
+            return results
+
+        found = await redis_cache.get_cached_predictions_with_ttl([keys[i] for i in pending])
+        for i,(value,ttl) in zip(pending,found):
+            if value is not None:
+                results[i] = value
+                memory_cache.set(keys[i], value, ttl)
+    else:
+        found = await redis_cache.get_cached_predictions([keys[i] for i in pending])
+        for i,value in zip(pending,found):
+            results[i] = value
+
+    _record("redis", sum(results[i] is not None for i in pending), len(pending))
+    return results
+
+async def get_cached_prediction(key:str):
+    return (await get_cached_predictions([key]))[0]
+
+async def set_cached_predictions(items:dict , ttl:int = settings.PREDICTION_CACHE_TTL):
+    if _tiered():
+        for key,value in items.items():
+            memory_cache.set(key, value, ttl)
+    await redis_cache.set_cached_predictions(items, ttl)
+
+async def set_cached_prediction(key:str , value:dict , ttl:int = settings.PREDICTION_CACHE_TTL):
+    if _tiered():
+        memory_cache.set(key, value, ttl)
+    await redis_cache.set_cached_prediction(key, value, ttl)
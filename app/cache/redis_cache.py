@@ -1,19 +1,53 @@
 import json
+import logging
 from app.core.dependecies  import get_redis_client
 
+logger = logging.getLogger(__name__)
 
-async def get_cached_prediction(key:str):
-    try:
-        redis_client = get_redis_client()
-        value = await redis_client.get(key)
-        return json.loads(value) if value else None
-    except Exception as e:
-        print(f"Error retrieving cached prediction: {e}")
-        return None
 
 async def set_cached_prediction(key:str,value:dict , ttl:int = 300):
     try:
         redis_client = get_redis_client()
         await redis_client.setex(key,ttl,json.dumps(value))
-    except Exception as e:
-        print(f"Error setting cached prediction: {e}")
\ No newline at end of file
+    except Exception:
+        logger.warning("Error setting cached prediction", exc_info=True)
+
+async def get_cached_predictions(keys:list):
+    # Single MGET round trip for the whole batch , misses come back as None
+    try:
+        redis_client = get_redis_client()
+        values = await redis_client.mget(keys)
+        return [json.loads(value) if value else None for value in values]
+    except Exception:
+        logger.warning("Error retrieving cached predictions", exc_info=True)
+        return [None] * len(keys)
+
+async def get_cached_predictions_with_ttl(keys:list):
+    # GET and PTTL for every key in one pipelined round trip -> [(value , ttl_seconds)]
+    try:
+        redis_client = get_redis_client()
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.get(key)
+                pipe.pttl(key)
+            replies = await pipe.execute()
+        return [
+            (json.loads(value), max(ttl, 0) / 1000) if value else (None, 0)
+            for value,ttl in zip(replies[::2], replies[1::2])
+        ]
+    except Exception:
+        logger.warning("Error retrieving cached predictions with TTL", exc_info=True)
+        return [(None, 0)] * len(keys)
+
+async def set_cached_predictions(items:dict , ttl:int = 300):
+    if not items:
+        return
+    try:
+        redis_client = get_redis_client()
+        # Non transactional pipeline -> all SETEX commands go out in one round trip
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key,value in items.items():
+                pipe.setex(key,ttl,json.dumps(value))
+            await pipe.execute()
+    except Exception:
+        logger.warning("Error setting cached predictions", exc_info=True)
\ No newline at end of file
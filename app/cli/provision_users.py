@@ -0,0 +1,50 @@
+"""
+Bulk user provisioning from a CSV (username,email,password header) or JSONL file.
+
+    python -m app.cli.provision_users users.csv [--format csv] [--batch-size 5000] [--report report.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+from app.core.database import AsyncSessionLocal,engine
+from app.services.provisioning import INPUT_FORMATS,provision_users,shutdown_hash_pool
+
+
+async def read_lines(path:str):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            yield line.rstrip("\r\n")
+
+async def run(args):
+    try:
+        async with AsyncSessionLocal() as db:
+            report = await provision_users(db, read_lines(args.path), args.format, args.batch_size)
+    finally:
+        shutdown_hash_pool()
+        await engine.dispose()
+
+    print(
+        f"created {report.created} , duplicates {len(report.duplicates)} , invalid {len(report.invalid)}"
+        f" in {report.seconds:.1f}s ({report.users_per_sec:.1f} users/sec)"
+    )
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report.as_dict(), f, indent=2)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=INPUT_FORMATS, help="defaults to the file extension")
+    parser.add_argument("--batch-size", type=int)
+    parser.add_argument("--report", help="write duplicates and invalid rows to this JSON file")
+    args = parser.parse_args()
+    args.format = args.format or os.path.splitext(args.path)[1].lstrip(".").lower()
+    if args.format not in INPUT_FORMATS:
+        parser.error(f"unknown format {args.format!r} , pass --format")
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
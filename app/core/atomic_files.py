@@ -0,0 +1,25 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_directory(path:str , marker:str):
+    """
+    Yields a temporary directory next to `path` , renamed to `path` once the
+    block finishes. Readers (other workers) never see a half written directory.
+    When another process renamed a complete directory , one containing
+    `marker` , into place first , that one is kept.
+    """
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(dir=parent)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except OSError:
+        if not os.path.exists(os.path.join(path, marker)):
+            raise
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,9 +12,105 @@ class Settings:
     JWT_REFRESH_SECRET_KEY = os.environ["JWT_REFRESH_SECRET_KEY"]
 
     JWT_ALGORITHM = "HS256"
+    # Verified access token cache (entries) , 0 disables it
+    JWT_CACHE_MAX_ENTRIES = int(os.getenv("JWT_CACHE_MAX_ENTRIES", 10000))
+
+    # Password hashing -> bcrypt cost factor and its dedicated pool ("thread" or "process")
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+    PASSWORD_EXECUTOR_MODE = os.getenv("PASSWORD_EXECUTOR_MODE", "thread")
+    PASSWORD_EXECUTOR_WORKERS = int(os.getenv("PASSWORD_EXECUTOR_WORKERS", os.cpu_count() or 1))
+    # Jobs allowed to wait for a worker , more are rejected with 503
+    PASSWORD_QUEUE_MAX = int(os.getenv("PASSWORD_QUEUE_MAX", 32))
+    # Expected queue wait above this is rejected with 429
+    PASSWORD_MAX_WAIT_MS = float(os.getenv("PASSWORD_MAX_WAIT_MS", 2000))
+    # Bulk user provisioning -> users per COPY batch and bcrypt processes
+    PROVISION_BATCH_SIZE = int(os.getenv("PROVISION_BATCH_SIZE", 5000))
+    PROVISION_HASH_WORKERS = int(os.getenv("PROVISION_HASH_WORKERS", os.cpu_count() or 1))
+
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+    REDIS_POOL_MAX_CONNECTIONS = int(os.getenv("REDIS_POOL_MAX_CONNECTIONS", 50))
+    # Seconds to wait for a free pooled connection before failing
+    REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", 2))
+    REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 2))
+    REDIS_SOCKET_CONNECT_TIMEOUT = float(os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT", 2))
+    REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", 30))
     MLFLOW_TRACKING_URI = os.environ["MLFLOW_TRACKING_URI"]
+    # Per HTTP call limits for registry and artifact requests , mlflow's own defaults
+    # (7 retries with backoff , 120 s timeout) hold a cold start for minutes when MLflow is down
+    MLFLOW_REQUEST_TIMEOUT = int(os.getenv("MLFLOW_REQUEST_TIMEOUT", 10))
+    MLFLOW_REQUEST_MAX_RETRIES = int(os.getenv("MLFLOW_REQUEST_MAX_RETRIES", 1))
     MODEL_NAME = "IrisRandomForest"
     DATABASE_URL = os.environ["DATABASE_URL"]
+    DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", 10))
+    DATABASE_MAX_OVERFLOW = int(os.getenv("DATABASE_MAX_OVERFLOW", 20))
+
+    # "pyfunc" -> mlflow pyfunc wrapper , "native" -> flattened NumPy forest
+    INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "pyfunc")
+    # "thread" , "process" or "inline"
+    INFERENCE_EXECUTOR_MODE = os.getenv("INFERENCE_EXECUTOR_MODE", "thread")
+    INFERENCE_EXECUTOR_WORKERS = int(os.getenv("INFERENCE_EXECUTOR_WORKERS", os.cpu_count() or 1))
+    # Native engine only -> serve the forest from memory mapped .npy files shared
+    # by all uvicorn workers (WEB_CONCURRENCY) and inference processes
+    MODEL_MMAP_ARRAYS = os.getenv("MODEL_MMAP_ARRAYS", "false").lower() == "true"
+
+    # Local directory for per version model artifacts
+    MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", os.path.join(tempfile.gettempdir(), "iris-model-cache"))
+
+    # Load and warm the model in lifespan instead of on the first request
+    MODEL_EAGER_LOAD = os.getenv("MODEL_EAGER_LOAD", "true").lower() == "true"
+    MODEL_WARMUP_ITERATIONS = int(os.getenv("MODEL_WARMUP_ITERATIONS", 3))
+    # Seconds between warmup retries while a failed startup warmup keeps readiness down
+    MODEL_WARMUP_RETRY_INTERVAL = float(os.getenv("MODEL_WARMUP_RETRY_INTERVAL", 10))
+    # Seconds between registry polls for a new Production version , 0 disables hot reload
+    MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", 60))
+
+    # Candidate model -> registry stage loaded next to Production , empty disables it
+    MODEL_CANDIDATE_STAGE = os.getenv("MODEL_CANDIDATE_STAGE", "Staging")
+    # Share of /predict requests answered by the candidate instead of Production
+    MODEL_CANARY_FRACTION = float(os.getenv("MODEL_CANARY_FRACTION", 0))
+    # Mirror Production requests to the candidate off the response path
+    MODEL_SHADOW_ENABLED = os.getenv("MODEL_SHADOW_ENABLED", "false").lower() == "true"
+    MODEL_SHADOW_QUEUE_SIZE = int(os.getenv("MODEL_SHADOW_QUEUE_SIZE", 1000))
+
+    # Background dependency probes behind /health , seconds
+    HEALTH_CHECK_INTERVAL = float(os.getenv("HEALTH_CHECK_INTERVAL", 5))
+    HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", 1))
+
+    # Logging -> JSON lines , written to the log file by a background listener thread
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    # Records waiting for the listener , more are dropped instead of blocking requests
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+    # Seconds the listener lets records pile up before draining them , one wake up per burst
+    LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", 0.05))
+    # Share of successful (INFO , status < 400) records kept from the sampled loggers
+    LOG_SUCCESS_SAMPLE_RATE = float(os.getenv("LOG_SUCCESS_SAMPLE_RATE", 1.0))
+    LOG_SAMPLED_LOGGERS = os.getenv("LOG_SAMPLED_LOGGERS", "response_logger").split(",")
+
+    # Precomputed decision table over a quantized feature grid , built while a model
+    # version loads. Cells crossed by a decision boundary go to the model , with
+    # STEP 0.25 an iris forest agrees on ~99.9% of random points.
+    DECISION_TABLE_ENABLED = os.getenv("DECISION_TABLE_ENABLED", "false").lower() == "true"
+    DECISION_TABLE_LOW = float(os.getenv("DECISION_TABLE_LOW", 0.0))
+    DECISION_TABLE_HIGH = float(os.getenv("DECISION_TABLE_HIGH", 8.0))
+    DECISION_TABLE_STEP = float(os.getenv("DECISION_TABLE_STEP", 0.25))
+    DECISION_TABLE_MIN_AGREEMENT = float(os.getenv("DECISION_TABLE_MIN_AGREEMENT", 0.995))
+    DECISION_TABLE_AGREEMENT_SAMPLES = int(os.getenv("DECISION_TABLE_AGREEMENT_SAMPLES", 100000))
+
+    # Prediction Cache -> "tiered" (memory + redis) or "redis"
+    PREDICTION_CACHE_BACKEND = os.getenv("PREDICTION_CACHE_BACKEND", "tiered")
+    PREDICTION_CACHE_TTL = int(os.getenv("PREDICTION_CACHE_TTL", 300))
+    MEMORY_CACHE_MAX_ENTRIES = int(os.getenv("MEMORY_CACHE_MAX_ENTRIES", 10000))
+    # "binary" -> packed features , "json" -> JSON + SHA-256 hex digest
+    CACHE_KEY_SCHEME = os.getenv("CACHE_KEY_SCHEME", "binary")
+    # Snap features to this step (cm) before building binary keys , 0 disables
+    CACHE_KEY_QUANTUM = float(os.getenv("CACHE_KEY_QUANTUM", 0))
+
+    # Batch Prediction
+    PREDICT_BATCH_MAX_ROWS = int(os.getenv("PREDICT_BATCH_MAX_ROWS", 1000))
+
+    # Micro Batching of concurrent /predict calls
+    PREDICT_MICRO_BATCHING = os.getenv("PREDICT_MICRO_BATCHING", "false").lower() == "true"
+    PREDICT_MICRO_BATCH_WINDOW_MS = float(os.getenv("PREDICT_MICRO_BATCH_WINDOW_MS", 2))
+    PREDICT_MICRO_BATCH_MAX_SIZE = int(os.getenv("PREDICT_MICRO_BATCH_MAX_SIZE", 64))
 
 settings = Settings()
\ No newline at end of file
@@ -3,14 +3,31 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     AsyncSession
 )
+import time
+from sqlalchemy.dialects import postgresql,sqlite
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKOUT_WAIT
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    # The pool events only fire once a connection is handed out , the wait before
+    # that (pool exhausted , or a new connection being opened) is timed here
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
 
 engine = create_async_engine(
     settings.DATABASE_URL,
+    poolclass=InstrumentedAsyncPool,
     pool_pre_ping=True,
-    pool_size = 10,
-    max_overflow = 20
+    pool_size = settings.DATABASE_POOL_SIZE,
+    max_overflow = settings.DATABASE_MAX_OVERFLOW
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -22,3 +39,13 @@ AsyncSessionLocal = async_sessionmaker(
 
 class Base(DeclarativeBase):
     pass
+
+
+def dialect_insert(db:AsyncSession , model):
+    """
+    INSERT construct with ON CONFLICT support for the database behind `db`.
+    PostgreSQL in production , SQLite for local runs and load tests.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
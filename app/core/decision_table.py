@@ -0,0 +1,186 @@
+import itertools
+import json
+import logging
+import os
+import time
+from functools import partial
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from app.core.atomic_files import atomic_directory
+from app.core.config import settings
+from app.core.metrics import DECISION_TABLE_AGREEMENT
+from app.core.inference_executor import predict_matrix
+from app.core.model_loader import version_dir
+
+logger = logging.getLogger(__name__)
+
+N_FEATURES = 4
+
+
+class DecisionTable:
+    """
+    Model output precomputed over a regular 4-D grid of iris measurements.
+
+    Cell i of a feature covers the values from `low + i * step` up to the next
+    grid point. A cell holds a class only when the model predicts it on all 16
+    corners of the cell , cells crossed by a decision boundary hold AMBIGUOUS.
+    A lookup is an index computation into a uint8 array , rows in ambiguous
+    cells or outside the grid are reported through the returned mask so the
+    caller can send them to the real model.
+    """
+
+    AMBIGUOUS = 255
+
+    def __init__(self, table:np.ndarray , low:float , step:float):
+        self.table = table
+        self.low = low
+        self.step = step
+        self.size = table.shape[0]
+
+    @staticmethod
+    def grid_size(low:float , high:float , step:float) -> int:
+        return int(round((high - low) / step)) + 1
+
+    @classmethod
+    def build(cls, predict , low:float , high:float , step:float , batch_size:int = 65536):
+        """
+        Evaluates `predict(matrix) -> labels` on every grid point in batches ,
+        then keeps the label of every cell whose corners all agree.
+        Labels must be integers in 0..254.
+        """
+        size = cls.grid_size(low, high, step)
+        points = np.empty(size ** N_FEATURES, dtype=np.uint8)
+
+        for start in range(0, points.size, batch_size):
+            cells = np.arange(start, min(start + batch_size, points.size))
+            coordinates = np.stack(np.unravel_index(cells, (size,) * N_FEATURES), axis=1)
+            labels = np.asarray(predict((low + coordinates * step).astype(np.float32)))
+            if labels.min() < 0 or labels.max() >= cls.AMBIGUOUS:
+                raise ValueError("Decision table only supports class labels in 0..254")
+            points[start:start + len(cells)] = labels
+
+        points = points.reshape((size,) * N_FEATURES)
+        # Lowest and highest label over the 16 corners , equal only when all corners agree
+        lowest = highest = None
+        for offset in itertools.product((0, 1), repeat=N_FEATURES):
+            corner = points[tuple(slice(o, o + size - 1) for o in offset)]
+            lowest = corner.copy() if lowest is None else np.minimum(lowest, corner)
+            highest = corner.copy() if highest is None else np.maximum(highest, corner)
+        return cls(np.where(lowest == highest, lowest, cls.AMBIGUOUS).astype(np.uint8), low, step)
+
+    def lookup(self, matrix:np.ndarray):
+        indexes = np.floor((np.asarray(matrix, dtype=np.float64) - self.low) / self.step)
+        in_grid = np.all((indexes >= 0) & (indexes < self.size), axis=1)
+
+        predictions = np.zeros(len(indexes), dtype=np.int64)
+        if in_grid.any():
+            cells = indexes[in_grid].astype(np.intp)
+            labels = self.table[tuple(cells.T)]
+            predictions[in_grid] = labels
+            in_grid[in_grid] = labels != self.AMBIGUOUS
+        return predictions, in_grid
+
+    def agreement(self, predict , high:float , samples:int , seed:int = 0):
+        """
+        Share of random points where the served answer matches the model ,
+        and the share the table answers itself. Rows sent to the model agree
+        by construction.
+        """
+        rng = np.random.default_rng(seed)
+        matrix = rng.uniform(self.low, high, size=(samples, N_FEATURES)).astype(np.float32)
+        predictions, in_table = self.lookup(matrix)
+        expected = np.asarray(predict(matrix))
+        served = np.where(in_table, predictions, expected)
+        return float(np.mean(served == expected)), float(np.mean(in_table))
+
+    def save(self, path:str , meta:dict):
+        # Directory with table.npy and meta.json , workers never see a half written table
+        with atomic_directory(path, "meta.json") as tmp_path:
+            np.save(os.path.join(tmp_path, "table.npy"), self.table)
+            with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+                json.dump(meta, f)
+
+    @classmethod
+    def open(cls, path:str , low:float , step:float):
+        # Read only memory map -> every worker shares the same page cache pages
+        return cls(np.load(os.path.join(path, "table.npy"), mmap_mode="r"), low, step)
+
+
+def table_path(model_version:str) -> str:
+    # Next to the model version's artifacts , dropped together with them
+    name = (
+        f"decision-table-{settings.DECISION_TABLE_LOW:g}"
+        f"-{settings.DECISION_TABLE_HIGH:g}-{settings.DECISION_TABLE_STEP:g}"
+    )
+    return os.path.join(version_dir(model_version), name)
+
+def build_decision_table(predict , model_version:str):
+    """
+    Opens the table for this model version from disk or builds it.
+    Returns None when the table disagrees with the model too often.
+    """
+    low = settings.DECISION_TABLE_LOW
+    high = settings.DECISION_TABLE_HIGH
+    step = settings.DECISION_TABLE_STEP
+    path = table_path(model_version)
+
+    if os.path.exists(os.path.join(path, "meta.json")):
+        table = DecisionTable.open(path, low, step)
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        logger.info("Decision table opened", extra={"path": path})
+    else:
+        started = time.perf_counter()
+        table = DecisionTable.build(predict, low, high, step)
+        agreement, coverage = table.agreement(predict, high, settings.DECISION_TABLE_AGREEMENT_SAMPLES)
+        meta = {"model_version": model_version, "agreement": agreement, "coverage": coverage}
+
+        table.save(path, meta)
+        table = DecisionTable.open(path, low, step)
+        logger.info(
+            "Decision table built",
+            extra={
+                "path": path,
+                "cells": table.table.size,
+                "seconds": round(time.perf_counter() - started, 2),
+            }
+        )
+
+    agreement = meta["agreement"]
+    DECISION_TABLE_AGREEMENT.set(agreement)
+    if agreement < settings.DECISION_TABLE_MIN_AGREEMENT:
+        logger.warning(
+            "Decision table agreement %.4f below %.4f , serving from the model",
+            agreement,
+            settings.DECISION_TABLE_MIN_AGREEMENT,
+        )
+        return None
+
+    logger.info("Decision table active", extra={"agreement": agreement, "coverage": meta["coverage"]})
+    return table
+
+
+# Tables per model version (Production , candidate and the previous version
+# for requests still in flight) , the oldest goes first
+MAX_ACTIVE_TABLES = 3
+_active_tables = {}
+
+async def prepare_decision_table(handle):
+    """
+    Opens or builds the table for the model version in `handle`. Runs while
+    the model loads (startup warmup , hot reload , candidate load) , never on
+    the request path.
+    """
+    if not settings.DECISION_TABLE_ENABLED or handle.version in _active_tables:
+        return
+    _active_tables[handle.version] = await run_in_threadpool(
+        build_decision_table,
+        partial(predict_matrix, handle.model),
+        handle.version,
+    )
+    while len(_active_tables) > MAX_ACTIVE_TABLES:
+        _active_tables.pop(next(iter(_active_tables)))
+
+def get_decision_table(handle):
+    # None when the mode is off , the table was refused or the version was never prepared
+    return _active_tables.get(handle.version)
@@ -1,20 +1,19 @@
 import logging
-import os
 from fastapi import Header,HTTPException,status,Depends,Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.core.config import settings
-from app.core.security import verify_access_token , verify_refresh_token
+from app.core.security import verify_access_token_cached , verify_refresh_token
 from app.core.database import AsyncSessionLocal
 from typing import AsyncGenerator
 from dotenv import load_dotenv
 from sqlalchemy.ext.asyncio import AsyncSession
 from redis.asyncio import Redis
-from app.core.model_loader import load_model
+from app.core.redis_pool import get_redis
+from app.core.request_timing import timed_stage
 
 
 load_dotenv()
 logger = logging.getLogger(__name__)
-REDIS_URL = os.getenv("REDIS_URL")
 security = HTTPBearer()
 
 def get_api_key(api_key:str = Header(...)):
@@ -32,11 +31,14 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
-def get_current_user(
+async def get_current_user(
         credentials:HTTPAuthorizationCredentials = Depends(security)
 ):
+    # async so the verified token cache is only touched from the event loop ,
+    # a cache hit is cheaper than the threadpool hop a sync dependency costs
     token = credentials.credentials
-    payload = verify_access_token(token)
+    with timed_stage("auth"):
+        payload = verify_access_token_cached(token)
     if payload is None:
         raise HTTPException(
             status_code = status.HTTP_401_UNAUTHORIZED,
@@ -46,24 +48,15 @@ def get_current_user(
     return payload["sub"]
 
 def get_redis_client() -> Redis:
+    # Shared client backed by the application wide pool created in lifespan
     try:
-        return Redis.from_url(
-            REDIS_URL,
-            decode_responses=True,
-            socket_timeout=2,
-            socket_connect_timeout=2,
-        )
+        return get_redis()
     except Exception:
         logger.critical("Redis connection failed", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Service Temporarily Unavailable",
         )
-#  Model Related Dependencies
-# Prefer Lazy Loading to avoid startup delays
-def get_model():
-    return load_model()
-
 
 def get_refresh_user_id(request: Request) -> str:
     # print("Cookies:", request.cookies) 
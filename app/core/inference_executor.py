@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor,ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pandas as pd
+from app.core.config import settings
+from app.core.model_loader import get_model_handle,load_model_version
+from app.schemas.model_schema import FEATURE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_MODES = ("thread", "process", "inline")
+
+
+def predict_matrix(model , matrix:np.ndarray) -> np.ndarray:
+    # The native engine takes the float matrix as is , pyfunc needs a DataFrame for schema enforcement
+    if settings.INFERENCE_ENGINE != "native":
+        matrix = pd.DataFrame(matrix.astype(np.float64), columns=FEATURE_COLUMNS)
+    return np.asarray(model.predict(matrix), dtype=np.int64)
+
+# Process worker side , every worker tries to load the Production model once when it starts.
+# A failed preload is not fatal (it would break the whole pool) , the worker loads the
+# requested version from the local artifact cache on first use instead , same as after
+# a hot reload , and keeps the previous one for requests still in flight.
+# Room for Production , a candidate and the version being replaced , least recently used goes first.
+WORKER_MAX_VERSIONS = 3
+_worker_models = {}
+
+def _init_worker():
+    try:
+        handle = get_model_handle()
+    except Exception:
+        logger.error("Inference worker could not preload the model , loading on first use", exc_info=True)
+        return
+    _worker_models[handle.version] = handle.model
+
+def _worker_predict(matrix:np.ndarray , version:str) -> np.ndarray:
+    model = _worker_models.pop(version, None)
+    if model is not None:
+        _worker_models[version] = model
+    else:
+        model = load_model_version(version).model
+        _worker_models[version] = model
+        while len(_worker_models) > WORKER_MAX_VERSIONS:
+            _worker_models.pop(next(iter(_worker_models)))
+    return predict_matrix(model, matrix)
+
+
+class InferenceExecutor:
+    """
+    Runs model.predict off the event loop.
+
+    thread  -> dedicated thread pool , separate from the AnyIO pool used by bcrypt and sync endpoints
+    process -> worker processes that each hold their own model , requests travel as float32 arrays
+    inline  -> directly on the event loop , only sensible for very fast engines
+    """
+
+    def __init__(self, mode:str , workers:int):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown inference executor mode: {mode}")
+        self.mode = mode
+        self.workers = workers
+        self._pool = None
+
+    def start(self):
+        if self._pool is not None or self.mode == "inline":
+            return
+
+        if self.mode == "process":
+            # spawn instead of fork , the parent already runs an event loop and threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="inference",
+            )
+        logger.info(
+            "Inference executor started",
+            extra={"mode": self.mode, "workers": self.workers}
+        )
+
+    def shutdown(self):
+        if self._pool is None:
+            return
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._pool = None
+        logger.info("Inference executor stopped", extra={"mode": self.mode})
+
+    async def predict(self, matrix:np.ndarray , handle = None) -> np.ndarray:
+        """
+        Predicts with `handle` (a ModelHandle) , or the current Production model.
+        """
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        handle = handle or get_model_handle()
+
+        if self.mode == "inline":
+            return predict_matrix(handle.model, matrix)
+
+        self.start()
+        loop = asyncio.get_running_loop()
+        if self.mode == "process":
+            pool = self._pool
+            try:
+                return await loop.run_in_executor(pool, _worker_predict, matrix, handle.version)
+            except BrokenProcessPool:
+                # A worker died (OOM kill , crash) , the pool refuses all work from now on
+                self._rebuild(pool)
+                return await loop.run_in_executor(self._pool, _worker_predict, matrix, handle.version)
+        return await loop.run_in_executor(self._pool, predict_matrix, handle.model, matrix)
+
+    def _rebuild(self, broken):
+        # Concurrent requests see the same broken pool , only the first one replaces it
+        if self._pool is not broken:
+            return
+        logger.error("Inference process pool broken , starting a new one", extra={"workers": self.workers})
+        self._pool = None
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.start()
+
+
+inference_executor = InferenceExecutor(
+    mode=settings.INFERENCE_EXECUTOR_MODE,
+    workers=settings.INFERENCE_EXECUTOR_WORKERS,
+)
@@ -1,6 +1,14 @@
-import os
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import os
+import queue
+import random
+import time
+from contextvars import ContextVar
+from logging.handlers import QueueHandler,QueueListener,RotatingFileHandler
+from app.core.config import settings
+from app.core.metrics import LOG_RECORDS_DROPPED
 
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 LOG_DIRECTORY_NAME = 'logs'
@@ -9,15 +17,194 @@ LOG_FILE_PATH = os.path.join(BASE_DIR,LOG_DIRECTORY_NAME)
 os.makedirs(LOG_FILE_PATH, exist_ok=True)
 LOG_FILE = os.path.join(LOG_FILE_PATH,LOG_FILE_NAME)
 
-filehandler = RotatingFileHandler(
-    filename=LOG_FILE,
-    maxBytes=1024*1024*5,
-    backupCount=5,
-    encoding='utf-8'
-)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[filehandler]
-)
\ No newline at end of file
+# Request handlers only build a record and put it on a queue , message and
+# traceback rendering , JSON encoding , the file write and rotation check all
+# happen on the QueueListener thread.
+
+# Set by the response logger middleware for the lifetime of a request
+_request_id:ContextVar = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has , anything else came in through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id", "taskName"}
+
+
+def set_request_id(request_id:str):
+    return _request_id.set(request_id)
+
+def reset_request_id(token):
+    _request_id.reset(token)
+
+def get_request_id():
+    return _request_id.get()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line -> timestamp , level , logger , message , request id and `extra` fields."""
+
+    def __init__(self):
+        super().__init__()
+        self._encoder = json.JSONEncoder(default=str)
+        # (second , "YYYY-MM-DDTHH:MM:SS") , records of the same second share the prefix
+        self._second = (None, "")
+
+    def _timestamp(self, created:float) -> str:
+        second = int(created)
+        cached_second, prefix = self._second
+        if second != cached_second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._second = (second, prefix)
+        return f"{prefix}.{int((created - second) * 1000):03d}+00:00"
+
+    def format(self, record:logging.LogRecord) -> str:
+        entry = {
+            "ts": self._timestamp(record.created),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES:
+                entry[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return self._encoder.encode(entry)
+
+
+class SuccessSampler(logging.Filter):
+    """
+    Keeps `rate` of the INFO records from high volume loggers (the per request
+    response_logger line). Warnings , errors and responses with status >= 400
+    are always kept. Kept records carry the rate so counts can be scaled back up.
+    """
+
+    def __init__(self, rate:float , loggers):
+        super().__init__()
+        self.rate = rate
+        self.loggers = frozenset(loggers)
+
+    def filter(self, record:logging.LogRecord) -> bool:
+        if self.rate >= 1 or record.levelno > logging.INFO or record.name not in self.loggers:
+            return True
+        if getattr(record, "status_code", 200) >= 400:
+            return True
+        if random.random() >= self.rate:
+            return False
+        record.sample_rate = self.rate
+        return True
+
+
+class RequestQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks the caller -> a full queue drops the record.
+    Only the request id is taken here , from the caller's context. The record
+    itself is queued , message and traceback are rendered by the listener's
+    formatter , so log arguments must not be mutated after the call.
+    """
+
+    def prepare(self, record:logging.LogRecord) -> logging.LogRecord:
+        record.request_id = get_request_id()
+        return record
+
+    def enqueue(self, record:logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+class JsonFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler for the listener thread. Each record is formatted once
+    (the stock handler formats it a second time for the rollover check) , the
+    file size is tracked instead of asked from the stream , and writes are
+    flushed by RequestQueueListener once the queue runs empty , not per record.
+    """
+
+    def __init__(self, *args , **kwargs):
+        super().__init__(*args, **kwargs)
+        self._size = None
+
+    def emit(self, record:logging.LogRecord):
+        try:
+            # ASCII only JSON , characters == bytes
+            line = self.format(record) + self.terminator
+            if self.stream is None:
+                self.stream = self._open()
+            if self._size is None:
+                self._size = self.stream.tell()
+            if self.maxBytes > 0 and self._size and self._size + len(line) >= self.maxBytes:
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+                self._size = 0
+            self.stream.write(line)
+            self._size += len(line)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class RequestQueueListener(QueueListener):
+    """
+    Drains the queue in bursts. Once the queue runs empty the handlers are
+    flushed and the thread sleeps `interval` seconds before waiting again , so
+    under load it takes the GIL once per burst instead of once per record.
+    Records reach the file at most `interval` seconds late.
+    """
+
+    def __init__(self, queue , *handlers , respect_handler_level:bool = False , interval:float = 0.05):
+        super().__init__(queue, *handlers, respect_handler_level=respect_handler_level)
+        self.interval = interval
+
+    def dequeue(self, block:bool):
+        if self.queue.empty():
+            time.sleep(self.interval)
+        return self.queue.get(block)
+
+    def handle(self, record:logging.LogRecord):
+        super().handle(record)
+        if self.queue.empty():
+            self.flush()
+
+    def flush(self):
+        for handler in self.handlers:
+            handler.flush()
+
+    def stop(self):
+        super().stop()
+        self.flush()
+
+
+def setup_logging() -> QueueListener:
+    filehandler = JsonFileHandler(
+        filename=LOG_FILE,
+        maxBytes=1024*1024*5,
+        backupCount=5,
+        encoding='utf-8'
+    )
+    filehandler.setFormatter(JsonFormatter())
+
+    queue_handler = RequestQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    queue_handler.addFilter(SuccessSampler(settings.LOG_SUCCESS_SAMPLE_RATE, settings.LOG_SAMPLED_LOGGERS))
+
+    root = logging.getLogger()
+    root.setLevel(settings.LOG_LEVEL)
+    root.addHandler(queue_handler)
+
+    listener = RequestQueueListener(
+        queue_handler.queue,
+        filehandler,
+        respect_handler_level=True,
+        interval=settings.LOG_FLUSH_INTERVAL,
+    )
+    listener.start()
+    # Drains whatever is still queued before the process exits
+    atexit.register(listener.stop)
+    return listener
+
+
+listener = setup_logging()
@@ -0,0 +1,214 @@
+import os
+from functools import lru_cache
+from prometheus_client import Counter,Gauge,Histogram,multiprocess
+
+# With PROMETHEUS_MULTIPROC_DIR set every worker process writes its samples to
+# mmap files in that directory and /metrics aggregates them. Counters and
+# histograms simply add up , each gauge declares how its per worker values
+# combine (live* modes ignore workers that have exited).
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+# Micro Batching
+PREDICT_BATCH_SIZE = Histogram(
+    "predict_micro_batch_size",
+    "Number of rows sent to the model in one micro batch",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+
+PREDICT_BATCH_QUEUE_WAIT = Histogram(
+    "predict_micro_batch_queue_wait_seconds",
+    "Time a request waited in the micro batch queue before its batch ran",
+    buckets=(0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+
+# Redis Connection Pool
+REDIS_POOL_CONNECTIONS = Gauge(
+    "redis_pool_connections",
+    "Connections held by the shared Redis pool",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+
+REDIS_POOL_WAIT = Histogram(
+    "redis_pool_wait_seconds",
+    "Time spent waiting to check a connection out of the Redis pool",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 2),
+)
+
+REDIS_COMMAND_LATENCY = Histogram(
+    "redis_command_latency_seconds",
+    "Redis round trip per command , a pipeline counts as one PIPELINE command",
+    ["command"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5),
+)
+
+# Database Connection Pool
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent checking a connection out of the SQLAlchemy pool , including new connections",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+)
+
+# Rate Limiting
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections_total",
+    "Requests rejected with 429 per limiter",
+    ["limiter"],
+)
+
+# Prediction Cache
+CACHE_REQUESTS = Counter(
+    "prediction_cache_requests_total",
+    "Prediction cache lookups per tier and result",
+    ["tier", "result"],
+)
+
+CACHE_EVICTIONS = Counter(
+    "prediction_cache_evictions_total",
+    "Entries evicted from a bounded in-process cache tier",
+    ["tier"],
+)
+
+# Auth
+JWT_CACHE_REQUESTS = Counter(
+    "jwt_verification_cache_requests_total",
+    "Access token verifications served from the verified token cache (hit) or by full verification (miss)",
+    ["result"],
+)
+
+PASSWORD_QUEUE_DEPTH = Gauge(
+    "password_hash_queue_depth",
+    "bcrypt jobs waiting for a free worker in the password executor",
+    multiprocess_mode="livesum",
+)
+
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_seconds",
+    "bcrypt service time per operation , excluding queueing",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+PASSWORD_REJECTED = Counter(
+    "password_hash_rejected_total",
+    "Password operations rejected by admission control",
+    ["reason"],
+)
+
+# Health
+HEALTH_DEPENDENCY_UP = Gauge(
+    "health_dependency_up",
+    "1 when the dependency passed its last background probe",
+    ["dependency"],
+    multiprocess_mode="livemin",
+)
+
+HEALTH_DEPENDENCY_LATENCY = Gauge(
+    "health_dependency_latency_seconds",
+    "Duration of the last background probe per dependency",
+    ["dependency"],
+    multiprocess_mode="livemax",
+)
+
+# Decision Table
+DECISION_TABLE_AGREEMENT = Gauge(
+    "decision_table_agreement_ratio",
+    "Share of random inputs where the decision table matches the full model",
+    multiprocess_mode="livemin",
+)
+
+# Model Lifecycle
+MODEL_LOAD_SECONDS = Gauge(
+    "model_load_seconds",
+    "Duration of the last model load (registry lookup , artifact fetch , deserialization)",
+    multiprocess_mode="livemax",
+)
+
+MODEL_WARMUP_SECONDS = Gauge(
+    "model_warmup_seconds",
+    "Duration of the last model warmup",
+    multiprocess_mode="livemax",
+)
+
+MODEL_READY = Gauge(
+    "model_ready",
+    "1 once the model is loaded and warmed up",
+    multiprocess_mode="livemin",
+)
+
+MODEL_VERSION = Gauge(
+    "model_version_info",
+    "Registry version currently serving Production traffic (value is always 1)",
+    ["version"],
+    multiprocess_mode="livemax",
+)
+
+MODEL_RELOAD_SECONDS = Gauge(
+    "model_reload_seconds",
+    "Duration of the last background hot reload , from detection to swap",
+    multiprocess_mode="livemax",
+)
+
+# Model Versions (canary and shadow traffic)
+MODEL_CANDIDATE_VERSION = Gauge(
+    "model_candidate_version_info",
+    "Registry version loaded as candidate next to Production (value is always 1)",
+    ["version"],
+    multiprocess_mode="livemax",
+)
+
+MODEL_PREDICT_LATENCY = Histogram(
+    "model_predict_latency_seconds",
+    "Model prediction latency per version and traffic role",
+    ["version", "role"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+
+MODEL_PREDICTIONS = Counter(
+    "model_predictions_total",
+    "Rows predicted per version and traffic role",
+    ["version", "role"],
+)
+
+MODEL_PREDICT_BATCH_ROWS = Histogram(
+    "model_predict_batch_rows",
+    "Rows sent to the model in one inference call , per traffic role",
+    ["role"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024),
+)
+
+MODEL_PREDICTED_CLASS = Counter(
+    "model_predicted_class_total",
+    "Predictions served per model version and predicted class , cache hits included",
+    ["version", "prediction"],
+)
+
+SHADOW_COMPARISONS = Counter(
+    "model_shadow_comparisons_total",
+    "Shadow predictions compared against Production , per candidate version and result",
+    ["version", "result"],
+)
+
+SHADOW_DROPPED = Counter(
+    "model_shadow_dropped_total",
+    "Shadow requests dropped because the shadow queue was full",
+)
+
+# Logging
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total",
+    "Log records dropped because the logging queue was full",
+)
+
+
+@lru_cache(maxsize=1024)
+def labelled(metric , *values):
+    # metric.labels() takes a lock and rebuilds the key on every call , hot paths
+    # reuse the child instead. Label values go in declaration order.
+    return metric.labels(*values)
+
+def mark_worker_dead(pid:int = None):
+    # Multiprocess mode only -> drops the live* gauge samples of an exiting worker ,
+    # its counters and histograms stay in the totals
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid or os.getpid())
@@ -1,35 +1,228 @@
+import os
+import random
+import time
 import mlflow
+import mlflow.sklearn
 import logging
+from dataclasses import dataclass,field
+from mlflow import MlflowClient
+from app.core.atomic_files import atomic_directory
 from app.core.config import settings
+from app.core.metrics import MODEL_LOAD_SECONDS,MODEL_READY,MODEL_VERSION,MODEL_CANDIDATE_VERSION
+from app.core.tree_engine import FlatForest
 
 logger = logging.getLogger(__name__)
 
-_model = None
+SHARED_FOREST_DIR = "flat-forest"
 
+_current = None
+_candidate = None
+_model_ready = False
 
-def load_model():
+# Read by mlflow on every request , explicit MLFLOW_HTTP_REQUEST_* variables still win
+os.environ.setdefault("MLFLOW_HTTP_REQUEST_TIMEOUT", str(settings.MLFLOW_REQUEST_TIMEOUT))
+os.environ.setdefault("MLFLOW_HTTP_REQUEST_MAX_RETRIES", str(settings.MLFLOW_REQUEST_MAX_RETRIES))
+
+
+def version_dir(version:str) -> str:
+    return os.path.join(settings.MODEL_CACHE_DIR, settings.MODEL_NAME, str(version))
+
+def _cached_versions() -> list:
+    root = os.path.join(settings.MODEL_CACHE_DIR, settings.MODEL_NAME)
+    if not os.path.isdir(root):
+        return []
+    versions = [
+        name for name in os.listdir(root)
+        if name.isdigit() and os.path.exists(os.path.join(root, name, "MLmodel"))
+    ]
+    return sorted(versions, key=int)
+
+def _resolve_stage_version(stage:str):
+    versions = MlflowClient().get_latest_versions(settings.MODEL_NAME, stages=[stage])
+    return str(versions[0].version) if versions else None
+
+def _resolve_production_version() -> str:
+    # Pin the concrete version behind the Production stage so cache keys can be scoped to it
+    version = _resolve_stage_version("Production")
+    if version is None:
+        raise LookupError(f"No Production version registered for {settings.MODEL_NAME}")
+    return version
+
+def _fetch_artifacts(version:str) -> str:
     """
-    Loads the Production model from MLflow Registry.
-    Cached at process level.
+    Local copy of the model artifacts for `version`.
+    Downloaded once into MODEL_CACHE_DIR , later loads of the same
+    version never touch the registry's artifact store.
     """
-    global _model
+    path = version_dir(version)
+    if os.path.exists(os.path.join(path, "MLmodel")):
+        return path
 
-    if _model is not None:
-        return _model
+    # Another worker may finish the same download first , its copy is kept
+    with atomic_directory(path, "MLmodel") as tmp_path:
+        mlflow.artifacts.download_artifacts(
+            artifact_uri=f"models:/{settings.MODEL_NAME}/{version}",
+            dst_path=tmp_path,
+        )
+    return path
 
-    try:
-        logger.info("Loading model from MLflow Registry")
+def _open_shared_forest(path:str) -> FlatForest:
+    """
+    Opens the NumPy export of the forest next to the artifacts , exporting
+    it on first use. Every worker maps the same read only files , so the
+    tree arrays live once in the page cache instead of once per worker.
+    """
+    forest_path = os.path.join(path, SHARED_FOREST_DIR)
+    if not os.path.exists(os.path.join(forest_path, "meta.json")):
+        FlatForest.from_sklearn(mlflow.sklearn.load_model(model_uri=path)).save(forest_path)
+    return FlatForest.open(forest_path)
 
-        mlflow.set_tracking_uri(settings.MLFLOW_TRACKING_URI)
+def _load_local(path:str):
+    if settings.INFERENCE_ENGINE == "native":
+        if settings.MODEL_MMAP_ARRAYS:
+            return _open_shared_forest(path)
+        return FlatForest.from_sklearn(mlflow.sklearn.load_model(model_uri=path))
+    return mlflow.pyfunc.load_model(model_uri=path)
 
-        _model = mlflow.pyfunc.load_model(
-            model_uri=f"models:/{settings.MODEL_NAME}/Production"
-        )
 
-        logger.info("Model loaded successfully from MLflow")
+@dataclass(frozen=True)
+class ModelHandle:
+    """
+    One loaded model version. Handles are immutable , a reload builds a new
+    one and swaps the module reference , so a request that grabbed a handle
+    keeps predicting (and caching) with that version until it finishes.
+    """
+    version:str
+    model:object
+    loaded_at:float = field(default_factory=time.time)
+
+
+def resolve_production_version() -> str:
+    mlflow.set_tracking_uri(settings.MLFLOW_TRACKING_URI)
+    return _resolve_production_version()
+
+def load_model_version(version:str) -> ModelHandle:
+    """
+    Loads a specific registry version without installing it.
+    """
+    mlflow.set_tracking_uri(settings.MLFLOW_TRACKING_URI)
+    started = time.perf_counter()
+    handle = ModelHandle(version=str(version), model=_load_local(_fetch_artifacts(version)))
+
+    seconds = time.perf_counter() - started
+    MODEL_LOAD_SECONDS.set(seconds)
+    logger.info(
+        "Model loaded successfully",
+        extra={
+            "engine": settings.INFERENCE_ENGINE,
+            "version": handle.version,
+            "seconds": round(seconds, 3),
+        }
+    )
+    return handle
+
+def install_model(handle:ModelHandle):
+    # A single reference assignment , requests see either the old or the new handle
+    global _current
+    previous = _current
+    _current = handle
+
+    if previous is not None:
+        # Zeroed before removal , in multiprocess mode the value stays in this worker's file
+        MODEL_VERSION.labels(version=previous.version).set(0)
+        MODEL_VERSION.remove(previous.version)
+    MODEL_VERSION.labels(version=handle.version).set(1)
 
-        return _model
+def resolve_candidate_version():
+    """
+    Version in MODEL_CANDIDATE_STAGE , None when the stage is disabled , empty
+    or holds the Production version itself.
+    """
+    if not settings.MODEL_CANDIDATE_STAGE:
+        return None
+    mlflow.set_tracking_uri(settings.MLFLOW_TRACKING_URI)
+    version = _resolve_stage_version(settings.MODEL_CANDIDATE_STAGE)
+    if _current is not None and version == _current.version:
+        return None
+    return version
+
+def install_candidate(handle):
+    # None unloads the candidate , e.g. after it was promoted to Production
+    global _candidate
+    previous = _candidate
+    _candidate = handle
+
+    if previous is not None:
+        MODEL_CANDIDATE_VERSION.labels(version=previous.version).set(0)
+        MODEL_CANDIDATE_VERSION.remove(previous.version)
+    if handle is not None:
+        MODEL_CANDIDATE_VERSION.labels(version=handle.version).set(1)
+
+def get_current_handle():
+    # Installed Production handle or None , never triggers a load
+    return _current
+
+def get_candidate_handle():
+    return _candidate
+
+def choose_handle():
+    """
+    Handle that answers this request and its role , "canary" for the
+    MODEL_CANARY_FRACTION share of requests while a candidate is loaded,
+    "primary" otherwise.
+    """
+    candidate = _candidate
+    if candidate is not None and random.random() < settings.MODEL_CANARY_FRACTION:
+        return candidate, "canary"
+    return get_model_handle(), "primary"
+
+def get_model_handle() -> ModelHandle:
+    """
+    Current Production handle , loaded on first use.
+    Artifacts come from the local cache when the registry version is
+    unchanged , and the newest cached version is used when the registry
+    is unreachable.
+    """
+    if _current is not None:
+        return _current
+
+    try:
+        try:
+            version = resolve_production_version()
+            _fetch_artifacts(version)
+        except Exception:
+            cached = _cached_versions()
+            if not cached:
+                raise
+            version = cached[-1]
+            logger.warning(
+                "MLflow registry unreachable , loading cached model version %s",
+                version,
+                exc_info=True
+            )
+
+        handle = load_model_version(version)
+        if _current is None:
+            install_model(handle)
+        return _current
 
     except Exception as e:
         logger.critical("Failed to load ML model from MLflow", exc_info=True)
         raise RuntimeError("Model initialization failed") from e
+
+
+def load_model():
+    """
+    Loads the Production model , cached at process level.
+    With INFERENCE_ENGINE=native the sklearn forest is flattened into
+    a FlatForest instead of being wrapped by mlflow pyfunc.
+    """
+    return get_model_handle().model
+
+def set_model_ready(ready:bool):
+    global _model_ready
+    _model_ready = ready
+    MODEL_READY.set(1 if ready else 0)
+
+def is_model_ready() -> bool:
+    return _model_ready
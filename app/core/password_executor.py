@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor,ThreadPoolExecutor
+from fastapi import HTTPException,status
+from app.core.config import settings
+from app.core.metrics import PASSWORD_QUEUE_DEPTH,PASSWORD_HASH_SECONDS,PASSWORD_REJECTED
+from app.core.security import hash_password,verify_password
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_MODES = ("thread", "process")
+
+
+def _timed(operation , *args):
+    # Runs in the worker , so the measured time excludes queueing
+    started = time.perf_counter()
+    result = operation(*args)
+    return result, time.perf_counter() - started
+
+
+class PasswordExecutor:
+    """
+    Fixed size pool reserved for bcrypt , so a login burst can not starve
+    the AnyIO threadpool that model inference and sync endpoints share.
+
+    Admission control happens before a job is queued:
+    queue full                        -> 503 , the pool is saturated
+    expected wait above max_wait_ms   -> 429 , retry after the backlog drains
+    The expected wait is the backlog per worker times a moving average of
+    the bcrypt service time.
+    """
+
+    def __init__(self, mode:str , workers:int , max_queue:int , max_wait_ms:float):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown password executor mode: {mode}")
+        self.mode = mode
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_wait = max_wait_ms / 1000
+        self._pool = None
+        self._in_flight = 0
+        self._service_seconds = None
+
+    def start(self):
+        if self._pool is not None:
+            return
+
+        if self.mode == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="bcrypt",
+            )
+        logger.info(
+            "Password executor started",
+            extra={"mode": self.mode, "workers": self.workers, "max_queue": self.max_queue}
+        )
+
+    def shutdown(self):
+        if self._pool is None:
+            return
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._pool = None
+        logger.info("Password executor stopped", extra={"mode": self.mode})
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._in_flight - self.workers)
+
+    def expected_wait(self) -> float:
+        if self._service_seconds is None or self._in_flight < self.workers:
+            return 0.0
+        # Jobs ahead of this one , spread over the workers
+        return (self.queue_depth + 1) / self.workers * self._service_seconds
+
+    def _admit(self):
+        if self._in_flight >= self.workers + self.max_queue:
+            PASSWORD_REJECTED.labels(reason="queue_full").inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service busy. Please try again later.",
+                headers={"Retry-After": str(max(1, math.ceil(self.expected_wait())))},
+            )
+
+        wait = self.expected_wait()
+        if wait > self.max_wait:
+            PASSWORD_REJECTED.labels(reason="deadline").inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many authentication requests. Please try again later.",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+
+    async def _run(self, name:str , operation , *args):
+        self._admit()
+        self.start()
+
+        self._in_flight += 1
+        PASSWORD_QUEUE_DEPTH.set(self.queue_depth)
+        try:
+            loop = asyncio.get_running_loop()
+            result, seconds = await loop.run_in_executor(self._pool, _timed, operation, *args)
+        finally:
+            self._in_flight -= 1
+            PASSWORD_QUEUE_DEPTH.set(self.queue_depth)
+
+        PASSWORD_HASH_SECONDS.labels(operation=name).observe(seconds)
+        self._service_seconds = (
+            seconds if self._service_seconds is None
+            else 0.8 * self._service_seconds + 0.2 * seconds
+        )
+        return result
+
+    async def hash(self, password:str) -> str:
+        return await self._run("hash", hash_password, password)
+
+    async def verify(self, password:str , hashed_password:str) -> bool:
+        return await self._run("verify", verify_password, password, hashed_password)
+
+
+password_executor = PasswordExecutor(
+    mode=settings.PASSWORD_EXECUTOR_MODE,
+    workers=settings.PASSWORD_EXECUTOR_WORKERS,
+    max_queue=settings.PASSWORD_QUEUE_MAX,
+    max_wait_ms=settings.PASSWORD_MAX_WAIT_MS,
+)
@@ -1,9 +1,15 @@
 import logging
-from fastapi import HTTPException,Request,status,Depends
-from app.core.dependecies import get_redis_client , get_refresh_user_id , get_current_user
+import math
 import os
+import uuid
+from dataclasses import dataclass
+from fastapi import HTTPException,Request,Response,status,Depends
+from app.core.dependecies import get_redis_client , get_refresh_user_id , get_current_user
+from app.core.metrics import RATE_LIMIT_REJECTIONS
+from app.core.request_timing import timed_stage
 from dotenv import load_dotenv
 from redis.asyncio import Redis
+from redis.exceptions import RedisError
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -16,78 +22,219 @@ REFRESH_RATE_WINDOW = int(os.getenv("REFRESH_RATE_WINDOW", 300))
 PREDICT_RATE_LIMIT = int(os.getenv("PREDICT_RATE_LIMIT", 50))
 PREDICT_RATE_WINDOW = int(os.getenv("PREDICT_RATE_WINDOW", 60))
 
-
-async def login_rate_limiter(request:Request , redis : Redis = Depends(get_redis_client)):
-    try :
-        client_ip = request.client.host
-
-        key = f"rate:login:{client_ip}"
-
-        current_count = await redis.get(key)
-
-        if current_count is None:
-            await redis.setex(key,LOGIN_RATE_WINDOW,1)
-            return
-    
-        if int(current_count) >= LOGIN_RATE_LIMIT:
+# /predict/batch has its own quota in rows , PREDICT_BATCH_MAX_ROWS above it can never pass
+PREDICT_BATCH_RATE_LIMIT = int(os.getenv("PREDICT_BATCH_RATE_LIMIT", 5000))
+PREDICT_BATCH_RATE_WINDOW = int(os.getenv("PREDICT_BATCH_RATE_WINDOW", 60))
+
+# "sliding_window" or "token_bucket"
+RATE_LIMIT_STRATEGY = os.getenv("RATE_LIMIT_STRATEGY", "sliding_window")
+
+# Both scripts read the clock from Redis itself so every worker agrees on "now".
+# They return {allowed, remaining, retry_after_ms}.
+
+# Sliding window log -> one sorted set member per request , scored by time in ms.
+# The member ends in ":<cost>" , a batch of N rows is a single ZADD instead of N.
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local member = ARGV[4]
+
+local function cost_of(entry)
+    return tonumber(string.match(entry, ':(%d+)$'))
+end
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local entries = redis.call('ZRANGE', key, 0, -1, 'WITHSCORES')
+local count = 0
+for i = 1, #entries, 2 do
+    count = count + cost_of(entries[i])
+end
+
+if count + cost > limit then
+    -- Oldest requests expire first , wait until enough of them freed room for this cost
+    local retry = window
+    local excess = count + cost - limit
+    for i = 1, #entries, 2 do
+        excess = excess - cost_of(entries[i])
+        if excess <= 0 then
+            retry = tonumber(entries[i + 1]) + window - now
+            break
+        end
+    end
+    return {0, limit - count, retry}
+end
+
+redis.call('ZADD', key, now, member .. ':' .. cost)
+redis.call('PEXPIRE', key, window)
+return {1, limit - count - cost, 0}
+"""
+
+# Token bucket -> bucket of `limit` tokens refilled continuously over `window` ms
+TOKEN_BUCKET_SCRIPT = """
+local key = KEYS[1]
+local window = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local rate = limit / window
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local state = redis.call('HMGET', key, 'tokens', 'ts')
+local tokens = tonumber(state[1]) or limit
+local last = tonumber(state[2]) or now
+tokens = math.min(limit, tokens + math.max(0, now - last) * rate)
+
+local allowed = 0
+local retry = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+elseif cost > limit then
+    retry = window
+else
+    retry = math.ceil((cost - tokens) / rate)
+end
+
+redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', key, window)
+return {allowed, math.floor(tokens), retry}
+"""
+
+STRATEGY_SCRIPTS = {
+    "sliding_window": SLIDING_WINDOW_SCRIPT,
+    "token_bucket": TOKEN_BUCKET_SCRIPT,
+}
+
+
+@dataclass
+class RateLimitResult:
+    limit:int
+    remaining:int
+    retry_after:int = 0
+
+    def headers(self) -> dict:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(max(self.remaining, 0)),
+        }
+        if self.retry_after:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+    def apply(self, response:Response):
+        response.headers.update(self.headers())
+
+
+class RateLimiter:
+    """
+    Generic Redis backed limiter.
+    Every decision is one EVALSHA round trip , the check and the increment
+    happen atomically inside the script so concurrent workers can not overshoot.
+    Fails open when Redis is unavailable.
+    """
+
+    def __init__(self, name:str , limit:int , window:int , detail:str , strategy:str = RATE_LIMIT_STRATEGY):
+        if strategy not in STRATEGY_SCRIPTS:
+            raise ValueError(f"Unknown rate limit strategy: {strategy}")
+        self.name = name
+        self.limit = limit
+        self.window_ms = window * 1000
+        self.detail = detail
+        self.strategy = strategy
+        self._script = None
+        self._rejections = RATE_LIMIT_REJECTIONS.labels(limiter=name)
+
+    async def hit(self, redis:Redis , identity:str , cost:int = 1) -> RateLimitResult:
+        if cost > self.limit:
+            # Would be rejected in every window , a 429 with Retry-After would only invite retries
             raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Too many login attempts. Please try again later."
-        )
-    
-        await redis.incr(key)
-    except redis.RedisError:
-        logger.critical(
-            "Redis unavailable — login rate limiter bypassed",
-            exc_info=True
-        )
-
-async def refresh_rate_limiter(user_id:str = Depends(get_refresh_user_id) , redis : Redis = Depends(get_redis_client)):
-    try :
-        
-        key = f"rate:refresh:{user_id}"
-        current_count = await redis.get(key)
-        # redis_client returns string values
-
-        if current_count is None:
-            await redis.setex(key,REFRESH_RATE_WINDOW,1)
-            return
-    
-        if int(current_count) >= REFRESH_RATE_LIMIT:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Too many refresh token attempts. Please try again later."
+                status_code=413,
+                detail=f"Request costs {cost} units , the {self.name} quota is {self.limit} per {self.window_ms // 1000} seconds",
+                headers={"X-RateLimit-Limit": str(self.limit)},
             )
-        await redis.incr(key)
-    except redis.RedisError:
-        logger.critical(
-            "Redis unavailable — refresh rate limiter bypassed",
-            exc_info=True
-        )
-
-async def predict_rate_limiter(user_id:str = Depends(get_current_user) , redis : Redis = Depends(get_redis_client)):
-    try:
-        
-        key = f"rate:predict:{user_id}"
-
-        current_count = await redis.get(key)
+        if self._script is None:
+            self._script = redis.register_script(STRATEGY_SCRIPTS[self.strategy])
+
+        key = f"rate:{self.strategy}:{self.name}:{identity}"
+        try:
+            with timed_stage("ratelimit"):
+                allowed, remaining, retry_ms = await self._script(
+                    keys=[key],
+                    args=[self.window_ms, self.limit, cost, uuid.uuid4().hex],
+                    client=redis,
+                )
+        except RedisError:
+            logger.critical(
+                "Redis unavailable — %s rate limiter bypassed",
+                self.name,
+                exc_info=True
+            )
+            return RateLimitResult(limit=self.limit, remaining=self.limit)
 
-        if current_count is None:
-            await redis.setex(key,PREDICT_RATE_WINDOW,1)
-            return
-    
-        if int(current_count) >= PREDICT_RATE_LIMIT:
+        result = RateLimitResult(
+            limit=self.limit,
+            remaining=int(remaining),
+            retry_after=math.ceil(int(retry_ms) / 1000) if not int(allowed) else 0,
+        )
+        if not int(allowed):
+            self._rejections.inc()
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail = "Too many prediction requests. Please try again Later"
-        )
-    
-        await redis.incr(key)
-    except redis.RedisError:
-        logger.critical(
-            "Redis unavailable — Prediction rate limiter bypassed",
-            exc_info=True
-        )
-
-
-
+                detail=self.detail,
+                headers=result.headers(),
+            )
+        return result
+
+
+login_limiter = RateLimiter(
+    "login",
+    LOGIN_RATE_LIMIT,
+    LOGIN_RATE_WINDOW,
+    "Too many login attempts. Please try again later.",
+)
+refresh_limiter = RateLimiter(
+    "refresh",
+    REFRESH_RATE_LIMIT,
+    REFRESH_RATE_WINDOW,
+    "Too many refresh token attempts. Please try again later.",
+)
+predict_limiter = RateLimiter(
+    "predict",
+    PREDICT_RATE_LIMIT,
+    PREDICT_RATE_WINDOW,
+    "Too many prediction requests. Please try again Later",
+)
+predict_batch_limiter = RateLimiter(
+    "predict_batch",
+    PREDICT_BATCH_RATE_LIMIT,
+    PREDICT_BATCH_RATE_WINDOW,
+    "Too many batch prediction rows. Please try again Later",
+)
+
+# Routes returning their own JSONResponse call result.apply(response) themselves,
+# the headers set here only reach routes that return plain data.
+
+async def login_rate_limiter(request:Request , response:Response , redis : Redis = Depends(get_redis_client)):
+    result = await login_limiter.hit(redis, request.client.host)
+    result.apply(response)
+    return result
+
+async def refresh_rate_limiter(response:Response , user_id:str = Depends(get_refresh_user_id) , redis : Redis = Depends(get_redis_client)):
+    result = await refresh_limiter.hit(redis, user_id)
+    result.apply(response)
+    return result
+
+async def predict_rate_limiter(response:Response , user_id:str = Depends(get_current_user) , redis : Redis = Depends(get_redis_client)):
+    result = await predict_limiter.hit(redis, user_id)
+    result.apply(response)
+    return result
+
+async def predict_batch_rate_limiter(user_id:str , rows:int , redis : Redis):
+    # Batch quota is counted per row , a batch larger than the whole quota gets a 413
+    return await predict_batch_limiter.hit(redis, user_id, cost=rows)
@@ -0,0 +1,114 @@
+import logging
+import time
+from redis.asyncio import Redis,BlockingConnectionPool
+from redis.asyncio.client import Pipeline
+from app.core.config import settings
+from app.core.metrics import MULTIPROCESS,REDIS_POOL_CONNECTIONS,REDIS_POOL_WAIT,REDIS_COMMAND_LATENCY,labelled
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedConnectionPool(BlockingConnectionPool):
+    """
+    Blocking pool -> when every connection is busy callers wait up to
+    REDIS_POOL_TIMEOUT seconds for one to be released instead of failing.
+    The time spent waiting for a connection is exported as a histogram.
+    """
+
+    async def get_connection(self, command_name, *keys, **options):
+        started = time.perf_counter()
+        try:
+            return await super().get_connection(command_name, *keys, **options)
+        finally:
+            REDIS_POOL_WAIT.observe(time.perf_counter() - started)
+
+    async def release(self, connection):
+        await super().release(connection)
+        if MULTIPROCESS:
+            # Once per command , connections held by concurrent commands still show as in use
+            self._record_connections()
+
+    def _record_connections(self):
+        labelled(REDIS_POOL_CONNECTIONS, "in_use").set(len(self._in_use_connections))
+        labelled(REDIS_POOL_CONNECTIONS, "idle").set(len(self._available_connections))
+
+
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error:bool = True):
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            labelled(REDIS_COMMAND_LATENCY, "PIPELINE").observe(time.perf_counter() - started)
+
+
+class InstrumentedRedis(Redis):
+    """Client that records the round trip of every command (pool wait included) per command name."""
+
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            labelled(REDIS_COMMAND_LATENCY, str(args[0]).upper()).observe(time.perf_counter() - started)
+
+    def pipeline(self, transaction:bool = True , shard_hint = None) -> InstrumentedPipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+_pool = None
+_client = None
+
+
+def init_redis_pool() -> Redis:
+    global _pool, _client
+
+    if _client is not None:
+        return _client
+
+    _pool = InstrumentedConnectionPool.from_url(
+        settings.REDIS_URL,
+        decode_responses=True,
+        max_connections=settings.REDIS_POOL_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+        health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+    )
+    _client = InstrumentedRedis(connection_pool=_pool)
+
+    if MULTIPROCESS:
+        # Function gauges are read at scrape time in this process only , the
+        # aggregated view needs values written on every checkout and release
+        _pool._record_connections()
+    else:
+        REDIS_POOL_CONNECTIONS.labels(state="in_use").set_function(
+            lambda: len(_pool._in_use_connections) if _pool else 0
+        )
+        REDIS_POOL_CONNECTIONS.labels(state="idle").set_function(
+            lambda: len(_pool._available_connections) if _pool else 0
+        )
+
+    logger.info(
+        "Redis connection pool created",
+        extra={"max_connections": settings.REDIS_POOL_MAX_CONNECTIONS}
+    )
+    return _client
+
+
+def get_redis() -> Redis:
+    # Lazily created for scripts and tests that never run the lifespan hook
+    return _client if _client is not None else init_redis_pool()
+
+
+async def close_redis_pool():
+    global _pool, _client
+
+    if _client is None:
+        return
+
+    await _client.aclose()
+    await _pool.disconnect()
+    _pool = None
+    _client = None
+    logger.info("Redis connection pool closed")
@@ -0,0 +1,43 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from fastapi.responses import JSONResponse
+
+# Per request stage durations in seconds , filled while the request runs and
+# read back by the response logger middleware. Outside a request (warmup ,
+# background tasks) there is no dict and recording is a no-op.
+_stages:ContextVar = ContextVar("request_stages", default=None)
+
+
+def start_request() -> tuple:
+    stages = {}
+    return stages, _stages.set(stages)
+
+def end_request(token):
+    _stages.reset(token)
+
+def record_stage(name:str , seconds:float):
+    stages = _stages.get()
+    if stages is not None:
+        # A stage hit twice in one request (e.g. two cache round trips) adds up
+        stages[name] = stages.get(name, 0.0) + seconds
+
+@contextmanager
+def timed_stage(name:str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+def server_timing(stages:dict , total:float) -> str:
+    entries = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in stages.items()]
+    entries.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(entries)
+
+
+class TimedJSONResponse(JSONResponse):
+    # Default response class , so JSON encoding shows up as the "serialize" stage
+    def render(self, content) -> bytes:
+        with timed_stage("serialize"):
+            return super().render(content)
@@ -1,106 +1,112 @@
 import json
+import struct
+import time
+import uuid
 import bcrypt
 import hashlib
-from datetime import datetime, timezone ,timedelta
-from jose import JWTError , jwt
+from functools import lru_cache
+from datetime import datetime, timezone
 from app.core.config import settings
+from app.core.token_codec import HS256Codec,TokenError
+from app.core.metrics import JWT_CACHE_REQUESTS,labelled
+from app.cache.memory_cache import TTLCache
+from app.schemas.model_schema import FEATURE_COLUMNS
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 15
 REFRESH_TOKEN_EXPIRE_DAYS = 7
-# --> Old Logic
-# def create_token(data:dict , expire_minutes=30):
-#     to_encode = data.copy()
-#     expire = datetime.now(timezone.utc) + timedelta(minutes=expire_minutes)
-#     to_encode.update({"exp" : expire})
-    
-#     return jwt.encode(
-#         to_encode,
-#         key=settings.JWT_SECRET_KEY,
-#         algorithm= settings.JWT_ALGORITHM
-#     )
-
-# Replacing New Logic with Access and Refresh Tokens
+
+# HMAC keys are prepared once , both codecs stay wire compatible with python-jose
+_access_codec = HS256Codec(settings.JWT_ACCESS_SECRET_KEY, settings.JWT_ALGORITHM)
+_refresh_codec = HS256Codec(settings.JWT_REFRESH_SECRET_KEY, settings.JWT_ALGORITHM)
 
 def create_access_tokens(user_id:str):
-    now  = datetime.now(timezone.utc)
+    now  = int(time.time())
 
     payload = {
         "sub":user_id,
         "token_type":"access",
         "iat":now,
-        "exp" : now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        "exp" : now + ACCESS_TOKEN_EXPIRE_MINUTES * 60
     }
 
-    return jwt.encode(
-        payload,
-        settings.JWT_ACCESS_SECRET_KEY,
-        settings.JWT_ALGORITHM  
-    )
+    return _access_codec.encode(payload)
 
 # Refresh Tokens
 
 def create_refresh_tokens(user_id:str):
-    now  = datetime.now(timezone.utc)
-    expires_at = now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    now  = int(time.time())
+    exp = now + REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
     payload = {
         "sub":user_id,
         "token_type":"refresh",
+        # Unique per token , two rotations within one second still differ
+        "jti":uuid.uuid4().hex,
         "iat":now,
-        "exp" : expires_at
+        "exp" : exp
     }
 
-    token = jwt.encode(
-        payload,
-        settings.JWT_REFRESH_SECRET_KEY,
-        settings.JWT_ALGORITHM  
-    )
-
-    return token,expires_at
+    token = _refresh_codec.encode(payload)
 
+    return token,datetime.fromtimestamp(exp, timezone.utc)
 
-# def verify_token(token:str):
-#     try:
-#         payload = jwt.decode(token,key=settings.JWT_SECRET_KEY,algorithms=[settings.JWT_ALGORITHM])
-#         return payload
-#     except JWTError:
-#         return None
 
 def verify_access_token(token: str):
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_ACCESS_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = _access_codec.decode(token)
 
         if payload.get("token_type") != "access":
             return None
 
         return payload
 
-    except JWTError:
+    except TokenError:
         return None
 
+# Verified access token payloads keyed by a digest of the token , each entry
+# lives until the token's own exp. A tampered token has a different digest
+# and always goes through full signature verification.
+_verified_access_tokens = TTLCache(settings.JWT_CACHE_MAX_ENTRIES, name="jwt")
+
+def _token_digest(token:str) -> bytes:
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+def verify_access_token_cached(token: str):
+    """
+    verify_access_token with an in-process cache of verified payloads.
+    Not thread safe , call it from the event loop only.
+    """
+    if not settings.JWT_CACHE_MAX_ENTRIES:
+        return verify_access_token(token)
+
+    key = _token_digest(token)
+    payload = _verified_access_tokens.get(key)
+    # exp is re-checked against the wall clock , the cache TTL runs on the monotonic clock
+    if payload is not None and payload["exp"] > time.time():
+        labelled(JWT_CACHE_REQUESTS, "hit").inc()
+        return payload
+
+    labelled(JWT_CACHE_REQUESTS, "miss").inc()
+    payload = verify_access_token(token)
+    if payload is not None and "exp" in payload:
+        _verified_access_tokens.set(key, payload, ttl=payload["exp"] - time.time())
+    return payload
+
 def verify_refresh_token(token: str):
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_REFRESH_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = _refresh_codec.decode(token)
 
         if payload.get("token_type") != "refresh":
             return None
 
         return payload
 
-    except JWTError:
+    except TokenError:
         return None
 
 def hash_password(password:str)-> str:
     return bcrypt.hashpw(
         password.encode('utf-8'),
-        bcrypt.gensalt()
+        bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     ).decode('utf-8')
 
 def verify_password(password:str , hashed_password:str)-> bool:
@@ -114,10 +120,37 @@ def hash_refresh_token(token:str)->str:
         token.encode("utf-8")
     ).hexdigest()
 
-def verify_hashed_refresh_token(token:str ,hashed_token:str)-> bool:
-    return hash_refresh_token(token) == hashed_token
-
 
 def make_cache_key(data:dict):
     data_string = json.dumps(data,sort_keys=True)
-    return hashlib.sha256(data_string.encode()).hexdigest()
\ No newline at end of file
+    return hashlib.sha256(data_string.encode()).hexdigest()
+
+# Binary cache keys -> the four features packed into a fixed width layout
+# instead of JSON + SHA-256 hex (64 chars).
+_FLOAT_KEY_LAYOUT = struct.Struct("<4d")
+_QUANTIZED_KEY_LAYOUT = struct.Struct("<4q")
+
+@lru_cache(maxsize=64)
+def _cache_key_prefix(model_version:str , quantum:float) -> bytes:
+    return f"pred:{model_version}:{quantum:g}:".encode()
+
+def make_binary_cache_key(data:dict , model_version:str , quantum:float = 0.0) -> bytes:
+    """
+    Packs the model input into a fixed width key (32 byte payload) scoped
+    to the model version.
+    With a quantum (e.g. 0.01 cm) every feature is snapped to the nearest
+    multiple first , so near identical measurements share one entry.
+    """
+    values = [data[column] for column in FEATURE_COLUMNS]
+    prefix = _cache_key_prefix(model_version, quantum)
+
+    if quantum:
+        try:
+            return prefix + b"q" + _QUANTIZED_KEY_LAYOUT.pack(
+                *(round(value / quantum) for value in values)
+            )
+        except (struct.error, OverflowError, ValueError):
+            # Out of range or non finite input , keep the exact value instead
+            pass
+
+    return prefix + b"f" + _FLOAT_KEY_LAYOUT.pack(*values)
@@ -0,0 +1,87 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+
+
+class TokenError(Exception):
+    pass
+
+
+def _b64encode(data:bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+def _b64decode(data:bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+class HS256Codec:
+    """
+    Signs and verifies HS256 JWTs for one secret.
+
+    The HMAC key is prepared once and copied per call , the header segment
+    is fixed and payloads are compact JSON with integer timestamps.
+    Output is byte for byte what python-jose produces for the same claims ,
+    and tokens issued by jose verify here , so both can be live at once.
+    Claim checks follow jose's defaults -> exp , nbf and iat must be numbers ,
+    exp / nbf are enforced without leeway and sub must be a string.
+    """
+
+    ALGORITHM = "HS256"
+    # jose serialises the header with sorted keys and compact separators
+    HEADER = _b64encode(b'{"alg":"HS256","typ":"JWT"}')
+
+    def __init__(self, secret:str , algorithm:str = ALGORITHM):
+        if algorithm != self.ALGORITHM:
+            raise ValueError(f"HS256Codec does not support {algorithm}")
+        self._mac = hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha256)
+
+    def _signature(self, signing_input:bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def encode(self, claims:dict) -> str:
+        payload = json.dumps(claims, separators=(",", ":")).encode("utf-8")
+        signing_input = self.HEADER + b"." + _b64encode(payload)
+        return (signing_input + b"." + _b64encode(self._signature(signing_input))).decode("ascii")
+
+    def decode(self, token:str , now:float = None) -> dict:
+        try:
+            signing_input, _, signature = token.encode("ascii").rpartition(b".")
+            header, _, payload = signing_input.partition(b".")
+            if not header or not payload or b"." in payload:
+                raise TokenError("Malformed token")
+
+            if header != self.HEADER:
+                # Same algorithm , different header serialisation (e.g. extra fields)
+                if json.loads(_b64decode(header)).get("alg") != self.ALGORITHM:
+                    raise TokenError("Unexpected algorithm")
+
+            if not hmac.compare_digest(self._signature(signing_input), _b64decode(signature)):
+                raise TokenError("Signature verification failed")
+
+            claims = json.loads(_b64decode(payload))
+        except (UnicodeError, binascii.Error, ValueError, AttributeError) as e:
+            raise TokenError("Malformed token") from e
+
+        if not isinstance(claims, dict):
+            raise TokenError("Invalid payload")
+        self._validate_claims(claims, time.time() if now is None else now)
+        return claims
+
+    @staticmethod
+    def _validate_claims(claims:dict , now:float):
+        for name in ("exp", "nbf", "iat"):
+            value = claims.get(name)
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                raise TokenError(f"Invalid {name} claim")
+
+        if "exp" in claims and claims["exp"] < int(now):
+            raise TokenError("Signature has expired")
+        if "nbf" in claims and claims["nbf"] > int(now):
+            raise TokenError("The token is not yet valid")
+        if "sub" in claims and not isinstance(claims["sub"], str):
+            raise TokenError("Subject must be a string")
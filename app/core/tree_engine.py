@@ -0,0 +1,176 @@
+import json
+import os
+import numpy as np
+import sklearn
+from app.core.atomic_files import atomic_directory
+
+# Since scikit-learn 1.4 classifier trees store class fractions in `tree_.value`
+# and predict_proba returns them as is. Older versions store weighted counts
+# and normalise them at predict time.
+_SKLEARN_STORES_FRACTIONS = tuple(int(part) for part in sklearn.__version__.split(".")[:2]) >= (1, 4)
+
+
+def _leaf_probabilities(tree) -> np.ndarray:
+    value = tree.value[:, 0, :]
+    if _SKLEARN_STORES_FRACTIONS:
+        return value.astype(np.float64, copy=True)
+
+    normalizer = value.sum(axis=1)[:, np.newaxis]
+    normalizer[normalizer == 0.0] = 1.0
+    return value / normalizer
+
+
+class FlatForest:
+    """
+    A RandomForestClassifier flattened into contiguous NumPy arrays.
+
+    Every node of every tree lives in one set of arrays (feature, threshold,
+    left / right child and leaf class probabilities) and a batch is routed
+    through all trees at once , one tree level per iteration.
+    Leaves point to themselves so the walk can simply run `max_depth` steps.
+    Probabilities are summed in tree order , the same way sklearn accumulates
+    them , so predicted classes are bit identical to `forest.predict`.
+    """
+
+    def __init__(
+        self,
+        feature:np.ndarray,
+        threshold:np.ndarray,
+        left:np.ndarray,
+        right:np.ndarray,
+        leaf_proba:np.ndarray,
+        roots:np.ndarray,
+        classes:np.ndarray,
+        max_depth:int,
+        feature_names=None,
+        chunk_size:int = 1024,
+        children:np.ndarray = None,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        # Interleaved children -> child of node i is children[2 * i + went_right]
+        self.children = children if children is not None else np.stack([left, right], axis=1).ravel()
+        self.leaf_proba = leaf_proba
+        self.roots = roots
+        self.classes = classes
+        self.max_depth = max_depth
+        self.feature_names = feature_names
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        features, thresholds, lefts, rights, probas, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count, dtype=np.int64)
+            is_leaf = tree.children_left == -1
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int64))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold).astype(np.float64))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            probas.append(_leaf_probabilities(tree))
+            roots.append(offset)
+
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        feature_names = getattr(forest, "feature_names_in_", None)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            leaf_proba=np.concatenate(probas),
+            roots=np.asarray(roots, dtype=np.int64),
+            classes=np.asarray(forest.classes_),
+            max_depth=max_depth,
+            feature_names=list(feature_names) if feature_names is not None else None,
+        )
+
+    # Arrays written by save() , left / right are views into `children`
+    ARRAYS = ("feature", "threshold", "children", "leaf_proba", "roots", "classes")
+
+    def save(self, path:str):
+        """
+        Writes the forest as one .npy file per array plus a meta.json.
+        The directory is built under a temporary name and renamed , so a
+        worker never opens a half written forest.
+        """
+        with atomic_directory(path, "meta.json") as tmp_path:
+            for name in self.ARRAYS:
+                np.save(os.path.join(tmp_path, f"{name}.npy"), np.ascontiguousarray(getattr(self, name)))
+            with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+                json.dump({"max_depth": int(self.max_depth), "feature_names": self.feature_names}, f)
+
+    @classmethod
+    def open(cls, path:str , chunk_size:int = 1024):
+        """
+        Memory maps a forest written by save().
+        The arrays are read only views on the page cache , so every worker
+        process that opens the same directory shares one physical copy.
+        """
+        # .view(np.ndarray) drops the memmap subclass , its per call overhead adds up in the tree walk
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r").view(np.ndarray)
+            for name in cls.ARRAYS
+        }
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+
+        children = arrays.pop("children")
+        return cls(
+            left=children[0::2],
+            right=children[1::2],
+            children=children,
+            max_depth=meta["max_depth"],
+            feature_names=meta["feature_names"],
+            chunk_size=chunk_size,
+            **arrays,
+        )
+
+    def _as_matrix(self, X) -> np.ndarray:
+        # sklearn validates inputs to float32 before walking the trees
+        if hasattr(X, "columns") and self.feature_names is not None:
+            X = X[self.feature_names].to_numpy()
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def predict_proba(self, X) -> np.ndarray:
+        X = self._as_matrix(X)
+        proba = np.empty((X.shape[0], self.leaf_proba.shape[1]), dtype=np.float64)
+        # Large batches are walked in chunks so the (n_trees , chunk) working set stays in cache
+        for start in range(0, X.shape[0], self.chunk_size):
+            stop = start + self.chunk_size
+            proba[start:stop] = self._chunk_proba(X[start:stop])
+        return proba
+
+    def _chunk_proba(self, X:np.ndarray) -> np.ndarray:
+        n_samples, n_features = X.shape
+        flat_X = X.ravel()
+        row_offsets = (np.arange(n_samples) * n_features)[np.newaxis, :]
+
+        # (n_trees , n_samples) node index of every sample in every tree
+        nodes = np.repeat(self.roots[:, np.newaxis], n_samples, axis=1)
+        for _ in range(self.max_depth):
+            values = flat_X.take(row_offsets + self.feature.take(nodes))
+            go_right = ~(values <= self.threshold.take(nodes))
+            nodes = self.children.take(2 * nodes + go_right)
+
+        # Summed strictly in tree order , matching sklearn's accumulation
+        if n_samples * len(self.roots) <= 1 << 16:
+            proba = np.cumsum(self.leaf_proba[nodes], axis=0)[-1]
+        else:
+            proba = np.zeros((n_samples, self.leaf_proba.shape[1]), dtype=np.float64)
+            for tree_nodes in nodes:
+                proba += self.leaf_proba[tree_nodes]
+        proba /= len(self.roots)
+        return proba
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
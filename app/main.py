@@ -1,27 +1,60 @@
+import asyncio
+import contextlib
+import logging
 from fastapi import FastAPI
-from app.api import routes_auth,routes_predict, routes_health
+from app.api import routes_auth,routes_predict, routes_health, routes_admin
 from contextlib import asynccontextmanager
 from app.core.database import engine,Base
 from app.middlewares.response_logger import ResponseLoggerMiddleware
+from app.core.request_timing import TimedJSONResponse
 from app.core.exception import register_exception_handlers
+from app.core.inference_executor import inference_executor
+from app.core.password_executor import password_executor
+from app.core.redis_pool import init_redis_pool,close_redis_pool
+from app.core.metrics import mark_worker_dead
+from app.services.model_service import close_shadow
+from app.services.model_reloader import startup_model_load
+from app.services.provisioning import shutdown_hash_pool
+from app.services.health import health_monitor
 from app.core import logging_config
 from prometheus_fastapi_instrumentator import Instrumentator
 
+logger = logging.getLogger(__name__)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    init_redis_pool()
+    inference_executor.start()
+    password_executor.start()
+    # First snapshot before serving , later ones come from the background task
+    await health_monitor.refresh()
+    health_monitor.start()
+    # Model load , warmup and hot reload run in the background , readiness stays down until warm
+    reload_task = asyncio.create_task(startup_model_load())
 
     yield
 
     # Shutdown
+    reload_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await reload_task
+    await health_monitor.stop()
+    await close_shadow()
+    inference_executor.shutdown()
+    password_executor.shutdown()
+    shutdown_hash_pool()
+    await close_redis_pool()
     await engine.dispose()
-app = FastAPI(lifespan=lifespan)
+    mark_worker_dead()
+app = FastAPI(lifespan=lifespan, default_response_class=TimedJSONResponse)
 app.add_middleware(ResponseLoggerMiddleware)
 
 app.include_router(routes_auth.router , tags = ["Auth"])
 app.include_router(routes_predict.router,tags = ["Predict"])
 app.include_router(routes_health.router , tags=["Health"])
+app.include_router(routes_admin.router , tags=["Admin"])
 Instrumentator().instrument(app).expose(app)
 register_exception_handlers(app)
\ No newline at end of file
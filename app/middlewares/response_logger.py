@@ -1,24 +1,74 @@
 import logging
 import time
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import Request
+import uuid
+from starlette.datastructures import Headers,MutableHeaders
+from app.core.logging_config import set_request_id,reset_request_id
+from app.core.request_timing import start_request,end_request,server_timing
 
 logger = logging.getLogger("response_logger")
 
-class ResponseLoggerMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request : Request, call_next):
-        start_time = time.time()
+REQUEST_ID_HEADER = "X-Request-ID"
+REQUEST_ID_MAX_LENGTH = 128
 
-        response = await call_next(request)
 
-        process_time = round((time.time() - start_time)*1000 , 2)
-        logger.info(
-            "method=%s path=%s status_code=%s duration_ms=%s",
-            request.method,
-            request.url.path,
-            response.status_code,
-            process_time
-        )
+def _request_id(scope) -> str:
+    # Keep the caller's id (e.g. from a proxy) when it is sane , otherwise mint one
+    request_id = Headers(scope=scope).get(REQUEST_ID_HEADER)
+    if request_id and len(request_id) <= REQUEST_ID_MAX_LENGTH and request_id.isprintable():
+        return request_id
+    return uuid.uuid4().hex
 
-        return response
+class ResponseLoggerMiddleware:
+    """
+    Pure ASGI middleware , no BaseHTTPMiddleware task / stream wrapping per request.
 
+    Stage timings recorded during the request (auth , rate limiter , cache ,
+    inference , serialization) are sent back in a Server-Timing header on
+    http.response.start , and logged with the total once the body is sent.
+    Every log record of the request carries its X-Request-ID.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope , receive , send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stages, token = start_request()
+        request_id = _request_id(scope)
+        request_id_token = set_request_id(request_id)
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing(stages, time.perf_counter() - started))
+                headers[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            process_time = round((time.perf_counter() - started) * 1000, 2)
+            timings = {f"{name}_ms": round(seconds * 1000, 3) for name, seconds in stages.items()}
+            logger.info(
+                "method=%s path=%s status_code=%s duration_ms=%s",
+                scope["method"],
+                scope["path"],
+                status_code,
+                process_time,
+                extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status_code": status_code,
+                    "duration_ms": process_time,
+                    **timings,
+                }
+            )
+            end_request(token)
+            reset_request_id(request_id_token)
@@ -1,7 +1,18 @@
-from pydantic import BaseModel
+from typing import List
+from pydantic import BaseModel,Field
+from app.core.config import settings
 
 class ModelInputSchema(BaseModel):
     sepal_length:float
     sepal_width:float
     petal_length:float
-    petal_width: float
\ No newline at end of file
+    petal_width: float
+
+# Column order the model was trained with
+FEATURE_COLUMNS = list(ModelInputSchema.model_fields)
+
+class ModelBatchInputSchema(BaseModel):
+    rows: List[ModelInputSchema] = Field(
+        min_length=1,
+        max_length=settings.PREDICT_BATCH_MAX_ROWS
+    )
\ No newline at end of file
@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import time
+from app.core.metrics import PREDICT_BATCH_SIZE,PREDICT_BATCH_QUEUE_WAIT
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Collects single rows that arrive within a short window and runs
+    them through `run_batch` as one matrix.
+    A batch is flushed when it reaches `max_batch_size` rows or when
+    `window_ms` has passed since its first row , whichever comes first.
+    """
+
+    def __init__(self, run_batch, max_batch_size:int , window_ms:float):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.window = window_ms / 1000
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+
+    async def submit(self, row:dict):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        items, self._pending = self._pending, []
+        if items:
+            # Each batch runs in its own task so the next window can start filling right away
+            task = asyncio.ensure_future(self._run(items))
+            # Keep a reference so the task is not garbage collected mid flight
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, items:list):
+        started = time.perf_counter()
+        PREDICT_BATCH_SIZE.observe(len(items))
+        for _, _, enqueued in items:
+            PREDICT_BATCH_QUEUE_WAIT.observe(started - enqueued)
+
+        try:
+            results = await self.run_batch([row for row, _, _ in items])
+        except Exception as e:
+            logger.error("Micro batch prediction failed", exc_info=True)
+            for _, future, _ in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import time
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import engine
+from app.core.metrics import HEALTH_DEPENDENCY_UP,HEALTH_DEPENDENCY_LATENCY
+from app.core.model_loader import is_model_ready,get_current_handle
+from app.core.redis_pool import get_redis
+from app.services.model_reloader import get_last_reload_seconds
+
+logger = logging.getLogger(__name__)
+
+
+async def _check_postgres():
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+async def _check_redis():
+    await get_redis().ping()
+
+async def _check_model():
+    # With MODEL_EAGER_LOAD=false the model loads on the first request instead
+    if settings.MODEL_EAGER_LOAD and not is_model_ready():
+        raise RuntimeError("Model not loaded or warming up")
+
+
+class HealthMonitor:
+    """
+    Probes every dependency in the background and keeps the result in memory.
+
+    Health endpoints only read the snapshot , so probe cost stays constant
+    however often the orchestrator polls. Each check has its own timeout ,
+    a hanging dependency is reported as down instead of stalling the loop.
+    A snapshot older than three intervals counts as not ready.
+    """
+
+    CHECKS = {
+        "postgres": _check_postgres,
+        "redis": _check_redis,
+        "model": _check_model,
+    }
+
+    def __init__(self, interval:float , timeout:float):
+        self.interval = interval
+        self.timeout = timeout
+        self.snapshot = None
+        self._task = None
+
+    async def _probe(self, name:str , check) -> dict:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(check(), timeout=self.timeout)
+            status = {"ok": True}
+        except asyncio.TimeoutError:
+            status = {"ok": False, "error": f"timed out after {self.timeout:g}s"}
+        except Exception as e:
+            status = {"ok": False, "error": str(e) or type(e).__name__}
+
+        status["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        HEALTH_DEPENDENCY_UP.labels(dependency=name).set(1 if status["ok"] else 0)
+        HEALTH_DEPENDENCY_LATENCY.labels(dependency=name).set(status["latency_ms"] / 1000)
+        return status
+
+    async def refresh(self) -> dict:
+        results = await asyncio.gather(*(self._probe(name, check) for name, check in self.CHECKS.items()))
+        dependencies = dict(zip(self.CHECKS, results))
+
+        current = get_current_handle()
+        self.snapshot = {
+            "status": "ok" if all(result["ok"] for result in results) else "degraded",
+            "checked_at": time.time(),
+            "dependencies": dependencies,
+            "model_version": current.version if current is not None else None,
+            "last_reload_seconds": get_last_reload_seconds(),
+        }
+        return self.snapshot
+
+    def is_ready(self) -> bool:
+        snapshot = self.snapshot
+        if snapshot is None or snapshot["status"] != "ok":
+            return False
+        return time.time() - snapshot["checked_at"] <= 3 * self.interval
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.error("Health snapshot refresh failed", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+health_monitor = HealthMonitor(
+    interval=settings.HEALTH_CHECK_INTERVAL,
+    timeout=settings.HEALTH_CHECK_TIMEOUT,
+)
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import time
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.metrics import MODEL_RELOAD_SECONDS
+from app.core.model_loader import (
+    get_current_handle,get_candidate_handle,install_model,install_candidate,is_model_ready,set_model_ready,
+    load_model_version,resolve_production_version,resolve_candidate_version
+)
+from app.services.model_service import warm_model_handle,warmup_model
+
+logger = logging.getLogger(__name__)
+
+_last_reload_seconds = None
+
+
+def get_last_reload_seconds():
+    return _last_reload_seconds
+
+def warmup_pending() -> bool:
+    # Startup warmup failed (registry down , bad artifacts) and readiness is still down
+    return settings.MODEL_EAGER_LOAD and not is_model_ready()
+
+async def retry_warmup() -> bool:
+    """
+    Repeats the startup warmup while readiness is down , a handle that was
+    loaded lazily in the meantime is reused and only warmed.
+    """
+    if not warmup_pending():
+        return False
+    handle = await warmup_model()
+    logger.info("Model warmup recovered , reporting ready", extra={"version": handle.version})
+    return True
+
+async def reload_model_if_changed() -> bool:
+    """
+    Loads and warms a newly promoted Production version off the request
+    path , then swaps it in. Requests already holding the old handle finish
+    on the old model.
+    """
+    global _last_reload_seconds
+
+    version = await run_in_threadpool(resolve_production_version)
+    # Never loads on the event loop , a missing handle is loaded below like a new version
+    current = get_current_handle()
+    current_version = current.version if current is not None else None
+    if version == current_version:
+        return False
+
+    logger.info(
+        "New Production model version detected",
+        extra={"current_version": current_version, "new_version": version}
+    )
+    started = time.perf_counter()
+    handle = await run_in_threadpool(load_model_version, version)
+    await warm_model_handle(handle)
+    install_model(handle)
+    # The installed handle is warm , a pod whose startup warmup failed is ready now
+    set_model_ready(True)
+
+    _last_reload_seconds = time.perf_counter() - started
+    MODEL_RELOAD_SECONDS.set(_last_reload_seconds)
+    logger.info(
+        "Model hot reloaded",
+        extra={
+            "previous_version": current_version,
+            "version": handle.version,
+            "seconds": round(_last_reload_seconds, 3),
+        }
+    )
+    return True
+
+def candidate_enabled() -> bool:
+    return settings.MODEL_CANARY_FRACTION > 0 or settings.MODEL_SHADOW_ENABLED
+
+async def reload_candidate_if_changed() -> bool:
+    """
+    Keeps the candidate handle in step with MODEL_CANDIDATE_STAGE.
+    A new candidate is warmed before it receives canary or shadow traffic ,
+    it is unloaded once the stage is empty or got promoted to Production.
+    """
+    if not candidate_enabled():
+        return False
+
+    version = await run_in_threadpool(resolve_candidate_version)
+    current = get_candidate_handle()
+    if version == (current.version if current is not None else None):
+        return False
+
+    if version is None:
+        install_candidate(None)
+        logger.info("Candidate model unloaded", extra={"version": current.version})
+        return True
+
+    handle = await run_in_threadpool(load_model_version, version)
+    await warm_model_handle(handle)
+    install_candidate(handle)
+    logger.info(
+        "Candidate model loaded",
+        extra={
+            "version": handle.version,
+            "canary_fraction": settings.MODEL_CANARY_FRACTION,
+            "shadow": settings.MODEL_SHADOW_ENABLED,
+        }
+    )
+    return True
+
+async def startup_model_load():
+    """
+    Startup load and warmup of Production and the candidate , run as a task
+    from lifespan so the server listens (and /health/live answers) while the
+    registry is slow or down. /health/ready reports 503 until the warmup
+    finished (and the next health snapshot saw it) , then the task carries
+    on as the reload loop.
+    """
+    if settings.MODEL_EAGER_LOAD:
+        try:
+            await warmup_model()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Keep serving , readiness stays down until the reload loop's warmup retry succeeds
+            logger.critical("Model warmup failed", exc_info=True)
+        try:
+            await reload_candidate_if_changed()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Production keeps serving alone , the reload loop retries the candidate
+            logger.error("Candidate model load failed", exc_info=True)
+    await model_reload_loop()
+
+async def model_reload_loop():
+    """
+    Polls the registry every MODEL_RELOAD_INTERVAL seconds , failures only skip one round.
+    While a failed startup warmup keeps readiness down the warmup is retried
+    every MODEL_WARMUP_RETRY_INTERVAL seconds first. With hot reload disabled
+    the loop ends once the model is ready.
+    """
+    while True:
+        pending = warmup_pending()
+        if not pending and settings.MODEL_RELOAD_INTERVAL <= 0:
+            return
+        await asyncio.sleep(settings.MODEL_WARMUP_RETRY_INTERVAL if pending else settings.MODEL_RELOAD_INTERVAL)
+        try:
+            await retry_warmup()
+            if settings.MODEL_RELOAD_INTERVAL <= 0:
+                continue
+            await reload_model_if_changed()
+            await reload_candidate_if_changed()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.error("Model hot reload failed , keeping current version", exc_info=True)
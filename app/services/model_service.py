@@ -1,29 +1,170 @@
+import asyncio
+import time
+from collections import Counter
+from functools import partial
 from app.core.config import settings
-import pandas as pd
-from app.cache.redis_cache import get_cached_prediction,set_cached_prediction
-from app.core.security import make_cache_key
-from app.core.dependecies import get_model
+import numpy as np
 from fastapi.concurrency import run_in_threadpool
+from app.cache.prediction_cache import get_cached_prediction,set_cached_prediction,get_cached_predictions,set_cached_predictions
+from app.core.security import make_cache_key,make_binary_cache_key
+from app.core.model_loader import get_model_handle,get_candidate_handle,choose_handle,set_model_ready
+from app.core.metrics import MODEL_WARMUP_SECONDS,MODEL_PREDICT_LATENCY,MODEL_PREDICTIONS,MODEL_PREDICT_BATCH_ROWS,MODEL_PREDICTED_CLASS,labelled
+from app.core.inference_executor import inference_executor
+from app.core.decision_table import get_decision_table,prepare_decision_table
+from app.core.request_timing import timed_stage
+from app.schemas.model_schema import FEATURE_COLUMNS
+from app.services.batcher import MicroBatcher
+from app.services.shadow import ShadowMirror
+
+# Every request grabs its ModelHandle once (Production or canary) and uses it for
+# both the prediction and the cache key , so a hot reload never mixes versions.
+# Request stages are timed here at the call sites , not inside _predict_rows ,
+# which also runs on batcher and shadow tasks that belong to no single request.
+
+async def _predict_rows(rows:list , handle , role:str = "primary"):
+    started = time.perf_counter()
+    matrix = _to_matrix(rows)
+    table = get_decision_table(handle)
+    if table is None:
+        predictions = await inference_executor.predict(matrix, handle)
+    else:
+        # Only rows outside the precomputed grid reach the real model
+        predictions, in_grid = table.lookup(matrix)
+        if not in_grid.all():
+            predictions[~in_grid] = await inference_executor.predict(matrix[~in_grid], handle)
+
+    labelled(MODEL_PREDICT_LATENCY, handle.version, role).observe(time.perf_counter() - started)
+    labelled(MODEL_PREDICTIONS, handle.version, role).inc(len(rows))
+    labelled(MODEL_PREDICT_BATCH_ROWS, role).observe(len(rows))
+    return [int(prediction) for prediction in predictions]
+
+# One batcher per model version and role , batches queued before a swap finish on their own version
+_batchers = {}
+
+def _get_batcher(handle , role:str) -> MicroBatcher:
+    batcher = _batchers.get((handle.version, role))
+    if batcher is None:
+        # Drop batchers of versions that are no longer served
+        live = {handle.version, get_model_handle().version}
+        for key in [key for key in _batchers if key[0] not in live]:
+            del _batchers[key]
+        batcher = _batchers[(handle.version, role)] = MicroBatcher(
+            partial(_predict_rows, handle=handle, role=role),
+            max_batch_size=settings.PREDICT_MICRO_BATCH_MAX_SIZE,
+            window_ms=settings.PREDICT_MICRO_BATCH_WINDOW_MS,
+        )
+    return batcher
+
+_shadow = ShadowMirror(partial(_predict_rows, role="shadow"), settings.MODEL_SHADOW_QUEUE_SIZE)
+
+def _mirror_to_shadow(role:str , rows:list , results:list):
+    # Only Production answers are mirrored , the candidate already served canary requests
+    if role != "primary" or not settings.MODEL_SHADOW_ENABLED:
+        return
+    candidate = get_candidate_handle()
+    if candidate is not None:
+        _shadow.submit(candidate, rows, [result["prediction"] for result in results])
+
+def _count_classes(model_version:str , results:list):
+    # Served answers (cache hits included) , shadow predictions are never counted
+    for prediction, count in Counter(result["prediction"] for result in results).items():
+        labelled(MODEL_PREDICTED_CLASS, model_version, str(prediction)).inc(count)
+
+def _cache_key(data:dict , model_version:str):
+    # Keys are scoped to the model version so a new model never serves stale entries
+    if settings.CACHE_KEY_SCHEME == "binary":
+        return make_binary_cache_key(data, model_version, settings.CACHE_KEY_QUANTUM)
+    return make_cache_key({**data, "model_version": model_version})
 
 async def predict_flower(data:dict):
-    key = make_cache_key(data)
-    cached_result = await get_cached_prediction(key)
+    handle, role = choose_handle()
+    key = _cache_key(data, handle.version)
+    with timed_stage("cache"):
+        cached_result = await get_cached_prediction(key)
     if cached_result :
+        _count_classes(handle.version, [cached_result])
+        _mirror_to_shadow(role, [data], [cached_result])
         return cached_result
-    model = get_model()
-    prediction = await run_in_threadpool(
-        _run_model_prediction,
-        model,
-        data,
-    )
+    with timed_stage("inference"):
+        # An active decision table answers in O(1) , waiting for a batch would only add latency.
+        # A refused or not yet built table leaves every row to the model , so batching stays on.
+        if settings.PREDICT_MICRO_BATCHING and get_decision_table(handle) is None:
+            # Concurrent calls are merged into one model.predict by the batcher
+            prediction = await _get_batcher(handle, role).submit(data)
+        else:
+            prediction = (await _predict_rows([data], handle, role))[0]
     result = {"prediction": prediction}
     await set_cached_prediction(key,result)
+    _count_classes(handle.version, [result])
+    _mirror_to_shadow(role, [data], [result])
 
     return result
 
-def _run_model_prediction(model , data:dict):
-    df = pd.DataFrame([data])
-    return int(model.predict(df)[0])
+async def predict_flowers_batch(rows:list):
+    handle, role = choose_handle()
+    keys = [_cache_key(row, handle.version) for row in rows]
+    with timed_stage("cache"):
+        results = await get_cached_predictions(keys)
+
+    # Only the cache misses are sent to the model , in one predict call
+    miss_indexes = [i for i,result in enumerate(results) if not result]
+    if miss_indexes:
+        with timed_stage("inference"):
+            predictions = await _predict_rows([rows[i] for i in miss_indexes], handle, role)
+        new_results = {}
+        for i,prediction in zip(miss_indexes,predictions):
+            results[i] = {"prediction": prediction}
+            new_results[keys[i]] = results[i]
+        await set_cached_predictions(new_results)
+
+    _count_classes(handle.version, results)
+    _mirror_to_shadow(role, rows, results)
+    return results
+
+def _to_matrix(rows:list) -> np.ndarray:
+    # Compact float32 matrix , cheap to hand to a worker process
+    return np.array(
+        [[row[column] for column in FEATURE_COLUMNS] for row in rows],
+        dtype=np.float32
+    )
+
+async def warm_model_handle(handle):
+    """
+    Pushes synthetic rows through the full predict path (executor , engine ,
+    decision table) for `handle` , so real requests do not pay for cold
+    code paths , lazy imports or per worker model loads. The decision table
+    for the version is opened or built first , while the model is loading.
+    """
+    await prepare_decision_table(handle)
+    rng = np.random.default_rng(0)
+    for _ in range(settings.MODEL_WARMUP_ITERATIONS):
+        for size in (1, 8, 64):
+            rows = [
+                dict(zip(FEATURE_COLUMNS, map(float, rng.uniform(0.1, 7.9, len(FEATURE_COLUMNS)))))
+                for _ in range(size)
+            ]
+            await _predict_rows(rows, handle)
+
+    # Concurrent calls make a process pool spawn , and load the model in , every worker
+    matrix = _to_matrix(rows[:1])
+    await asyncio.gather(
+        *(inference_executor.predict(matrix, handle) for _ in range(inference_executor.workers))
+    )
+
+async def close_shadow():
+    await _shadow.close()
 
+async def warmup_model():
+    """
+    Loads and warms the Production model at startup.
+    Readiness is only reported once this finishes.
+    """
+    set_model_ready(False)
+    handle = await run_in_threadpool(get_model_handle)
 
+    started = time.perf_counter()
+    await warm_model_handle(handle)
 
+    MODEL_WARMUP_SECONDS.set(time.perf_counter() - started)
+    set_model_ready(True)
+    return handle
@@ -0,0 +1,256 @@
+import asyncio
+import codecs
+import csv
+import json
+import logging
+import multiprocessing
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass,field
+from datetime import datetime, timezone
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import dialect_insert
+from app.core.security import hash_password
+from app.db.models.users import User
+from app.schemas.users_auth import UserCreate
+
+logger = logging.getLogger(__name__)
+
+INPUT_FORMATS = ("csv", "jsonl")
+USER_COLUMNS = ("id", "username", "email", "password_hash", "is_active", "created_at", "updated_at")
+# SQLite before 3.32 binds at most 999 parameters per statement , one per column and row
+SQLITE_MAX_VARIABLES = 999
+INSERT_SLICE_ROWS = SQLITE_MAX_VARIABLES // len(USER_COLUMNS)
+
+_hash_pool = None
+
+
+@dataclass
+class ProvisionReport:
+    created:int = 0
+    duplicates:list = field(default_factory=list)
+    invalid:list = field(default_factory=list)
+    seconds:float = 0.0
+
+    @property
+    def users_per_sec(self) -> float:
+        return self.created / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "created": self.created,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "seconds": round(self.seconds, 3),
+            "users_per_sec": round(self.users_per_sec, 1),
+        }
+
+
+# Input
+
+async def _records(lines , input_format:str):
+    """
+    Groups text lines into records -> (first line number , [lines]).
+    A JSON record is one line , a quoted CSV field may span several lines ,
+    so CSV lines are collected until their quotes balance.
+    """
+    record = []
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not record and not line.strip():
+            continue
+        record.append(line)
+        if input_format == "csv" and sum(part.count('"') for part in record) % 2:
+            continue
+        yield line_number - len(record) + 1, record
+        record = []
+    if record:
+        # Unterminated quote , csv.reader reports it
+        yield line_number - len(record) + 1, record
+
+async def parse_users(lines , input_format:str):
+    """
+    Validates rows from an async iterator of text lines (CSV with a header
+    row , or JSON lines , one record per line) with the signup schema.
+    Yields (line_number , UserCreate) , or (line_number , error message).
+    """
+    if input_format not in INPUT_FORMATS:
+        raise ValueError(f"Unknown input format: {input_format}")
+
+    header = None
+    async for line_number, record in _records(lines, input_format):
+        try:
+            if input_format == "jsonl":
+                row = json.loads(record[0])
+            else:
+                fields = next(csv.reader((line + "\n" for line in record), strict=True))
+                if header is None:
+                    header = fields
+                    continue
+                row = dict(zip(header, fields))
+            yield line_number, UserCreate.model_validate(row)
+        except ValidationError as e:
+            yield line_number, "; ".join(error["msg"] for error in e.errors())
+        except (ValueError, csv.Error) as e:
+            # Broken JSON or CSV record
+            yield line_number, str(e)
+
+async def iter_lines(chunks):
+    # Bytes chunks (an HTTP body stream or a file) -> text lines.
+    # Incremental decoder , a chunk boundary may split a multi byte character.
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+# Hashing
+
+def _hash_many(passwords:list) -> list:
+    return [hash_password(password) for password in passwords]
+
+def _get_hash_pool() -> ProcessPoolExecutor:
+    global _hash_pool
+    if _hash_pool is None:
+        # Separate from the interactive bcrypt pool , bulk jobs must not queue ahead of logins
+        _hash_pool = ProcessPoolExecutor(
+            max_workers=settings.PROVISION_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _hash_pool
+
+def shutdown_hash_pool():
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=True, cancel_futures=True)
+        _hash_pool = None
+
+async def hash_passwords(passwords:list) -> list:
+    # One chunk per worker , bcrypt is CPU bound so processes sidestep the GIL
+    workers = settings.PROVISION_HASH_WORKERS
+    size = -(-len(passwords) // workers)
+    loop = asyncio.get_running_loop()
+    chunks = await asyncio.gather(*(
+        loop.run_in_executor(_get_hash_pool(), _hash_many, passwords[start:start + size])
+        for start in range(0, len(passwords), size)
+    ))
+    return [password_hash for chunk in chunks for password_hash in chunk]
+
+
+# Loading
+
+async def _copy_users(db:AsyncSession , rows:list) -> set:
+    """
+    PostgreSQL -> COPY into a temporary staging table , then one
+    INSERT ... SELECT that skips emails already taken. Returns the inserted emails.
+    Needs the asyncpg driver , its test only runs with TEST_POSTGRES_URL set.
+    """
+    await db.execute(text(
+        "CREATE TEMP TABLE users_staging (LIKE users INCLUDING DEFAULTS) ON COMMIT DROP"
+    ))
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        "users_staging",
+        records=[tuple(row[column] for column in USER_COLUMNS) for row in rows],
+        columns=USER_COLUMNS,
+    )
+
+    columns = ", ".join(USER_COLUMNS)
+    result = await db.execute(text(
+        f"INSERT INTO users ({columns}) SELECT {columns} FROM users_staging "
+        "ON CONFLICT (email) DO NOTHING RETURNING email"
+    ))
+    return set(result.scalars())
+
+async def _insert_users(db:AsyncSession , rows:list) -> set:
+    # Other databases (SQLite in local runs) -> multi row INSERT ... ON CONFLICT DO NOTHING ,
+    # in slices that stay under SQLite's bound parameter limit
+    inserted = set()
+    for start in range(0, len(rows), INSERT_SLICE_ROWS):
+        stmt = (
+            dialect_insert(db, User)
+            .values(rows[start:start + INSERT_SLICE_ROWS])
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User.email)
+        )
+        result = await db.execute(stmt)
+        inserted.update(result.scalars())
+    return inserted
+
+async def load_users(db:AsyncSession , rows:list) -> set:
+    if db.get_bind().dialect.name == "postgresql":
+        inserted = await _copy_users(db, rows)
+    else:
+        inserted = await _insert_users(db, rows)
+    await db.commit()
+    return inserted
+
+async def _provision_batch(db:AsyncSession , users:list , report:ProvisionReport):
+    hashes = await hash_passwords([user.password for user in users])
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "username": user.username,
+            "email": user.email,
+            "password_hash": password_hash,
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for user, password_hash in zip(users, hashes)
+    ]
+
+    inserted = await load_users(db, rows)
+    report.created += len(inserted)
+    # Taken before this batch , or repeated inside it
+    for row in rows:
+        if row["email"] in inserted:
+            inserted.discard(row["email"])
+        else:
+            report.duplicates.append(row["email"])
+
+async def provision_users(db:AsyncSession , lines , input_format:str , batch_size:int = None) -> ProvisionReport:
+    """
+    Streams users from `lines` into the users table in batches.
+    Invalid rows and duplicate emails are reported , they never abort a batch.
+    """
+    batch_size = batch_size or settings.PROVISION_BATCH_SIZE
+    report = ProvisionReport()
+    started = time.perf_counter()
+
+    batch = []
+    async for line_number, user in parse_users(lines, input_format):
+        if isinstance(user, str):
+            report.invalid.append({"line": line_number, "error": user})
+            continue
+        batch.append(user)
+        if len(batch) >= batch_size:
+            await _provision_batch(db, batch, report)
+            batch = []
+    if batch:
+        await _provision_batch(db, batch, report)
+
+    report.seconds = time.perf_counter() - started
+    logger.info(
+        "Bulk provisioning finished",
+        extra={
+            "users_created": report.created,
+            "duplicates": len(report.duplicates),
+            "invalid": len(report.invalid),
+            "users_per_sec": round(report.users_per_sec, 1),
+        }
+    )
+    return report
@@ -0,0 +1,52 @@
+import asyncio
+import logging
+from app.core.metrics import SHADOW_COMPARISONS,SHADOW_DROPPED
+
+logger = logging.getLogger(__name__)
+
+
+class ShadowMirror:
+    """
+    Replays Production requests against a candidate model in the background.
+
+    `submit` never waits , rows go into a bounded queue and are dropped
+    (and counted) when the queue is full , so a slow candidate can not add
+    latency or memory pressure to the response path.
+    One worker task drains the queue and compares each shadow prediction
+    with the one Production returned.
+    """
+
+    def __init__(self, run_batch, max_queue:int):
+        self.run_batch = run_batch
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._task = None
+
+    def submit(self, handle , rows:list , predictions:list):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._worker())
+        try:
+            self._queue.put_nowait((handle, rows, predictions))
+        except asyncio.QueueFull:
+            SHADOW_DROPPED.inc()
+
+    async def _worker(self):
+        while True:
+            handle, rows, predictions = await self._queue.get()
+            try:
+                shadow_predictions = await self.run_batch(rows, handle)
+                agreed = sum(a == b for a, b in zip(predictions, shadow_predictions))
+                SHADOW_COMPARISONS.labels(version=handle.version, result="agree").inc(agreed)
+                SHADOW_COMPARISONS.labels(version=handle.version, result="disagree").inc(len(rows) - agreed)
+            except Exception:
+                logger.error("Shadow prediction failed", extra={"version": handle.version}, exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
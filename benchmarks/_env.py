@@ -0,0 +1,14 @@
+import os
+
+# Benchmarks import app modules directly , give the required settings harmless defaults
+# so they run without a .env file. Real values from the environment always win.
+BENCHMARK_ENV = {
+    "API_KEY": "benchmark-api-key",
+    "JWT_ACCESS_SECRET_KEY": "benchmark-access-secret",
+    "JWT_REFRESH_SECRET_KEY": "benchmark-refresh-secret",
+    "MLFLOW_TRACKING_URI": "file:///tmp/mlruns",
+    "DATABASE_URL": "sqlite+aiosqlite:////tmp/iris-benchmark.db",
+}
+
+for name, value in BENCHMARK_ENV.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,56 @@
+"""
+Cost of the access token dependency per request.
+
+    python -m benchmarks.bench_auth [--requests 20000]
+
+before -> sync dependency , FastAPI runs it in the threadpool and jwt.decode verifies every call
+after  -> async get_current_user with the verified token cache (one token reused , as a busy client does)
+miss   -> async get_current_user with a fresh token every call
+"""
+import argparse
+import asyncio
+import time
+import benchmarks._env  # noqa: F401
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import HTTPAuthorizationCredentials
+from app.core.dependecies import get_current_user
+from app.core.security import create_access_tokens,verify_access_token
+
+
+def get_current_user_uncached(credentials:HTTPAuthorizationCredentials):
+    # The dependency as it was , minus the HTTPException branch
+    return verify_access_token(credentials.credentials)["sub"]
+
+async def measure(call , requests:int) -> float:
+    started = time.perf_counter()
+    for i in range(requests):
+        await call(i)
+    return (time.perf_counter() - started) / requests
+
+async def run(requests:int):
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_tokens("bench-user"))
+    fresh = [
+        HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_tokens(f"user-{i}"))
+        for i in range(requests)
+    ]
+
+    cases = {
+        "before": lambda i: run_in_threadpool(get_current_user_uncached, credentials),
+        "after": lambda i: get_current_user(credentials),
+        "miss": lambda i: get_current_user(fresh[i]),
+    }
+
+    print(f"{requests} requests\n")
+    print(f"{'case':<10}{'us/request':>12}")
+    for name, call in cases.items():
+        print(f"{name:<10}{await measure(call, requests) * 1e6:>12.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
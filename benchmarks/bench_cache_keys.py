@@ -0,0 +1,74 @@
+"""
+Compares prediction cache key schemes.
+
+    python -m benchmarks.bench_cache_keys [--traffic requests.jsonl] [--quantum 0.01]
+
+Reports the cost of building one key and the hit rate when the traffic is
+replayed through an unbounded cache. The traffic file holds one JSON object
+with the four iris features per line , without one a synthetic stream of
+iris measurements with small sensor jitter is used.
+"""
+import argparse
+import json
+import timeit
+import benchmarks._env  # noqa: F401
+import numpy as np
+from sklearn.datasets import load_iris
+from app.core.security import make_cache_key,make_binary_cache_key
+from app.schemas.model_schema import FEATURE_COLUMNS
+
+MODEL_VERSION = "1"
+
+
+def synthetic_traffic(size:int , jitter:float , seed:int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    base = load_iris().data
+    picks = base[rng.integers(0, len(base), size)]
+    noisy = np.round(picks + rng.normal(0, jitter, picks.shape), 5)
+    return [dict(zip(FEATURE_COLUMNS, map(float, row))) for row in noisy]
+
+def load_traffic(path:str) -> list:
+    with open(path) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [{column: float(row[column]) for column in FEATURE_COLUMNS} for row in rows]
+
+def hit_rate(keys:list) -> float:
+    seen = set()
+    hits = 0
+    for key in keys:
+        if key in seen:
+            hits += 1
+        seen.add(key)
+    return hits / len(keys)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--traffic", help="JSONL file with one feature row per line")
+    parser.add_argument("--size", type=int, default=50000, help="synthetic traffic size")
+    parser.add_argument("--jitter", type=float, default=0.005, help="synthetic sensor noise in cm")
+    parser.add_argument("--quantum", type=float, default=0.01, help="quantization step in cm")
+    args = parser.parse_args()
+
+    rows = load_traffic(args.traffic) if args.traffic else synthetic_traffic(args.size, args.jitter)
+    sample = rows[0]
+
+    schemes = {
+        "json+sha256": lambda row: make_cache_key({**row, "model_version": MODEL_VERSION}),
+        "binary": lambda row: make_binary_cache_key(row, MODEL_VERSION),
+        f"binary q={args.quantum:g}": lambda row: make_binary_cache_key(row, MODEL_VERSION, args.quantum),
+    }
+
+    print(f"{len(rows)} requests\n")
+    print(f"{'scheme':<20}{'ns/key':>10}{'key bytes':>12}{'hit rate':>10}")
+    for name, build in schemes.items():
+        loops = 100000
+        seconds = timeit.timeit(lambda: build(sample), number=loops)
+        keys = [build(row) for row in rows]
+        print(
+            f"{name:<20}{seconds / loops * 1e9:>10.0f}"
+            f"{len(build(sample)):>12}{hit_rate(keys):>10.2%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
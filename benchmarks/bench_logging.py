@@ -0,0 +1,132 @@
+"""
+/predict throughput with request logging disabled , on the event loop and queued.
+
+    python -m benchmarks.bench_logging [--requests 20000] [--concurrency 16] [--sample-rate 0.1] [--rounds 3]
+
+Drives POST /predict of app.main:app straight through its ASGI interface.
+Auth and rate limiting are overridden and the model call is stubbed , so
+what is left is the framework , the middleware and logging.
+
+disabled -> logging.disable() , the ceiling
+file     -> RotatingFileHandler on the root logger , text lines (the previous setup)
+queue    -> RequestQueueHandler + RequestQueueListener + JsonFileHandler , JSON lines (app.core.logging_config)
+sampled  -> queue , keeping --sample-rate of the successful response_logger lines
+
+Each variant reports its best of --rounds runs. Log files go to a temporary directory.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import queue
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+import benchmarks._env  # noqa: F401
+from app.api import routes_predict
+from app.core.dependecies import get_current_user
+from app.core.logging_config import JsonFileHandler,JsonFormatter,RequestQueueHandler,RequestQueueListener,SuccessSampler
+from app.core.rate_limiter import RateLimitResult,predict_rate_limiter
+from app.main import app
+
+BODY = json.dumps({"sepal_length": 5.1, "sepal_width": 3.5, "petal_length": 1.4, "petal_width": 0.2}).encode()
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "POST",
+    "scheme": "http",
+    "path": "/predict",
+    "raw_path": b"/predict",
+    "root_path": "",
+    "query_string": b"",
+    "headers": [(b"host", b"bench"), (b"content-type", b"application/json"), (b"content-length", str(len(BODY)).encode())],
+    "client": ("127.0.0.1", 50000),
+    "server": ("bench", 80),
+}
+
+
+async def stub_predict_flower(data:dict):
+    return {"prediction": 0}
+
+async def request():
+    async def receive():
+        return {"type": "http.request", "body": BODY, "more_body": False}
+
+    status = []
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(dict(SCOPE), receive, send)
+    assert status == [200], status
+
+async def run(requests:int , concurrency:int) -> float:
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await request()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - started)
+
+
+def file_handler(directory:str , name:str , formatter:logging.Formatter , handler_class=RotatingFileHandler) -> RotatingFileHandler:
+    handler = handler_class(os.path.join(directory, name), maxBytes=1024*1024*5, backupCount=5, encoding="utf-8")
+    handler.setFormatter(formatter)
+    return handler
+
+def configure(variant:str , directory:str , sample_rate:float):
+    # Returns the listener to stop , if any
+    root = logging.getLogger()
+    root.handlers = []
+    logging.disable(logging.CRITICAL if variant == "disabled" else logging.NOTSET)
+    if variant == "file":
+        root.addHandler(file_handler(directory, "file.log", logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')))
+        return None
+    if variant in ("queue", "sampled"):
+        handler = RequestQueueHandler(queue.Queue(maxsize=100000))
+        handler.addFilter(SuccessSampler(sample_rate if variant == "sampled" else 1.0, ["response_logger"]))
+        root.addHandler(handler)
+        listener = RequestQueueListener(handler.queue, file_handler(directory, f"{variant}.log", JsonFormatter(), JsonFileHandler))
+        listener.start()
+        return listener
+    return None
+
+async def main_async(args):
+    app.dependency_overrides[get_current_user] = lambda: "bench-user"
+    app.dependency_overrides[predict_rate_limiter] = lambda: RateLimitResult(limit=0, remaining=0)
+    routes_predict.predict_flower = stub_predict_flower
+    logging.getLogger().setLevel(logging.INFO)
+
+    print(f"{args.requests} requests , concurrency {args.concurrency}\n")
+    print(f"{'logging':<10}{'req/sec':>10}{'vs disabled':>13}")
+    with tempfile.TemporaryDirectory() as directory:
+        baseline = None
+        for variant in ("disabled", "file", "queue", "sampled"):
+            listener = configure(variant, directory, args.sample_rate)
+            await run(500, args.concurrency)
+            throughput = max([await run(args.requests, args.concurrency) for _ in range(args.rounds)])
+            if listener is not None:
+                listener.stop()
+            baseline = baseline or throughput
+            print(f"{variant:<10}{throughput:>10.0f}{throughput / baseline:>12.0%}")
+    logging.disable(logging.NOTSET)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--sample-rate", type=float, default=0.1)
+    parser.add_argument("--rounds", type=int, default=3)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Login load test -> throughput and database round trips per login.
+
+    python -m benchmarks.bench_login [--users 50] [--logins 2000] [--concurrency 8]
+
+Drives POST /auth/login through the ASGI app against the configured
+DATABASE_URL (a local SQLite file by default , point it at PostgreSQL for
+real numbers). Rate limiting is bypassed and bcrypt runs at cost 4 so the
+database path dominates.
+
+before -> refresh token persisted with a SELECT followed by an ORM insert / update
+after  -> one INSERT ... ON CONFLICT DO UPDATE (store_refresh_token)
+
+Round trips are the statements plus the COMMIT the engine sends per login.
+"""
+import os
+
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import argparse
+import asyncio
+import time
+import uuid
+import benchmarks._env  # noqa: F401
+import httpx
+from sqlalchemy import event,select
+from app.api import routes_auth
+from app.core.database import AsyncSessionLocal,Base,engine
+from app.core.rate_limiter import RateLimitResult,login_rate_limiter
+from app.core.security import hash_password
+from app.db.models.refresh_token import RefreshToken
+from app.db.models.users import User
+from app.main import app
+
+PASSWORD = "Benchmark#Pass1"
+
+
+async def legacy_store_refresh_token(db , user_id , hashed_token:str , expires_at):
+    # The persistence path login used before the upsert
+    result = await db.execute(select(RefreshToken).where(RefreshToken.user_id == user_id))
+    existing_token = result.scalar_one_or_none()
+    if existing_token:
+        existing_token.token = hashed_token
+        existing_token.expires_at = expires_at
+    else:
+        db.add(RefreshToken(user_id=user_id, token=hashed_token, expires_at=expires_at))
+
+
+class RoundTrips:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._statement)
+        event.listen(engine.sync_engine, "commit", self._commit)
+
+    def _statement(self, *args):
+        self.count += 1
+
+    def _commit(self, *args):
+        self.count += 1
+
+
+def tune_sqlite():
+    # WAL without fsync per commit , otherwise the disk flush dominates every login
+    @event.listens_for(engine.sync_engine, "connect")
+    def _pragmas(connection, _):
+        cursor = connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.close()
+
+async def create_users(count:int) -> list:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    password_hash = hash_password(PASSWORD)
+    emails = [f"bench-{i}-{uuid.uuid4().hex[:8]}@example.com" for i in range(count)]
+    async with AsyncSessionLocal() as db:
+        db.add_all(User(username=email, email=email, password_hash=password_hash) for email in emails)
+        await db.commit()
+    return emails
+
+async def run(client , emails:list , logins:int , concurrency:int , round_trips:RoundTrips):
+    queue = asyncio.Queue()
+    for i in range(logins):
+        queue.put_nowait(emails[i % len(emails)])
+
+    async def worker():
+        while not queue.empty():
+            email = queue.get_nowait()
+            response = await client.post("/auth/login", json={"email": email, "password": PASSWORD})
+            assert response.status_code == 200, response.text
+
+    before = round_trips.count
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - started
+    return logins / seconds, (round_trips.count - before) / logins
+
+async def main_async(args):
+    if engine.dialect.name == "sqlite":
+        tune_sqlite()
+    emails = await create_users(args.users)
+    round_trips = RoundTrips()
+
+    app.dependency_overrides[login_rate_limiter] = lambda: RateLimitResult(limit=0, remaining=0)
+    transport = httpx.ASGITransport(app=app)
+    upsert = routes_auth.store_refresh_token
+
+    print(f"{args.logins} logins , {args.users} users , concurrency {args.concurrency} , {engine.dialect.name}\n")
+    print(f"{'path':<8}{'logins/sec':>12}{'round trips':>14}")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, store in (("before", legacy_store_refresh_token), ("after", upsert)):
+            routes_auth.store_refresh_token = store
+            # First pass creates the token rows , the measured pass updates them like repeat logins do
+            await run(client, emails, len(emails), args.concurrency, round_trips)
+            throughput, per_login = await run(client, emails, args.logins, args.concurrency, round_trips)
+            print(f"{name:<8}{throughput:>12.0f}{per_login:>14.2f}")
+
+    routes_auth.store_refresh_token = upsert
+    await engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--logins", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Per request cost of the application metrics , single process and multiprocess mode.
+
+    python -m benchmarks.bench_metrics [--requests 20000]
+
+Replays the metric updates one /predict cache miss performs (auth cache ,
+rate limiter EVALSHA , Redis pool and command timings , cache tiers , model
+latency , batch rows , predicted class) and times them:
+
+single         -> default in-memory values
+multiprocess   -> PROMETHEUS_MULTIPROC_DIR set , values live in mmap files
+                  (measured in a child interpreter , the mode is fixed at import)
+
+The cost is compared with the latency of the cheapest possible /predict ,
+auth , rate limiting and the model stubbed , driven through the ASGI app.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import benchmarks._env  # noqa: F401
+
+MULTIPROCESS_FLAG = "--measure-metrics-only"
+
+
+def predict_request_metrics():
+    # Imported late so a child interpreter picks the value class from its own environment
+    from app.core import metrics
+    from app.core.metrics import labelled
+
+    labelled(metrics.JWT_CACHE_REQUESTS, "hit").inc()
+    # EVALSHA , GET and SETEX -> pool wait , command latency and , in multiprocess
+    # mode only , the pool gauges on release
+    for command in ("EVALSHA", "GET", "SETEX"):
+        metrics.REDIS_POOL_WAIT.observe(0.00002)
+        if metrics.MULTIPROCESS:
+            labelled(metrics.REDIS_POOL_CONNECTIONS, "in_use").set(1)
+            labelled(metrics.REDIS_POOL_CONNECTIONS, "idle").set(9)
+        labelled(metrics.REDIS_COMMAND_LATENCY, command).observe(0.0003)
+    labelled(metrics.CACHE_REQUESTS, "memory", "miss").inc()
+    labelled(metrics.CACHE_REQUESTS, "redis", "miss").inc()
+    labelled(metrics.MODEL_PREDICT_LATENCY, "1", "primary").observe(0.0004)
+    labelled(metrics.MODEL_PREDICTIONS, "1", "primary").inc()
+    labelled(metrics.MODEL_PREDICT_BATCH_ROWS, "primary").observe(1)
+    labelled(metrics.MODEL_PREDICTED_CLASS, "1", "0").inc()
+
+def metrics_cost(requests:int) -> float:
+    for _ in range(1000):
+        predict_request_metrics()
+    started = time.perf_counter()
+    for _ in range(requests):
+        predict_request_metrics()
+    return (time.perf_counter() - started) / requests
+
+def multiprocess_metrics_cost(requests:int) -> float:
+    with tempfile.TemporaryDirectory() as directory:
+        env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": directory}
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_metrics", MULTIPROCESS_FLAG, "--requests", str(requests)],
+            env=env, check=True, capture_output=True, text=True,
+        )
+    return float(output.stdout.split()[-1])
+
+async def predict_latency(requests:int) -> float:
+    from benchmarks.bench_logging import request
+    from app.api import routes_predict
+    from app.core.dependecies import get_current_user
+    from app.core.rate_limiter import RateLimitResult,predict_rate_limiter
+    from app.main import app
+
+    async def stub_predict_flower(data:dict):
+        return {"prediction": 0}
+
+    app.dependency_overrides[get_current_user] = lambda: "bench-user"
+    app.dependency_overrides[predict_rate_limiter] = lambda: RateLimitResult(limit=0, remaining=0)
+    routes_predict.predict_flower = stub_predict_flower
+
+    for _ in range(200):
+        await request()
+    started = time.perf_counter()
+    for _ in range(requests):
+        await request()
+    return (time.perf_counter() - started) / requests
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument(MULTIPROCESS_FLAG, action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure_metrics_only:
+        print(metrics_cost(args.requests))
+        return
+
+    import logging
+    logging.disable(logging.CRITICAL)
+    request_seconds = asyncio.run(predict_latency(min(args.requests, 5000)))
+
+    print(f"cheapest /predict {request_seconds * 1e6:.0f} us\n")
+    print(f"{'mode':<14}{'us/request':>12}{'of /predict':>13}")
+    for name, seconds in (("single", metrics_cost(args.requests)), ("multiprocess", multiprocess_metrics_cost(args.requests))):
+        print(f"{name:<14}{seconds * 1e6:>12.1f}{seconds / request_seconds:>13.1%}")
+
+
+if __name__ == "__main__":
+    main()
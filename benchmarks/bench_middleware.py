@@ -0,0 +1,104 @@
+"""
+Per request overhead of the response logger middleware.
+
+    python -m benchmarks.bench_middleware [--requests 20000]
+
+Drives a one route FastAPI app straight through its ASGI interface (no
+HTTP client , no sockets) so the middleware is the only thing that changes:
+
+none    -> no middleware , the baseline
+before  -> BaseHTTPMiddleware , time.time() , total duration only
+after   -> pure ASGI ResponseLoggerMiddleware with Server-Timing stages
+
+Logging goes to a NullHandler so the file handler does not dominate.
+"""
+import argparse
+import asyncio
+import logging
+import time
+import benchmarks._env  # noqa: F401
+from fastapi import FastAPI,Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.core.request_timing import timed_stage,TimedJSONResponse
+from app.middlewares.response_logger import ResponseLoggerMiddleware
+
+
+class LegacyResponseLoggerMiddleware(BaseHTTPMiddleware):
+    # The middleware as it was before the pure ASGI rewrite
+    async def dispatch(self, request : Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        process_time = round((time.time() - start_time)*1000 , 2)
+        logging.getLogger("response_logger").info(
+            "method=%s path=%s status_code=%s duration_ms=%s",
+            request.method,
+            request.url.path,
+            response.status_code,
+            process_time
+        )
+        return response
+
+
+def build_app(middleware) -> FastAPI:
+    app = FastAPI(default_response_class=TimedJSONResponse)
+    if middleware is not None:
+        app.add_middleware(middleware)
+
+    @app.get("/ping")
+    async def ping():
+        with timed_stage("cache"):
+            pass
+        return {"ok": True}
+
+    return app
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/ping",
+    "raw_path": b"/ping",
+    "root_path": "",
+    "query_string": b"",
+    "headers": [(b"host", b"bench")],
+    "client": ("127.0.0.1", 50000),
+    "server": ("bench", 80),
+}
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+async def send(message):
+    pass
+
+async def run(app , requests:int) -> float:
+    for _ in range(200):
+        await app(dict(SCOPE), receive, send)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(SCOPE), receive, send)
+    return (time.perf_counter() - started) / requests
+
+async def main_async(args):
+    logger = logging.getLogger("response_logger")
+    logger.handlers = [logging.NullHandler()]
+    logger.propagate = False
+
+    print(f"{args.requests} requests per variant\n")
+    print(f"{'variant':<8}{'us/request':>12}{'overhead us':>13}")
+    baseline = None
+    for name, middleware in (("none", None), ("before", LegacyResponseLoggerMiddleware), ("after", ResponseLoggerMiddleware)):
+        per_request = await run(build_app(middleware), args.requests)
+        baseline = per_request if baseline is None else baseline
+        print(f"{name:<8}{per_request * 1e6:>12.1f}{(per_request - baseline) * 1e6:>13.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Throughput of access token signing and verification.
+
+    python -m benchmarks.bench_token_codec [--seconds 1]
+
+Compares python-jose (the previous implementation , datetime claims) with
+HS256Codec as used by app.core.security.
+"""
+import argparse
+import time
+from datetime import datetime, timezone ,timedelta
+import benchmarks._env  # noqa: F401
+from jose import jwt
+from app.core.config import settings
+from app.core.security import create_access_tokens,verify_access_token
+
+SECRET = settings.JWT_ACCESS_SECRET_KEY
+ALGORITHM = settings.JWT_ALGORITHM
+
+
+def jose_create(user_id:str):
+    now = datetime.now(timezone.utc)
+    return jwt.encode(
+        {"sub": user_id, "token_type": "access", "iat": now, "exp": now + timedelta(minutes=15)},
+        SECRET,
+        ALGORITHM
+    )
+
+def jose_verify(token:str):
+    payload = jwt.decode(token, SECRET, algorithms=[ALGORITHM])
+    return payload if payload.get("token_type") == "access" else None
+
+def ops_per_second(call , seconds:float) -> float:
+    calls = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            call()
+        calls += 100
+    return calls / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=1.0, help="time per case")
+    args = parser.parse_args()
+
+    token = create_access_tokens("bench-user")
+    assert jose_verify(token) == verify_access_token(token)
+
+    cases = [
+        ("sign", "jose", lambda: jose_create("bench-user")),
+        ("sign", "codec", lambda: create_access_tokens("bench-user")),
+        ("verify", "jose", lambda: jose_verify(token)),
+        ("verify", "codec", lambda: verify_access_token(token)),
+    ]
+
+    print(f"{'operation':<10}{'impl':<8}{'ops/sec':>12}")
+    for operation, impl, call in cases:
+        print(f"{operation:<10}{impl:<8}{ops_per_second(call, args.seconds):>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
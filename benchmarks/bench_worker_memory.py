@@ -0,0 +1,124 @@
+"""
+Measures per worker memory for N serving workers holding the same forest.
+
+    python -m benchmarks.bench_worker_memory [--workers 4] [--trees 300]
+
+Every mode starts N spawned processes, like `uvicorn --workers N`. Each
+process loads the model and predicts one batch so all pages are touched,
+then reports its RSS and PSS from /proc/self/smaps_rollup while all
+workers are still alive. PSS splits shared pages evenly between the
+processes mapping them, so summing PSS over the workers gives the real
+footprint.
+
+    pickle -> every worker unpickles its own sklearn forest (the pyfunc path)
+    native -> every worker flattens its own FlatForest
+    mmap   -> every worker maps the same FlatForest export (MODEL_MMAP_ARRAYS=true)
+
+Linux only.
+"""
+import argparse
+import multiprocessing
+import os
+import pickle
+import tempfile
+import benchmarks._env  # noqa: F401
+import numpy as np
+from sklearn.datasets import load_iris
+from sklearn.ensemble import RandomForestClassifier
+from app.core.tree_engine import FlatForest
+
+MODES = ("pickle", "native", "mmap")
+
+
+def memory_kb() -> dict:
+    # Rss and Pss lines from smaps_rollup , values in kB
+    usage = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in ("Rss", "Pss"):
+                usage[name.lower()] = int(value.split()[0])
+    return usage
+
+def load(mode:str , path:str):
+    if mode == "mmap":
+        return FlatForest.open(os.path.join(path, "flat-forest"))
+    with open(os.path.join(path, "model.pkl"), "rb") as f:
+        forest = pickle.load(f)
+    return FlatForest.from_sklearn(forest) if mode == "native" else forest
+
+def worker(mode:str , path:str , barrier , results):
+    matrix = np.random.default_rng(0).uniform(0.1, 7.9, (4096, 4)).astype(np.float32)
+    barrier.wait()
+    before = memory_kb()
+
+    model = load(mode, path)
+    model.predict(matrix)
+
+    # Measure only once every worker holds its model , PSS depends on who else maps a page
+    barrier.wait()
+    after = memory_kb()
+    results.put({
+        "rss": after["rss"],
+        "pss": after["pss"],
+        "model_rss": after["rss"] - before["rss"],
+        "model_pss": after["pss"] - before["pss"],
+    })
+    barrier.wait()
+
+def run(mode:str , path:str , workers:int) -> list:
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(mode, path, barrier, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return reports
+
+def export_model(path:str , trees:int , seed:int = 0):
+    # Noisy, oversampled iris so the trees grow to a realistic size
+    X, y = load_iris(return_X_y=True)
+    rng = np.random.default_rng(seed)
+    X = np.repeat(X, 20, axis=0) + rng.normal(0, 0.3, (len(X) * 20, X.shape[1]))
+    y = np.repeat(y, 20)
+    forest = RandomForestClassifier(n_estimators=trees, random_state=seed, n_jobs=-1).fit(X, y)
+
+    with open(os.path.join(path, "model.pkl"), "wb") as f:
+        pickle.dump(forest, f)
+    flat = FlatForest.from_sklearn(forest)
+    flat.save(os.path.join(path, "flat-forest"))
+    return flat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--trees", type=int, default=300)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as path:
+        flat = export_model(path, args.trees)
+        array_mb = sum(getattr(flat, name).nbytes for name in FlatForest.ARRAYS) / 1024 ** 2
+        pickle_mb = os.path.getsize(os.path.join(path, "model.pkl")) / 1024 ** 2
+        print(f"{args.trees} trees , {len(flat.threshold)} nodes , pickle {pickle_mb:.1f} MB , arrays {array_mb:.1f} MB")
+        print(f"{args.workers} workers\n")
+
+        print(f"{'mode':<8}{'RSS/worker':>12}{'PSS/worker':>12}{'model PSS/worker':>18}{'total PSS':>12}")
+        for mode in args.modes:
+            reports = run(mode, path, args.workers)
+            mean = {key: np.mean([report[key] for report in reports]) / 1024 for key in reports[0]}
+            total_pss = sum(report["pss"] for report in reports) / 1024
+            print(
+                f"{mode:<8}{mean['rss']:>10.1f}MB{mean['pss']:>10.1f}MB"
+                f"{mean['model_pss']:>16.1f}MB{total_pss:>10.1f}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
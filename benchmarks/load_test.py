@@ -0,0 +1,367 @@
+"""
+In-process load test -> replays JSONL traffic against app.main:app and reports
+throughput and p50 / p95 / p99 latency per endpoint.
+
+    python -m benchmarks.load_test [--traffic benchmarks/load_test_traffic.jsonl] [--repeat 3]
+                                   [--concurrency 16] [--redis fake|real]
+                                   [--model-ms 0] [--baseline benchmarks/load_test_baseline.json]
+                                   [--threshold 0.25] [--save-baseline]
+    python -m benchmarks.load_test --generate 1000 --users 50 [--seed 0] [--traffic out.jsonl]
+
+The app runs with its real lifespan through httpx's ASGI transport:
+database  -> DATABASE_URL , a local SQLite file (one pooled connection) by default ,
+             point it at a local Postgres for realistic auth numbers
+redis     -> fakeredis by default , --redis real uses REDIS_URL
+model     -> a stub installed as the Production handle , rule based , --model-ms adds latency
+bcrypt runs at cost 4 and the rate limits are raised so the limiters run but never reject.
+
+Traffic is one request per line , replayed in file order (--repeat times) by
+--concurrency workers:
+    {"op": "login", "user": 3}
+    {"op": "refresh", "user": 3}
+    {"op": "predict", "user": 3, "features": {"sepal_length": 5.1, ...}}
+Users are created up front. Requests of one user never overlap (refresh rotates
+its token) and a user without a session logs in first.
+
+With --baseline the run fails (exit code 1) when an endpoint's p95 or p99 is more
+than --threshold above the baseline , its throughput more than --threshold below ,
+or any request failed. A percentile is only compared once at least 10 requests
+lie beyond it (200 for p95 , 1000 for p99) , thinner tails are mostly noise.
+--save-baseline writes the current results there instead. Baselines are machine
+specific and not committed , record one with --save-baseline on the machine that
+runs the check , until then a run without it fails.
+"""
+import os
+
+for name, value in {
+    "BCRYPT_ROUNDS": "4",
+    "LOGIN_RATE_LIMIT": "1000000000",
+    "REFRESH_RATE_LIMIT": "1000000000",
+    "PREDICT_RATE_LIMIT": "1000000000",
+    "PREDICT_BATCH_RATE_LIMIT": "1000000000",
+    "MODEL_RELOAD_INTERVAL": "0",
+    "MODEL_CANDIDATE_STAGE": "",
+    "MODEL_WARMUP_ITERATIONS": "1",
+}.items():
+    os.environ.setdefault(name, value)
+
+import benchmarks._env  # noqa: F401
+
+if os.environ["DATABASE_URL"].startswith("sqlite"):
+    # One connection -> SQLite writers queue in the pool instead of sleeping in
+    # SQLite's busy handler , which otherwise dominates the login and refresh tails
+    os.environ.setdefault("DATABASE_POOL_SIZE", "1")
+    os.environ.setdefault("DATABASE_MAX_OVERFLOW", "0")
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from collections import defaultdict
+import httpx
+import numpy as np
+from fakeredis import FakeServer,aioredis
+from app.core import redis_pool
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal,Base,engine
+from app.core.model_loader import ModelHandle,install_model
+from app.core.redis_pool import InstrumentedConnectionPool,InstrumentedRedis
+from app.core.security import hash_password
+from app.db.models.users import User
+from app.main import app
+from app.schemas.model_schema import FEATURE_COLUMNS
+from benchmarks.bench_login import tune_sqlite
+
+BENCHMARK_DIR = os.path.dirname(__file__)
+DEFAULT_TRAFFIC = os.path.join(BENCHMARK_DIR, "load_test_traffic.jsonl")
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "load_test_baseline.json")
+OPERATIONS = ("login", "refresh", "predict")
+PATHS = {"login": "/auth/login", "refresh": "/auth/refresh", "predict": "/predict"}
+PERCENTILES = (50, 95, 99)
+# Requests that must lie beyond a percentile before it is compared with the baseline
+TAIL_SAMPLES = 10
+PASSWORD = "LoadTest#Pass1"
+
+
+class StubModel:
+    """Petal length thresholds , close enough to the real forest for cache and class mix."""
+
+    def __init__(self, latency_ms:float = 0):
+        self.latency = latency_ms / 1000
+
+    def predict(self, features):
+        if self.latency:
+            time.sleep(self.latency)
+        petal_length = np.asarray(features, dtype=np.float64)[:, FEATURE_COLUMNS.index("petal_length")]
+        return np.where(petal_length < 2.5, 0, np.where(petal_length < 4.9, 1, 2))
+
+
+# Traffic
+
+def generate_traffic(requests:int , users:int , seed:int) -> list:
+    # Mostly predictions over a limited set of flowers , so the cache sees repeats
+    rng = random.Random(seed)
+    flowers = [
+        {column: round(rng.uniform(0.1, 7.9), 1) for column in FEATURE_COLUMNS}
+        for _ in range(max(1, requests // 4))
+    ]
+    traffic = []
+    for _ in range(requests):
+        user = rng.randrange(users)
+        op = rng.choices(OPERATIONS, weights=(1, 1, 8))[0]
+        entry = {"op": op, "user": user}
+        if op == "predict":
+            entry["features"] = rng.choice(flowers)
+        traffic.append(entry)
+    return traffic
+
+def load_traffic(path:str) -> list:
+    traffic = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry.get("op") not in OPERATIONS or not isinstance(entry.get("user"), int):
+                raise ValueError(f"{path}:{line_number} -> unknown op or user: {line.strip()}")
+            traffic.append(entry)
+    return traffic
+
+
+# Environment
+
+def use_fake_redis():
+    # Installed before the lifespan runs , init_redis_pool() then keeps this client
+    pool = InstrumentedConnectionPool(
+        connection_class=aioredis.FakeConnection,
+        server=FakeServer(),
+        decode_responses=True,
+        max_connections=settings.REDIS_POOL_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT,
+    )
+    redis_pool._pool = pool
+    redis_pool._client = InstrumentedRedis(connection_pool=pool)
+
+def email(user:int) -> str:
+    return f"loadtest-{user}@example.com"
+
+async def create_users(count:int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    password_hash = hash_password(PASSWORD)
+    async with AsyncSessionLocal() as db:
+        db.add_all(User(username=f"loadtest-{user}", email=email(user), password_hash=password_hash) for user in range(count))
+        await db.commit()
+
+
+# Replay
+
+class Session:
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.access_token = None
+        self.refresh_token = None
+
+
+class Replay:
+    def __init__(self, client:httpx.AsyncClient):
+        self.client = client
+        self.sessions = defaultdict(Session)
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def _send(self, op:str , **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.client.post(PATHS[op], **kwargs)
+        self.latencies[op].append(time.perf_counter() - started)
+        if response.status_code != 200:
+            self.errors[op] += 1
+        return response
+
+    async def _login(self, user:int , session:Session):
+        response = await self._send("login", json={"email": email(user), "password": PASSWORD})
+        if response.status_code == 200:
+            session.access_token = response.json()["access_token"]
+            session.refresh_token = response.cookies.get("refresh_token")
+
+    async def _refresh(self, session:Session):
+        response = await self._send("refresh", headers={"Cookie": f"refresh_token={session.refresh_token}"})
+        if response.status_code == 200:
+            session.access_token = response.json()["access_token"]
+            session.refresh_token = response.cookies.get("refresh_token")
+
+    async def run_entry(self, entry:dict):
+        session = self.sessions[entry["user"]]
+        async with session.lock:
+            if entry["op"] == "login" or session.access_token is None:
+                await self._login(entry["user"], session)
+                if entry["op"] == "login":
+                    return
+            if entry["op"] == "refresh":
+                await self._refresh(session)
+            else:
+                await self._send(
+                    "predict",
+                    json=entry["features"],
+                    headers={"Authorization": f"Bearer {session.access_token}"},
+                )
+
+    async def run(self, traffic:list , concurrency:int) -> float:
+        pending = iter(traffic)
+
+        async def worker():
+            for entry in pending:
+                await self.run_entry(entry)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - started
+
+
+# Results
+
+def percentile(values:list , p:float) -> float:
+    # Nearest rank
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+def summarize(replay:Replay , seconds:float) -> dict:
+    results = {}
+    for op in OPERATIONS:
+        latencies = replay.latencies.get(op)
+        if not latencies:
+            continue
+        results[op] = {
+            "requests": len(latencies),
+            "errors": replay.errors[op],
+            "throughput": round(len(latencies) / seconds, 1),
+            **{f"p{p}_ms": round(percentile(latencies, p) * 1000, 3) for p in PERCENTILES},
+        }
+    total = sum(result["requests"] for result in results.values())
+    results["total"] = {
+        "requests": total,
+        "errors": sum(result["errors"] for result in results.values()),
+        "throughput": round(total / seconds, 1),
+    }
+    return results
+
+def print_results(results:dict):
+    print(f"{'endpoint':<10}{'requests':>10}{'errors':>8}{'req/sec':>10}" + "".join(f"{f'p{p} ms':>10}" for p in PERCENTILES))
+    for op, result in results.items():
+        row = f"{op:<10}{result['requests']:>10}{result['errors']:>8}{result['throughput']:>10.1f}"
+        row += "".join(f"{result[f'p{p}_ms']:>10.2f}" for p in PERCENTILES if f"p{p}_ms" in result)
+        print(row)
+
+def compare(results:dict , baseline:dict , threshold:float) -> list:
+    """Regressions of `results` against `baseline` , as readable messages."""
+    regressions = []
+    if results["total"]["errors"]:
+        regressions.append(f"{results['total']['errors']} requests failed")
+
+    for op, base in baseline["results"].items():
+        current = results.get(op)
+        if current is None:
+            regressions.append(f"{op}: missing from this run")
+            continue
+        if current["throughput"] < base["throughput"] * (1 - threshold):
+            regressions.append(f"{op}: throughput {current['throughput']} req/s , baseline {base['throughput']}")
+        for p in (95, 99):
+            key = f"p{p}_ms"
+            if current["requests"] * (100 - p) / 100 < TAIL_SAMPLES:
+                continue
+            if key in base and current[key] > base[key] * (1 + threshold):
+                regressions.append(f"{op}: p{p} {current[key]} ms , baseline {base[key]}")
+    return regressions
+
+
+async def main_async(args) -> int:
+    traffic = load_traffic(args.traffic) * args.repeat
+    users = max(entry["user"] for entry in traffic) + 1
+
+    if engine.dialect.name == "sqlite":
+        tune_sqlite()
+    if args.redis == "fake":
+        use_fake_redis()
+    install_model(ModelHandle(version="loadtest", model=StubModel(args.model_ms)))
+    await create_users(users)
+
+    config = {
+        "traffic": os.path.basename(args.traffic),
+        "requests": len(traffic),
+        "users": users,
+        "concurrency": args.concurrency,
+        "redis": args.redis,
+        "database": engine.dialect.name,
+        "model_ms": args.model_ms,
+    }
+    print(" , ".join(f"{name} {value}" for name, value in config.items()) + "\n")
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            if args.warmup:
+                await Replay(client).run(traffic[:args.warmup], args.concurrency)
+            replay = Replay(client)
+            seconds = await replay.run(traffic, args.concurrency)
+
+    results = summarize(replay, seconds)
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"config": config, "results": results}, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline} , record one on this machine with --save-baseline")
+        return 1
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("config") != config:
+        print(f"\nWarning: baseline was recorded with {baseline.get('config')}")
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\nRegressed beyond {args.threshold:.0%} of the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"\nWithin {args.threshold:.0%} of the baseline")
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--traffic", default=DEFAULT_TRAFFIC)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--redis", choices=("fake", "real"), default="fake")
+    parser.add_argument("--model-ms", type=float, default=0)
+    parser.add_argument("--warmup", type=int, default=100, help="requests replayed before measuring")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--generate", type=int, metavar="REQUESTS", help="write synthetic traffic to --traffic and exit")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.generate:
+        with open(args.traffic, "w", encoding="utf-8") as f:
+            for entry in generate_traffic(args.generate, args.users, args.seed):
+                f.write(json.dumps(entry) + "\n")
+        print(f"{args.generate} requests written to {args.traffic}")
+        return
+
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import os
+import pytest
+from app.core.atomic_files import atomic_directory
+
+
+def test_directory_appears_complete_or_not_at_all(tmp_path):
+    path = str(tmp_path / "nested" / "artifact")
+
+    with pytest.raises(RuntimeError):
+        with atomic_directory(path, "meta.json") as tmp:
+            open(os.path.join(tmp, "meta.json"), "w").close()
+            raise RuntimeError("writer died")
+    assert not os.path.exists(path)
+
+    with atomic_directory(path, "meta.json") as tmp:
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            f.write("first")
+    assert open(os.path.join(path, "meta.json")).read() == "first"
+    # Only the finished directory is left in the parent
+    assert os.listdir(tmp_path / "nested") == ["artifact"]
+
+def test_directory_written_first_by_another_worker_is_kept(tmp_path):
+    path = str(tmp_path / "artifact")
+    os.makedirs(path)
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        f.write("first")
+
+    # os.replace onto a non empty directory fails , the complete copy wins
+    with atomic_directory(path, "meta.json") as tmp:
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            f.write("second")
+
+    assert open(os.path.join(path, "meta.json")).read() == "first"
+    assert os.listdir(tmp_path) == ["artifact"]
@@ -0,0 +1,23 @@
+import uuid
+from datetime import datetime, timezone ,timedelta
+import pytest
+from sqlalchemy import select
+from app.api.routes_auth import store_refresh_token
+from app.db.models.refresh_token import RefreshToken
+from app.db.models.users import User
+
+
+@pytest.mark.asyncio
+async def test_store_refresh_token_upserts_one_row_per_user(db):
+    user = User(id=uuid.uuid4(), username="upsert", email="upsert@example.com", password_hash="x")
+    db.add(user)
+    await db.commit()
+
+    expires_at = datetime.now(timezone.utc) + timedelta(days=7)
+    await store_refresh_token(db, user.id, "first-hash", expires_at)
+    await db.commit()
+    await store_refresh_token(db, user.id, "second-hash", expires_at + timedelta(days=1))
+    await db.commit()
+
+    rows = (await db.execute(select(RefreshToken.token).where(RefreshToken.user_id == user.id))).all()
+    assert [row.token for row in rows] == ["second-hash"]
@@ -0,0 +1,46 @@
+import asyncio
+import pytest
+from app.services.batcher import MicroBatcher
+
+
+@pytest.mark.asyncio
+async def test_concurrent_submits_share_one_batch():
+    calls = []
+
+    async def run_batch(rows):
+        calls.append(len(rows))
+        return [row["x"] * 2 for row in rows]
+
+    batcher = MicroBatcher(run_batch, max_batch_size=64, window_ms=5)
+    results = await asyncio.gather(*(batcher.submit({"x": i}) for i in range(10)))
+
+    assert results == [i * 2 for i in range(10)]
+    assert calls == [10]
+
+@pytest.mark.asyncio
+async def test_batch_flushes_at_max_size():
+    calls = []
+
+    async def run_batch(rows):
+        calls.append(len(rows))
+        return rows
+
+    batcher = MicroBatcher(run_batch, max_batch_size=4, window_ms=1000)
+    await asyncio.wait_for(
+        asyncio.gather(*(batcher.submit({"x": i}) for i in range(8))),
+        timeout=1,
+    )
+
+    assert calls == [4, 4]
+
+@pytest.mark.asyncio
+async def test_batch_failure_reaches_every_caller():
+    async def run_batch(rows):
+        raise ValueError("model down")
+
+    batcher = MicroBatcher(run_batch, max_batch_size=8, window_ms=1)
+    results = await asyncio.gather(
+        batcher.submit({"x": 1}), batcher.submit({"x": 2}), return_exceptions=True
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from sklearn.datasets import load_iris
+from sklearn.ensemble import RandomForestClassifier
+from app.core import decision_table
+from app.core.decision_table import DecisionTable
+from app.core.model_loader import ModelHandle
+from app.core.tree_engine import FlatForest
+
+
+@pytest.fixture(scope="module")
+def forest():
+    data = load_iris()
+    return RandomForestClassifier(n_estimators=20, random_state=0, n_jobs=1).fit(data.data, data.target)
+
+def test_table_answers_only_where_the_model_agrees(forest):
+    table = DecisionTable.build(forest.predict, low=0.0, high=8.0, step=0.5)
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0.0, 8.0, size=(5000, 4)).astype(np.float32)
+
+    predictions, in_table = table.lookup(points)
+
+    assert table.table.dtype == np.uint8
+    assert (table.table == DecisionTable.AMBIGUOUS).any()
+    assert in_table.mean() > 0.5
+    # Cells crossed by a decision boundary are left to the model
+    assert np.mean(predictions[in_table] == forest.predict(points[in_table])) > 0.995
+
+def test_table_flags_rows_outside_grid(forest):
+    table = DecisionTable.build(forest.predict, low=0.0, high=8.0, step=0.5)
+    _, in_grid = table.lookup(np.array([[5.1, 3.5, 1.4, 0.2], [9.5, 3.0, 5.0, 2.0], [-1.0, 3.0, 5.0, 2.0]]))
+
+    assert in_grid.tolist()[1:] == [False, False]
+
+def test_table_is_saved_and_memory_mapped(forest, tmp_path, monkeypatch):
+    monkeypatch.setattr(decision_table.settings, "MODEL_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(decision_table.settings, "DECISION_TABLE_STEP", 0.5)
+    monkeypatch.setattr(decision_table.settings, "DECISION_TABLE_AGREEMENT_SAMPLES", 2000)
+    monkeypatch.setattr(decision_table.settings, "DECISION_TABLE_MIN_AGREEMENT", 0.5)
+
+    table = decision_table.build_decision_table(forest.predict, "7")
+
+    assert isinstance(table.table, np.memmap)
+    reopened = decision_table.build_decision_table(lambda matrix: 1 / 0, "7")
+    assert np.array_equal(reopened.table, table.table)
+
+def test_table_refused_below_agreement(forest, tmp_path, monkeypatch):
+    monkeypatch.setattr(decision_table.settings, "MODEL_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(decision_table.settings, "DECISION_TABLE_STEP", 2.0)
+    monkeypatch.setattr(decision_table.settings, "DECISION_TABLE_AGREEMENT_SAMPLES", 2000)
+    monkeypatch.setattr(decision_table.settings, "DECISION_TABLE_MIN_AGREEMENT", 1.0)
+
+    assert decision_table.build_decision_table(forest.predict, "7") is None
+
+@pytest.mark.asyncio
+async def test_default_grid_activates_and_is_prepared_off_the_request_path(forest, tmp_path, monkeypatch):
+    monkeypatch.setattr(decision_table.settings, "MODEL_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(decision_table.settings, "DECISION_TABLE_ENABLED", True)
+    monkeypatch.setattr(decision_table.settings, "DECISION_TABLE_AGREEMENT_SAMPLES", 20000)
+    monkeypatch.setattr(decision_table, "_active_tables", {})
+    handle = ModelHandle(version="7", model=FlatForest.from_sklearn(forest))
+
+    assert decision_table.get_decision_table(handle) is None
+    await decision_table.prepare_decision_table(handle)
+
+    table = decision_table.get_decision_table(handle)
+    assert table is not None
+    assert decision_table.table_path("7").startswith(str(tmp_path / decision_table.settings.MODEL_NAME / "7"))
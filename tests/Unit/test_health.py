@@ -0,0 +1,56 @@
+import asyncio
+import time
+import httpx
+import pytest
+from app.main import app
+from app.services.health import HealthMonitor,health_monitor
+
+
+async def _ok():
+    pass
+
+async def _hang():
+    await asyncio.sleep(10)
+
+async def _fail():
+    raise ConnectionError("connection refused")
+
+@pytest.mark.asyncio
+async def test_snapshot_reports_timeouts_failures_and_latency(monkeypatch):
+    monitor = HealthMonitor(interval=5, timeout=0.05)
+    monkeypatch.setattr(HealthMonitor, "CHECKS", {"postgres": _ok, "redis": _hang, "model": _fail})
+
+    started = time.perf_counter()
+    snapshot = await monitor.refresh()
+
+    # Probes run concurrently , the slowest one is capped by its timeout
+    assert time.perf_counter() - started < 1
+    assert snapshot["status"] == "degraded"
+    assert snapshot["dependencies"]["postgres"]["ok"]
+    assert "timed out" in snapshot["dependencies"]["redis"]["error"]
+    assert snapshot["dependencies"]["model"]["error"] == "connection refused"
+    assert all("latency_ms" in status for status in snapshot["dependencies"].values())
+    assert not monitor.is_ready()
+
+@pytest.mark.asyncio
+async def test_stale_snapshot_is_not_ready(monkeypatch):
+    monitor = HealthMonitor(interval=5, timeout=1)
+    monkeypatch.setattr(HealthMonitor, "CHECKS", {"postgres": _ok})
+
+    await monitor.refresh()
+    assert monitor.is_ready()
+
+    monitor.snapshot["checked_at"] -= 16
+    assert not monitor.is_ready()
+
+@pytest.mark.asyncio
+async def test_endpoints_answer_from_snapshot(monkeypatch):
+    monkeypatch.setattr(health_monitor, "snapshot", None)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get("/health/live")).status_code == 200
+        assert (await client.get("/health/ready")).json()["status"] == "starting"
+
+        monkeypatch.setattr(health_monitor, "snapshot", {"status": "ok", "checked_at": time.time(), "dependencies": {}})
+        ready = await client.get("/health/ready")
+        assert ready.status_code == 200
+        assert (await client.get("/health")).status_code == 200
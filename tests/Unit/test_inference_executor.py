@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from app.core import inference_executor as executor_module
+from app.core.inference_executor import InferenceExecutor
+from app.core.model_loader import ModelHandle
+
+
+class BrokenPool:
+    def __init__(self):
+        self.shut_down = False
+
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("A child process terminated abruptly")
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+@pytest.fixture
+def process_executor(monkeypatch):
+    # Thread pools stand in for the spawned workers , only the pool handling is under test
+    executor = InferenceExecutor(mode="process", workers=1)
+    monkeypatch.setattr(executor_module, "ProcessPoolExecutor", lambda **kwargs: ThreadPoolExecutor(max_workers=1))
+    monkeypatch.setattr(executor_module, "_worker_predict", lambda matrix, version: np.zeros(len(matrix), dtype=np.int64))
+    yield executor
+    executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_broken_process_pool_is_replaced(process_executor):
+    broken = BrokenPool()
+    process_executor._pool = broken
+
+    result = await process_executor.predict(np.ones((2, 4)), ModelHandle(version="1", model=None))
+
+    assert result.tolist() == [0, 0]
+    assert broken.shut_down
+    assert isinstance(process_executor._pool, ThreadPoolExecutor)
+
+def test_failed_worker_preload_is_not_fatal(monkeypatch):
+    def failing_load():
+        raise RuntimeError("registry down")
+
+    monkeypatch.setattr(executor_module, "get_model_handle", failing_load)
+    monkeypatch.setattr(executor_module, "_worker_models", {})
+
+    executor_module._init_worker()
+
+    assert executor_module._worker_models == {}
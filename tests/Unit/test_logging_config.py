@@ -0,0 +1,99 @@
+import json
+import logging
+import queue
+import sys
+import httpx
+import pytest
+from fastapi import FastAPI
+from app.core.logging_config import JsonFileHandler,JsonFormatter,SuccessSampler,RequestQueueHandler,RequestQueueListener,set_request_id,reset_request_id
+from app.middlewares.response_logger import ResponseLoggerMiddleware
+
+
+def _record(name="response_logger" , level=logging.INFO , **extra) -> logging.LogRecord:
+    record = logging.LogRecord(name, level, __file__, 1, "user=%s", ("alice",), None)
+    record.__dict__.update(extra)
+    return record
+
+def test_json_lines_carry_request_id_extra_fields_and_traceback():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord("auth", logging.ERROR, __file__, 1, "failed %s", ("login",), sys.exc_info())
+    record.status_code = 500
+
+    token = set_request_id("req-1")
+    try:
+        prepared = RequestQueueHandler(queue.Queue()).prepare(record)
+    finally:
+        reset_request_id(token)
+
+    entry = json.loads(JsonFormatter().format(prepared))
+    assert entry["message"] == "failed login"
+    assert entry["request_id"] == "req-1"
+    assert entry["status_code"] == 500
+    assert entry["level"] == "ERROR"
+    assert "ValueError: boom" in entry["exc_info"]
+
+def test_sampler_only_thins_successful_records_of_sampled_loggers():
+    sampler = SuccessSampler(rate=0.0, loggers=["response_logger"])
+
+    assert not sampler.filter(_record(status_code=200))
+    assert sampler.filter(_record(status_code=503))
+    assert sampler.filter(_record(level=logging.WARNING, status_code=200))
+    assert sampler.filter(_record(name="app.api.routes_auth", status_code=200))
+
+    kept = _record(status_code=200)
+    assert SuccessSampler(rate=0.999999, loggers=["response_logger"]).filter(kept)
+    assert kept.sample_rate == 0.999999
+    assert SuccessSampler(rate=1.0, loggers=["response_logger"]).filter(_record(status_code=200))
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = RequestQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(_record())
+    handler.handle(_record())
+    assert handler.queue.qsize() == 1
+
+def test_listener_writes_every_record_and_rolls_over(tmp_path):
+    path = tmp_path / "app.log"
+    file_handler = JsonFileHandler(path, maxBytes=2000, backupCount=5, encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter())
+    handler = RequestQueueHandler(queue.Queue())
+    listener = RequestQueueListener(handler.queue, file_handler, interval=0.01)
+    listener.start()
+    for i in range(50):
+        handler.handle(_record(n=i))
+    listener.stop()
+    file_handler.close()
+
+    files = list(tmp_path.iterdir())
+    lines = [json.loads(line) for p in files for line in p.read_text().splitlines()]
+    assert len(files) > 1
+    assert all(p.stat().st_size < 2000 for p in files)
+    assert sorted(entry["n"] for entry in lines) == list(range(50))
+    assert lines[0]["message"] == "user=alice"
+
+@pytest.mark.asyncio
+async def test_request_id_reaches_response_and_log_records():
+    app = FastAPI()
+    app.add_middleware(ResponseLoggerMiddleware)
+
+    @app.get("/work")
+    async def work():
+        logging.getLogger("response_logger").info("inside the request")
+        return {}
+
+    handler = RequestQueueHandler(queue.Queue())
+    logger = logging.getLogger("response_logger")
+    logger.addHandler(handler)
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            given = await client.get("/work", headers={"X-Request-ID": "from-proxy"})
+            minted = await client.get("/work")
+    finally:
+        logger.removeHandler(handler)
+
+    assert given.headers["X-Request-ID"] == "from-proxy"
+    assert len(minted.headers["X-Request-ID"]) == 32
+
+    records = [handler.queue.get_nowait() for _ in range(handler.queue.qsize())]
+    assert [record.request_id for record in records] == ["from-proxy"] * 2 + [minted.headers["X-Request-ID"]] * 2
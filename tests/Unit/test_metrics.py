@@ -0,0 +1,86 @@
+import os
+import subprocess
+import sys
+import textwrap
+import pytest
+from fakeredis import FakeServer,aioredis
+from fastapi import HTTPException
+from prometheus_client import REGISTRY
+from redis.asyncio import ConnectionPool
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.database import InstrumentedAsyncPool
+from app.core.rate_limiter import RateLimiter
+from app.core.redis_pool import InstrumentedRedis
+
+
+def _sample(name:str , **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+@pytest.mark.asyncio
+async def test_redis_commands_and_pipelines_are_timed():
+    pool = ConnectionPool(connection_class=aioredis.FakeConnection, server=FakeServer(), decode_responses=True)
+    redis = InstrumentedRedis(connection_pool=pool)
+    gets = _sample("redis_command_latency_seconds_count", command="GET")
+    pipelines = _sample("redis_command_latency_seconds_count", command="PIPELINE")
+
+    await redis.set("key", "value")
+    assert await redis.get("key") == "value"
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.get("key")
+        pipe.pttl("key")
+        await pipe.execute()
+
+    assert _sample("redis_command_latency_seconds_count", command="GET") == gets + 1
+    assert _sample("redis_command_latency_seconds_count", command="PIPELINE") == pipelines + 1
+    await redis.aclose()
+
+@pytest.mark.asyncio
+async def test_rate_limit_rejections_are_counted():
+    limiter = RateLimiter("metrics-test", limit=1, window=60, detail="slow down")
+    redis = aioredis.FakeRedis(decode_responses=True)
+
+    await limiter.hit(redis, "user1")
+    with pytest.raises(HTTPException):
+        await limiter.hit(redis, "user1")
+
+    assert _sample("rate_limit_rejections_total", limiter="metrics-test") == 1
+
+@pytest.mark.asyncio
+async def test_db_pool_checkout_wait_is_observed(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedAsyncPool)
+    before = _sample("db_pool_checkout_wait_seconds_count")
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    await engine.dispose()
+
+    assert _sample("db_pool_checkout_wait_seconds_count") == before + 1
+
+def test_multiprocess_mode_aggregates_workers(tmp_path):
+    # Each "worker" is its own interpreter , as under uvicorn --workers
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    worker = textwrap.dedent("""
+        import sys
+        from app.core.metrics import RATE_LIMIT_REJECTIONS,MODEL_READY,mark_worker_dead
+        RATE_LIMIT_REJECTIONS.labels(limiter="predict").inc(3)
+        MODEL_READY.set(int(sys.argv[1]))
+        if sys.argv[2] == "exit":
+            mark_worker_dead()
+    """)
+    # The first worker shuts down , the second is still serving
+    subprocess.run([sys.executable, "-c", worker, "0", "exit"], env=env, check=True)
+    subprocess.run([sys.executable, "-c", worker, "1", "serve"], env=env, check=True)
+
+    collect = textwrap.dedent("""
+        from prometheus_client import CollectorRegistry,multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        print(registry.get_sample_value("rate_limit_rejections_total", {"limiter": "predict"}))
+        print(registry.get_sample_value("model_ready"))
+    """)
+    output = subprocess.run([sys.executable, "-c", collect], env=env, check=True, capture_output=True, text=True)
+    rejections, ready = output.stdout.split()
+
+    # Counters keep the samples of the exited worker , live gauges drop them
+    assert float(rejections) == 6
+    assert float(ready) == 1
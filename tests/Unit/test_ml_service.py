@@ -1,62 +1,123 @@
-from unittest.mock import patch,MagicMock
-from app.services.model_service import predict_flower
+import pytest
+from unittest.mock import patch,MagicMock,AsyncMock
+from app.core.config import settings
+from app.services.model_service import predict_flower,predict_flowers_batch
 
-def test_predict_flower_cache_hit():
+HANDLE = MagicMock(version="1")
+
+def _executor(predictions):
+    mock_executor = MagicMock()
+    mock_executor.predict = AsyncMock(return_value=predictions)
+    return mock_executor
+
+@pytest.mark.asyncio
+async def test_predict_flower_cache_hit():
     fake_data = {"sepal_length": 5.1, "sepal_width": 3.5 , "petal_length":3.1,"petal_width":2.6}
+    mock_executor = _executor([0])
 
-    with patch("app.services.model_service.make_cache_key", return_value="key"), \
-         patch("app.services.model_service.get_cached_prediction", return_value={"prediction": 1}), \
-         patch("app.services.model_service.get_model") as mock_model:
+    with patch("app.services.model_service.choose_handle", return_value=(HANDLE, "primary")), \
+         patch("app.services.model_service._cache_key", return_value="key"), \
+         patch("app.services.model_service.get_cached_prediction", AsyncMock(return_value={"prediction": 1})), \
+         patch("app.services.model_service.inference_executor", mock_executor):
 
-        result = predict_flower(fake_data)
+        result = await predict_flower(fake_data)
 
         assert result == {"prediction": 1}
-        mock_model.assert_not_called()
-
-def test_predict_flower_cache_miss():
-    fake_data = {"sepal_length": 6.2, "sepal_width": 3.1}
+        mock_executor.predict.assert_not_called()
 
-    mock_model = MagicMock()
-    mock_model.predict.return_value = [2]
+@pytest.mark.asyncio
+async def test_predict_flower_cache_miss():
+    fake_data = {"sepal_length": 6.2, "sepal_width": 3.1 , "petal_length":4.5,"petal_width":1.5}
+    mock_executor = _executor([2])
 
-    with patch("app.services.model_service.make_cache_key", return_value="key"), \
-         patch("app.services.model_service.get_cached_prediction", return_value=None), \
-         patch("app.services.model_service.set_cached_prediction") as mock_set_cache, \
-         patch("app.services.model_service.get_model", return_value=mock_model):
+    with patch("app.services.model_service.choose_handle", return_value=(HANDLE, "primary")), \
+         patch("app.services.model_service._cache_key", return_value="key"), \
+         patch("app.services.model_service.get_cached_prediction", AsyncMock(return_value=None)), \
+         patch("app.services.model_service.set_cached_prediction", AsyncMock()) as mock_set_cache, \
+         patch("app.services.model_service.inference_executor", mock_executor):
 
-        result = predict_flower(fake_data)
+        result = await predict_flower(fake_data)
 
         assert result == {"prediction": 2}
-        mock_model.predict.assert_called_once()
-        mock_set_cache.assert_called_once_with("key", {"prediction": 2})
+        mock_executor.predict.assert_awaited_once()
+        mock_set_cache.assert_awaited_once_with("key", {"prediction": 2})
 
-def test_predict_flower_cache_key_consistency():
-    data = {"sepal_length": 5.0, "sepal_width": 3.6}
+@pytest.mark.asyncio
+async def test_predict_flower_cache_key_consistency():
+    data = {"sepal_length": 5.0, "sepal_width": 3.6 , "petal_length":1.4,"petal_width":0.2}
 
-    with patch("app.services.model_service.make_cache_key", return_value="same-key") as mock_key, \
-         patch("app.services.model_service.get_cached_prediction", return_value={"prediction": 0}):
+    with patch("app.services.model_service.choose_handle", return_value=(HANDLE, "primary")), \
+         patch("app.services.model_service._cache_key", return_value="same-key") as mock_key, \
+         patch("app.services.model_service.get_cached_prediction", AsyncMock(return_value={"prediction": 0})):
 
-        result1 = predict_flower(data)
-        result2 = predict_flower(data)
+        result1 = await predict_flower(data)
+        result2 = await predict_flower(data)
 
         assert result1 == result2
         assert mock_key.call_count == 2
+        # Keys are scoped to the model version
+        assert mock_key.call_args[0] == (data, "1")
 
-def test_predict_flower_output_safety():
-    fake_data = {"sepal_length": 7.1, "sepal_width": 3.0}
+@pytest.mark.asyncio
+async def test_predict_flower_output_safety():
+    fake_data = {"sepal_length": 7.1, "sepal_width": 3.0 , "petal_length":5.9,"petal_width":2.1}
+    mock_executor = _executor([1.0])  # float output from ML model
 
-    mock_model = MagicMock()
-    mock_model.predict.return_value = [1.0]  # float output from ML model
+    with patch("app.services.model_service.choose_handle", return_value=(HANDLE, "primary")), \
+         patch("app.services.model_service._cache_key", return_value="key"), \
+         patch("app.services.model_service.get_cached_prediction", AsyncMock(return_value=None)), \
+         patch("app.services.model_service.set_cached_prediction", AsyncMock()), \
+         patch("app.services.model_service.inference_executor", mock_executor):
 
-    with patch("app.services.model_service.make_cache_key", return_value="key"), \
-         patch("app.services.model_service.get_cached_prediction", return_value=None), \
-         patch("app.services.model_service.set_cached_prediction"), \
-         patch("app.services.model_service.get_model", return_value=mock_model):
-
-        result = predict_flower(fake_data)
+        result = await predict_flower(fake_data)
 
         assert isinstance(result, dict)
         assert "prediction" in result
         assert isinstance(result["prediction"], int)
 
-
+@pytest.mark.asyncio
+async def test_predict_flowers_batch_only_predicts_misses():
+    rows = [
+        {"sepal_length": 5.1, "sepal_width": 3.5, "petal_length": 1.4, "petal_width": 0.2},
+        {"sepal_length": 6.2, "sepal_width": 3.1, "petal_length": 4.5, "petal_width": 1.5},
+        {"sepal_length": 7.1, "sepal_width": 3.0, "petal_length": 5.9, "petal_width": 2.1},
+    ]
+
+    mock_executor = MagicMock()
+    mock_executor.predict = AsyncMock(return_value=[1, 2])
+
+    with patch("app.services.model_service.choose_handle", return_value=(MagicMock(version="1"), "primary")), \
+         patch("app.services.model_service._cache_key", side_effect=["k0", "k1", "k2"]), \
+         patch("app.services.model_service.get_cached_predictions", AsyncMock(return_value=[{"prediction": 0}, None, None])), \
+         patch("app.services.model_service.set_cached_predictions", AsyncMock()) as mock_set_cache, \
+         patch("app.services.model_service.inference_executor", mock_executor):
+
+        result = await predict_flowers_batch(rows)
+
+        assert result == [{"prediction": 0}, {"prediction": 1}, {"prediction": 2}]
+        mock_executor.predict.assert_awaited_once()
+        assert mock_executor.predict.call_args[0][0].shape == (2, 4)
+        mock_set_cache.assert_awaited_once_with({"k1": {"prediction": 1}, "k2": {"prediction": 2}})
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("table, batched", [(None, True), (MagicMock(), False)])
+async def test_micro_batching_is_skipped_only_with_an_active_table(monkeypatch, table, batched):
+    # DECISION_TABLE_ENABLED with a refused table (None) still batches
+    monkeypatch.setattr(settings, "PREDICT_MICRO_BATCHING", True)
+    monkeypatch.setattr(settings, "DECISION_TABLE_ENABLED", True)
+    fake_data = {"sepal_length": 5.1, "sepal_width": 3.5 , "petal_length":1.4,"petal_width":0.2}
+    batcher = MagicMock()
+    batcher.submit = AsyncMock(return_value=0)
+
+    with patch("app.services.model_service.choose_handle", return_value=(HANDLE, "primary")), \
+         patch("app.services.model_service._cache_key", return_value="key"), \
+         patch("app.services.model_service.get_cached_prediction", AsyncMock(return_value=None)), \
+         patch("app.services.model_service.set_cached_prediction", AsyncMock()), \
+         patch("app.services.model_service.get_decision_table", return_value=table), \
+         patch("app.services.model_service._get_batcher", return_value=batcher), \
+         patch("app.services.model_service._predict_rows", AsyncMock(return_value=[0])) as mock_predict:
+
+        assert await predict_flower(fake_data) == {"prediction": 0}
+
+    assert batcher.submit.await_count == (1 if batched else 0)
+    assert mock_predict.await_count == (0 if batched else 1)
@@ -0,0 +1,61 @@
+import pytest
+from unittest.mock import patch
+from app.core import model_loader
+
+
+@pytest.fixture
+def fresh_loader(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_loader.settings, "MODEL_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(model_loader, "_current", None)
+    return tmp_path
+
+def _cache_version(root, version):
+    path = root / model_loader.settings.MODEL_NAME / version
+    path.mkdir(parents=True)
+    (path / "MLmodel").write_text("flavors: {}")
+    return path
+
+def test_load_model_uses_cached_artifacts_for_unchanged_version(fresh_loader):
+    path = _cache_version(fresh_loader, "3")
+
+    with patch("app.core.model_loader._resolve_production_version", return_value="3"), \
+         patch("app.core.model_loader.mlflow.artifacts.download_artifacts") as mock_download, \
+         patch("app.core.model_loader._load_local", return_value="model") as mock_load:
+
+        assert model_loader.load_model() == "model"
+
+    mock_download.assert_not_called()
+    mock_load.assert_called_once_with(str(path))
+    assert model_loader.get_current_handle().version == "3"
+
+def test_load_model_falls_back_to_newest_cached_version(fresh_loader):
+    _cache_version(fresh_loader, "2")
+    newest = _cache_version(fresh_loader, "10")
+
+    with patch("app.core.model_loader._resolve_production_version", side_effect=ConnectionError("registry down")), \
+         patch("app.core.model_loader._load_local", return_value="model") as mock_load:
+
+        model_loader.load_model()
+
+    mock_load.assert_called_once_with(str(newest))
+    assert model_loader.get_current_handle().version == "10"
+
+def test_load_model_fails_without_registry_or_cache(fresh_loader):
+    with patch("app.core.model_loader._resolve_production_version", side_effect=ConnectionError("registry down")):
+        with pytest.raises(RuntimeError):
+            model_loader.load_model()
+
+def test_choose_handle_routes_canary_fraction(fresh_loader, monkeypatch):
+    production = model_loader.ModelHandle(version="1", model="production")
+    candidate = model_loader.ModelHandle(version="2", model="candidate")
+    model_loader.install_model(production)
+    monkeypatch.setattr(model_loader, "_candidate", None)
+    model_loader.install_candidate(candidate)
+
+    monkeypatch.setattr(model_loader.settings, "MODEL_CANARY_FRACTION", 0.25)
+    with patch("app.core.model_loader.random.random", side_effect=[0.1, 0.5]):
+        assert model_loader.choose_handle() == (candidate, "canary")
+        assert model_loader.choose_handle() == (production, "primary")
+
+    model_loader.install_candidate(None)
+    assert model_loader.choose_handle() == (production, "primary")
@@ -0,0 +1,94 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.core import model_loader
+from app.core.model_loader import ModelHandle
+from app.services import model_reloader
+
+
+@pytest.fixture
+def current_handle(monkeypatch):
+    handle = ModelHandle(version="1", model="old-model")
+    monkeypatch.setattr(model_loader, "_current", None)
+    model_loader.install_model(handle)
+    return handle
+
+@pytest.mark.asyncio
+async def test_reload_swaps_handle_after_warmup(current_handle):
+    new_handle = ModelHandle(version="2", model="new-model")
+
+    async def warm(handle):
+        # Requests arriving during warmup are still served by the old version
+        assert model_loader.get_model_handle() is current_handle
+
+    with patch("app.services.model_reloader.resolve_production_version", return_value="2"), \
+         patch("app.services.model_reloader.load_model_version", return_value=new_handle), \
+         patch("app.services.model_reloader.warm_model_handle", side_effect=warm) as mock_warm:
+
+        assert await model_reloader.reload_model_if_changed() is True
+
+    mock_warm.assert_awaited_once_with(new_handle)
+    assert model_loader.get_model_handle() is new_handle
+    assert model_reloader.get_last_reload_seconds() is not None
+
+@pytest.mark.asyncio
+async def test_reload_skips_unchanged_version(current_handle):
+    with patch("app.services.model_reloader.resolve_production_version", return_value="1"), \
+         patch("app.services.model_reloader.load_model_version") as mock_load, \
+         patch("app.services.model_reloader.warm_model_handle", new_callable=AsyncMock):
+
+        assert await model_reloader.reload_model_if_changed() is False
+
+    mock_load.assert_not_called()
+    assert model_loader.get_model_handle() is current_handle
+
+@pytest.mark.asyncio
+async def test_failed_warmup_is_retried_until_ready(monkeypatch):
+    # Warmup fails at startup , the registry recovers and the next retry flips readiness
+    handle = ModelHandle(version="3", model="recovered-model")
+    monkeypatch.setattr(model_reloader.settings, "MODEL_EAGER_LOAD", True)
+    monkeypatch.setattr(model_loader, "_model_ready", False)
+
+    with patch("app.services.model_service.get_model_handle", side_effect=[RuntimeError("registry down"), handle]), \
+         patch("app.services.model_service.warm_model_handle", new_callable=AsyncMock) as mock_warm:
+
+        with pytest.raises(RuntimeError):
+            await model_reloader.warmup_model()
+        assert model_loader.is_model_ready() is False
+        assert model_reloader.warmup_pending() is True
+
+        assert await model_reloader.retry_warmup() is True
+
+    mock_warm.assert_awaited_once_with(handle)
+    assert model_loader.is_model_ready() is True
+    assert model_reloader.warmup_pending() is False
+    assert await model_reloader.retry_warmup() is False
+
+@pytest.mark.asyncio
+async def test_reload_without_handle_loads_off_loop_and_reports_ready(monkeypatch):
+    new_handle = ModelHandle(version="4", model="new-model")
+    monkeypatch.setattr(model_loader, "_current", None)
+    monkeypatch.setattr(model_loader, "_model_ready", False)
+
+    with patch("app.services.model_reloader.resolve_production_version", return_value="4"), \
+         patch("app.core.model_loader.resolve_production_version", side_effect=AssertionError("loaded on the event loop")), \
+         patch("app.services.model_reloader.load_model_version", return_value=new_handle), \
+         patch("app.services.model_reloader.warm_model_handle", new_callable=AsyncMock) as mock_warm:
+
+        assert await model_reloader.reload_model_if_changed() is True
+
+    mock_warm.assert_awaited_once_with(new_handle)
+    assert model_loader.get_current_handle() is new_handle
+    assert model_loader.is_model_ready() is True
+
+@pytest.mark.asyncio
+async def test_startup_load_runs_in_background_and_survives_failures(monkeypatch):
+    # Warmup and candidate load fail , the task logs and hands over to the reload loop
+    monkeypatch.setattr(model_reloader.settings, "MODEL_EAGER_LOAD", True)
+    with patch("app.services.model_reloader.warmup_model", AsyncMock(side_effect=RuntimeError("registry down"))), \
+         patch("app.services.model_reloader.reload_candidate_if_changed", AsyncMock(side_effect=RuntimeError("registry down"))) as mock_candidate, \
+         patch("app.services.model_reloader.model_reload_loop", AsyncMock()) as mock_loop:
+
+        await model_reloader.startup_model_load()
+
+    mock_candidate.assert_awaited_once()
+    mock_loop.assert_awaited_once()
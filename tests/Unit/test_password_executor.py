@@ -0,0 +1,48 @@
+import asyncio
+import time
+import pytest
+from fastapi import HTTPException
+from app.core.config import settings
+from app.core.password_executor import PasswordExecutor
+
+
+@pytest.fixture
+def executor():
+    executor = PasswordExecutor(mode="thread", workers=1, max_queue=1, max_wait_ms=500)
+    yield executor
+    executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_round_trip(executor, monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    hashed = await executor.hash("secret-password")
+
+    assert hashed.startswith("$2b$04$")
+    assert await executor.verify("secret-password", hashed)
+    assert not await executor.verify("wrong-password", hashed)
+
+@pytest.mark.asyncio
+async def test_rejects_with_503_when_queue_is_full(executor):
+    running = asyncio.ensure_future(executor._run("hash", time.sleep, 0.2))
+    queued = asyncio.ensure_future(executor._run("hash", time.sleep, 0.2))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as error:
+        await executor._run("hash", time.sleep, 0)
+    assert error.value.status_code == 503
+
+    await asyncio.gather(running, queued)
+    assert executor.queue_depth == 0
+
+@pytest.mark.asyncio
+async def test_rejects_with_429_when_expected_wait_exceeds_deadline(executor):
+    executor._service_seconds = 1.0
+    running = asyncio.ensure_future(executor._run("hash", time.sleep, 0.1))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as error:
+        await executor._run("hash", time.sleep, 0)
+    assert error.value.status_code == 429
+    assert error.value.headers["Retry-After"] == "1"
+
+    await running
@@ -0,0 +1,53 @@
+import pytest
+from unittest.mock import patch,AsyncMock
+from app.cache.memory_cache import TTLCache
+from app.cache import prediction_cache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(max_entries=2)
+    with patch("app.cache.memory_cache.time.monotonic", return_value=100.0):
+        cache.set("a", 1, ttl=5)
+    with patch("app.cache.memory_cache.time.monotonic", return_value=104.0):
+        assert cache.get("a") == 1
+    with patch("app.cache.memory_cache.time.monotonic", return_value=105.0):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+@pytest.mark.asyncio
+async def test_tiered_lookup_fills_memory_from_redis():
+    prediction_cache.memory_cache.clear()
+    redis_lookup = AsyncMock(side_effect=[[({"prediction": 1}, 120.0), (None, 0)], [(None, 0)]])
+
+    with patch.object(prediction_cache.settings, "PREDICTION_CACHE_BACKEND", "tiered"), \
+         patch("app.cache.redis_cache.get_cached_predictions_with_ttl", redis_lookup):
+
+        assert await prediction_cache.get_cached_predictions(["k1", "k2"]) == [{"prediction": 1}, None]
+        # Second lookup of k1 is served from memory , only k2 goes back to redis
+        assert await prediction_cache.get_cached_predictions(["k1", "k2"]) == [{"prediction": 1}, None]
+
+    assert redis_lookup.await_args_list[1].args[0] == ["k2"]
+
+@pytest.mark.asyncio
+async def test_redis_backend_skips_memory():
+    prediction_cache.memory_cache.clear()
+
+    with patch.object(prediction_cache.settings, "PREDICTION_CACHE_BACKEND", "redis"), \
+         patch("app.cache.redis_cache.set_cached_prediction", AsyncMock()), \
+         patch("app.cache.redis_cache.get_cached_predictions", AsyncMock(return_value=[None])):
+
+        await prediction_cache.set_cached_prediction("k1", {"prediction": 2})
+        assert await prediction_cache.get_cached_prediction("k1") is None
+
+    assert len(prediction_cache.memory_cache) == 0
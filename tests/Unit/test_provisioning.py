@@ -0,0 +1,122 @@
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession,create_async_engine
+from app.core.config import settings
+from app.core.database import Base
+from app.db.models.users import User
+from app.services import provisioning
+
+CSV = """username,email,password
+alice,alice@example.com,Alice#Pass1
+bob,bob@example.com,Bob#Pass12
+taken,taken@example.com,Taken#Pass1
+again,alice@example.com,Alice#Pass1
+weak,weak@example.com,short
+"""
+
+
+@pytest_asyncio.fixture
+async def engine(engine, monkeypatch):
+    # Threads instead of spawned processes keep the test fast , the code path is the same
+    monkeypatch.setattr(provisioning, "_hash_pool", ThreadPoolExecutor(max_workers=2))
+    monkeypatch.setattr(settings, "PROVISION_HASH_WORKERS", 2)
+
+    async with AsyncSession(engine) as db:
+        db.add(User(username="taken", email="taken@example.com", password_hash="x"))
+        await db.commit()
+    return engine
+
+@pytest.mark.asyncio
+async def test_bulk_provisioning_reports_duplicates_and_invalid_rows(engine, client):
+    response = await client.post(
+        "/admin/users/bulk?format=csv",
+        content=CSV.encode(),
+        headers={"api-key": settings.API_KEY},
+    )
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["created"] == 2
+    assert sorted(report["duplicates"]) == ["alice@example.com", "taken@example.com"]
+    assert [row["line"] for row in report["invalid"]] == [6]
+
+    async with AsyncSession(engine) as db:
+        emails = (await db.execute(select(User.email))).scalars().all()
+    assert sorted(emails) == ["alice@example.com", "bob@example.com", "taken@example.com"]
+
+@pytest.mark.asyncio
+async def test_bulk_provisioning_requires_api_key(client):
+    response = await client.post("/admin/users/bulk", content=b"", headers={"api-key": "wrong"})
+    assert response.status_code == 403
+
+@pytest.mark.asyncio
+async def test_insert_slices_stay_under_sqlite_parameter_limit(engine, db):
+    assert provisioning.INSERT_SLICE_ROWS * len(provisioning.USER_COLUMNS) <= provisioning.SQLITE_MAX_VARIABLES
+
+    now = datetime.now(timezone.utc)
+    rows = [
+        {"id": uuid.uuid4(), "username": f"user{i}", "email": f"user{i}@example.com", "password_hash": "x",
+         "is_active": True, "created_at": now, "updated_at": now}
+        for i in range(provisioning.INSERT_SLICE_ROWS * 2 + 1)
+    ]
+    assert len(await provisioning.load_users(db, rows)) == len(rows)
+
+async def _lines(text:str):
+    async def chunks():
+        yield text.encode()
+    async for line in provisioning.iter_lines(chunks()):
+        yield line
+
+@pytest.mark.asyncio
+async def test_csv_quoted_fields_may_span_lines():
+    text = 'username,email,password\n"multi\nline",multi@example.com,"Multi""Line#1"\nbob,bob@example.com,"unterminated\n'
+
+    results = [result async for result in provisioning.parse_users(_lines(text), "csv")]
+
+    assert results[0][0] == 2
+    assert results[0][1].username == "multi\nline"
+    assert results[0][1].password == 'Multi"Line#1'
+    # The open quote swallows the rest of the file and is reported at the line it started on
+    assert results[1][0] == 4
+    assert isinstance(results[1][1], str)
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_URL"), reason="COPY path needs PostgreSQL , set TEST_POSTGRES_URL")
+async def test_copy_users_into_postgres():
+    engine = create_async_engine(os.environ["TEST_POSTGRES_URL"])
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(User.__table__.delete())
+    now = datetime.now(timezone.utc)
+    rows = [
+        {"id": uuid.uuid4(), "username": f"copy{i}", "email": f"copy{i % 2}@example.com", "password_hash": "x",
+         "is_active": True, "created_at": now, "updated_at": now}
+        for i in range(3)
+    ]
+    try:
+        async with AsyncSession(engine) as db:
+            assert db.get_bind().dialect.name == "postgresql"
+            inserted = await provisioning.load_users(db, rows)
+            # copy0 and copy1 once each , the repeated copy0 email is skipped
+            assert inserted == {"copy0@example.com", "copy1@example.com"}
+            assert await provisioning.load_users(db, rows) == set()
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(User.__table__.delete())
+        await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_iter_lines_decodes_characters_split_across_chunks():
+    body = "username\nZoë\nlast".encode()
+    split = body.index("ë".encode()) + 1
+
+    async def chunks():
+        yield body[:split]
+        yield body[split:]
+
+    assert [line async for line in provisioning.iter_lines(chunks())] == ["username", "Zoë", "last"]
@@ -0,0 +1,91 @@
+import asyncio
+import pytest
+from fakeredis import aioredis
+from fastapi import HTTPException
+from app.core.rate_limiter import RateLimiter
+
+STRATEGIES = ["sliding_window", "token_bucket"]
+
+
+@pytest.fixture
+def redis():
+    return aioredis.FakeRedis(decode_responses=True)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", STRATEGIES)
+async def test_limiter_rejects_after_limit(redis, strategy):
+    limiter = RateLimiter("test", limit=3, window=60, detail="slow down", strategy=strategy)
+
+    remaining = [(await limiter.hit(redis, "user1")).remaining for _ in range(3)]
+    assert remaining == [2, 1, 0]
+
+    with pytest.raises(HTTPException) as exc:
+        await limiter.hit(redis, "user1")
+
+    assert exc.value.status_code == 429
+    assert exc.value.headers["X-RateLimit-Remaining"] == "0"
+    assert int(exc.value.headers["Retry-After"]) > 0
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", STRATEGIES)
+async def test_limiter_counts_cost(redis, strategy):
+    limiter = RateLimiter("test", limit=10, window=60, detail="slow down", strategy=strategy)
+
+    result = await limiter.hit(redis, "user1", cost=7)
+    assert result.remaining == 3
+
+    with pytest.raises(HTTPException):
+        await limiter.hit(redis, "user1", cost=4)
+
+    # A rejected batch consumes nothing
+    assert (await limiter.hit(redis, "user1", cost=3)).remaining == 0
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", STRATEGIES)
+async def test_limiter_is_atomic_under_concurrency(redis, strategy):
+    limiter = RateLimiter("test", limit=5, window=60, detail="slow down", strategy=strategy)
+
+    results = await asyncio.gather(
+        *(limiter.hit(redis, "user1") for _ in range(20)), return_exceptions=True
+    )
+
+    assert sum(not isinstance(result, HTTPException) for result in results) == 5
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", STRATEGIES)
+async def test_limiter_keys_are_per_identity(redis, strategy):
+    limiter = RateLimiter("test", limit=2, window=60, detail="slow down", strategy=strategy)
+
+    for _ in range(2):
+        await limiter.hit(redis, "user1")
+
+    assert (await limiter.hit(redis, "user2")).remaining == 1
+
+    with pytest.raises(HTTPException) as exc:
+        await limiter.hit(redis, "user1")
+
+    assert exc.value.status_code == 429
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", STRATEGIES)
+async def test_limiter_rejects_cost_above_quota_without_retry(redis, strategy):
+    limiter = RateLimiter("test", limit=10, window=60, detail="slow down", strategy=strategy)
+
+    with pytest.raises(HTTPException) as exc:
+        await limiter.hit(redis, "user1", cost=11)
+
+    assert exc.value.status_code == 413
+    assert "10 per 60 seconds" in exc.value.detail
+    assert "Retry-After" not in exc.value.headers
+    # Nothing was consumed
+    assert (await limiter.hit(redis, "user1", cost=10)).remaining == 0
+
+@pytest.mark.asyncio
+async def test_sliding_window_stores_one_member_per_request(redis):
+    limiter = RateLimiter("test", limit=100, window=60, detail="slow down", strategy="sliding_window")
+
+    await limiter.hit(redis, "user1", cost=40)
+    await limiter.hit(redis, "user1", cost=1)
+
+    assert await redis.zcard("rate:sliding_window:test:user1") == 2
+    assert (await limiter.hit(redis, "user1", cost=59)).remaining == 0
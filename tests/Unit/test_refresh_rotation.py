@@ -0,0 +1,62 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone ,timedelta
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.routes_auth import store_refresh_token
+from app.core.rate_limiter import RateLimitResult,refresh_rate_limiter
+from app.core.security import create_refresh_tokens,hash_refresh_token
+from app.db.models.refresh_token import RefreshToken
+from app.db.models.users import User
+from app.main import app
+
+
+@pytest.fixture(autouse=True)
+def no_refresh_limit():
+    app.dependency_overrides[refresh_rate_limiter] = lambda: RateLimitResult(limit=0, remaining=0)
+    yield
+    app.dependency_overrides.pop(refresh_rate_limiter, None)
+
+async def _user_with_token(engine, expires_in:timedelta = timedelta(days=7)):
+    user_id = uuid.uuid4()
+    token,_ = create_refresh_tokens(str(user_id))
+    async with AsyncSession(engine) as db:
+        db.add(User(id=user_id, username="rotation", email=f"{user_id}@example.com", password_hash="x"))
+        await db.commit()
+        await store_refresh_token(db, user_id, hash_refresh_token(token), datetime.now(timezone.utc) + expires_in)
+        await db.commit()
+    return user_id, token
+
+async def _stored_hash(engine, user_id):
+    async with AsyncSession(engine) as db:
+        return (await db.execute(select(RefreshToken.token).where(RefreshToken.user_id == user_id))).scalar_one_or_none()
+
+@pytest.mark.asyncio
+async def test_parallel_refreshes_with_same_token_rotate_once(engine, client):
+    user_id, token = await _user_with_token(engine)
+
+    responses = await asyncio.gather(*(
+        client.post("/auth/refresh", headers={"Cookie": f"refresh_token={token}"})
+        for _ in range(10)
+    ))
+
+    winners = [response for response in responses if response.status_code == 200]
+    assert len(winners) == 1
+    assert sorted(response.status_code for response in responses) == [200] + [401] * 9
+    assert await _stored_hash(engine, user_id) == hash_refresh_token(winners[0].cookies["refresh_token"])
+
+@pytest.mark.asyncio
+async def test_refresh_rejects_expired_token_row(engine, client):
+    _, token = await _user_with_token(engine, expires_in=timedelta(seconds=-1))
+
+    response = await client.post("/auth/refresh", headers={"Cookie": f"refresh_token={token}"})
+    assert response.status_code == 401
+
+@pytest.mark.asyncio
+async def test_logout_deletes_token_in_one_statement(engine, client):
+    user_id, token = await _user_with_token(engine)
+
+    response = await client.post("/auth/logout", headers={"Cookie": f"refresh_token={token}"})
+    assert response.status_code == 200
+    assert await _stored_hash(engine, user_id) is None
@@ -0,0 +1,59 @@
+import asyncio
+import logging
+import httpx
+import pytest
+from fastapi import FastAPI
+from app.core.request_timing import record_stage,timed_stage,server_timing,TimedJSONResponse
+from app.middlewares.response_logger import ResponseLoggerMiddleware
+
+
+def _timed_app() -> FastAPI:
+    app = FastAPI(default_response_class=TimedJSONResponse)
+    app.add_middleware(ResponseLoggerMiddleware)
+
+    @app.get("/work")
+    async def work():
+        with timed_stage("cache"):
+            await asyncio.sleep(0.01)
+        with timed_stage("cache"):
+            pass
+        return {"ok": True}
+
+    return app
+
+def _parse(header:str) -> dict:
+    entries = (entry.split(";dur=") for entry in header.split(", "))
+    return {name: float(duration) for name, duration in entries}
+
+@pytest.mark.asyncio
+async def test_stages_reach_server_timing_header_and_log(caplog):
+    transport = httpx.ASGITransport(app=_timed_app())
+    with caplog.at_level(logging.INFO, logger="response_logger"):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/work")
+
+    timings = _parse(response.headers["Server-Timing"])
+    assert list(timings) == ["cache", "serialize", "total"]
+    # Both cache blocks add up into one entry
+    assert timings["cache"] >= 10
+    assert timings["total"] >= timings["cache"] + timings["serialize"]
+
+    record = next(record for record in caplog.records if record.name == "response_logger")
+    assert record.status_code == 200
+    assert record.path == "/work"
+    assert record.cache_ms >= 10
+
+@pytest.mark.asyncio
+async def test_requests_do_not_share_stages():
+    transport = httpx.ASGITransport(app=_timed_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(*(client.get("/work") for _ in range(5)))
+
+    for response in responses:
+        assert _parse(response.headers["Server-Timing"])["cache"] < 1000
+
+def test_recording_outside_a_request_is_a_noop():
+    record_stage("auth", 1.0)
+    with timed_stage("inference"):
+        pass
+    assert server_timing({"auth": 0.0015}, 0.002) == "auth;dur=1.500, total;dur=2.000"
@@ -1,4 +1,9 @@
-from app.core.security import hash_password,verify_password , create_access_tokens , verify_access_token , create_refresh_tokens,verify_refresh_token
+import time
+from unittest.mock import patch
+from jose import jwt
+from app.core import security
+from app.core.config import settings
+from app.core.security import hash_password,verify_password , create_access_tokens , verify_access_token , create_refresh_tokens,verify_refresh_token,make_binary_cache_key,verify_access_token_cached
 
 def test_password_logic():
     password = "mypassword123"
@@ -30,4 +35,57 @@ def test_verify_refresh_token():
     validate_token = verify_refresh_token(token)
     assert user_id == validate_token["sub"]
 
+def test_binary_cache_key_is_fixed_width_and_version_scoped():
+    data = {"sepal_length": 5.1, "sepal_width": 3.5, "petal_length": 1.4, "petal_width": 0.2}
+    key_v1 = make_binary_cache_key(data, "1")
+    key_v2 = make_binary_cache_key(data, "2")
 
+    assert isinstance(key_v1, bytes)
+    assert key_v1 != key_v2
+    assert len(key_v1) == len(make_binary_cache_key({**data, "sepal_length": 7.123456}, "1"))
+
+def test_binary_cache_key_quantization():
+    data = {"sepal_length": 5.1, "sepal_width": 3.5, "petal_length": 1.4, "petal_width": 0.2}
+    jittered = {**data, "sepal_length": 5.10004}
+
+    assert make_binary_cache_key(data, "1") != make_binary_cache_key(jittered, "1")
+    assert make_binary_cache_key(data, "1", 0.01) == make_binary_cache_key(jittered, "1", 0.01)
+    assert make_binary_cache_key(data, "1", 0.01) != make_binary_cache_key({**data, "sepal_length": 5.2}, "1", 0.01)
+
+def test_verified_token_cache_skips_decode_on_hit():
+    token = create_access_tokens("cached-user")
+    assert verify_access_token_cached(token)["sub"] == "cached-user"
+
+    with patch.object(security._access_codec, "decode") as mock_decode:
+        assert verify_access_token_cached(token)["sub"] == "cached-user"
+    mock_decode.assert_not_called()
+
+def test_verified_token_cache_rejects_tampered_token():
+    token = create_access_tokens("cached-user")
+    assert verify_access_token_cached(token) is not None
+
+    header, payload, signature = token.split(".")
+    tampered = ".".join([header, payload, ("A" if signature[0] != "A" else "B") + signature[1:]])
+    assert verify_access_token_cached(tampered) is None
+
+def test_verified_token_cache_never_serves_expired_token():
+    now = int(time.time())
+    token = jwt.encode(
+        {"sub": "expiring-user", "token_type": "access", "iat": now, "exp": now + 60},
+        settings.JWT_ACCESS_SECRET_KEY,
+        settings.JWT_ALGORITHM
+    )
+    assert verify_access_token_cached(token)["sub"] == "expiring-user"
+
+    # Past exp the cached payload is ignored and full verification gets the final say
+    with patch("app.core.security.time.time", return_value=now + 61), \
+         patch("app.core.security.verify_access_token", return_value=None) as mock_verify:
+        assert verify_access_token_cached(token) is None
+    mock_verify.assert_called_once_with(token)
+
+def test_token_type_is_enforced():
+    access = create_access_tokens("user123")
+    refresh,_ = create_refresh_tokens("user123")
+
+    assert verify_refresh_token(access) is None
+    assert verify_access_token(refresh) is None
@@ -0,0 +1,47 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from app.core.metrics import SHADOW_COMPARISONS,SHADOW_DROPPED
+from app.services.shadow import ShadowMirror
+
+
+def _count(version, result):
+    return SHADOW_COMPARISONS.labels(version=version, result=result)._value.get()
+
+@pytest.mark.asyncio
+async def test_shadow_compares_off_the_response_path():
+    async def run_batch(rows, handle):
+        return [0 for _ in rows]
+
+    mirror = ShadowMirror(run_batch, max_queue=10)
+    handle = MagicMock(version="shadow-test")
+    agree, disagree = _count("shadow-test", "agree"), _count("shadow-test", "disagree")
+
+    mirror.submit(handle, [{}, {}, {}], [0, 1, 0])
+    await asyncio.wait_for(mirror._queue.join(), timeout=1)
+    await mirror.close()
+
+    assert _count("shadow-test", "agree") - agree == 2
+    assert _count("shadow-test", "disagree") - disagree == 1
+
+@pytest.mark.asyncio
+async def test_shadow_drops_when_queue_is_full():
+    release = asyncio.Event()
+
+    async def run_batch(rows, handle):
+        await release.wait()
+        return [0 for _ in rows]
+
+    mirror = ShadowMirror(run_batch, max_queue=1)
+    handle = MagicMock(version="shadow-full")
+    dropped = SHADOW_DROPPED._value.get()
+
+    # First item is picked up by the worker , the second fills the queue
+    mirror.submit(handle, [{}], [0])
+    await asyncio.sleep(0)
+    mirror.submit(handle, [{}], [0])
+    mirror.submit(handle, [{}], [0])
+
+    assert SHADOW_DROPPED._value.get() - dropped == 1
+    release.set()
+    await mirror.close()
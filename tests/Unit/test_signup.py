@@ -0,0 +1,29 @@
+import asyncio
+import pytest
+from sqlalchemy import func,select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models.users import User
+
+SIGNUP = {"username": "iris", "email": "iris@example.com", "password": "Signup#Pass1"}
+
+
+async def _user_count(engine):
+    async with AsyncSession(engine) as db:
+        return (await db.execute(select(func.count()).select_from(User))).scalar_one()
+
+@pytest.mark.asyncio
+async def test_signup_conflict_maps_to_400(engine, client):
+    first = await client.post("/auth/signup", json=SIGNUP)
+    second = await client.post("/auth/signup", json={**SIGNUP, "username": "other"})
+
+    assert first.status_code == 200
+    assert second.status_code == 400
+    assert second.json()["detail"] == "User Already Exists"
+    assert await _user_count(engine) == 1
+
+@pytest.mark.asyncio
+async def test_concurrent_signups_with_same_email_create_one_user(engine, client):
+    responses = await asyncio.gather(*(client.post("/auth/signup", json=SIGNUP) for _ in range(5)))
+
+    assert sorted(response.status_code for response in responses) == [200] + [400] * 4
+    assert await _user_count(engine) == 1
@@ -0,0 +1,69 @@
+import time
+import pytest
+from jose import jwt
+from app.core.token_codec import HS256Codec,TokenError
+
+SECRET = "codec-test-secret"
+
+
+@pytest.fixture
+def codec():
+    return HS256Codec(SECRET)
+
+def _claims(**overrides):
+    now = int(time.time())
+    return {"sub": "user-1", "token_type": "access", "iat": now, "exp": now + 900, **overrides}
+
+def test_encode_is_byte_identical_to_jose(codec):
+    claims = _claims()
+    assert codec.encode(claims) == jwt.encode(claims, SECRET, "HS256")
+
+def test_decodes_tokens_issued_by_jose(codec):
+    claims = _claims()
+    assert codec.decode(jwt.encode(claims, SECRET, "HS256")) == claims
+
+def test_jose_decodes_codec_tokens(codec):
+    claims = _claims()
+    assert jwt.decode(codec.encode(claims), SECRET, algorithms=["HS256"]) == claims
+
+def test_accepts_jose_tokens_with_extra_header_fields(codec):
+    token = jwt.encode(_claims(), SECRET, "HS256", headers={"kid": "1"})
+    assert codec.decode(token)["sub"] == "user-1"
+
+@pytest.mark.parametrize("token", [
+    "",
+    "not-a-token",
+    "a.b",
+    "a.b.c.d",
+    "é.é.é",
+])
+def test_rejects_malformed_tokens(codec, token):
+    with pytest.raises(TokenError):
+        codec.decode(token)
+
+def test_rejects_tampered_payload_and_wrong_secret(codec):
+    token = codec.encode(_claims())
+    header, _, signature = token.split(".")
+    forged = HS256Codec(SECRET).encode(_claims(sub="admin")).split(".")[1]
+
+    with pytest.raises(TokenError):
+        codec.decode(".".join([header, forged, signature]))
+    with pytest.raises(TokenError):
+        HS256Codec("other-secret").decode(token)
+
+def test_rejects_other_algorithms(codec):
+    with pytest.raises(TokenError):
+        codec.decode(jwt.encode(_claims(), SECRET, "HS384"))
+    with pytest.raises(ValueError):
+        HS256Codec(SECRET, "RS256")
+
+def test_enforces_time_claims_like_jose(codec):
+    now = int(time.time())
+    with pytest.raises(TokenError):
+        codec.decode(codec.encode(_claims(exp=now - 1)))
+    with pytest.raises(TokenError):
+        codec.decode(codec.encode(_claims(nbf=now + 60)))
+    with pytest.raises(TokenError):
+        codec.decode(codec.encode(_claims(exp="tomorrow")))
+    # jose accepts a token in its last second
+    assert codec.decode(codec.encode(_claims(exp=now)), now=now)["sub"] == "user-1"
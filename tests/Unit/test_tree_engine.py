@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.datasets import load_iris
+from sklearn.ensemble import RandomForestClassifier
+from app.core.tree_engine import FlatForest
+
+FEATURES = ["sepal_length", "sepal_width", "petal_length", "petal_width"]
+
+
+@pytest.fixture(scope="module")
+def iris():
+    data = load_iris()
+    return pd.DataFrame(data.data, columns=FEATURES), data.target
+
+@pytest.mark.parametrize("params", [
+    {"n_estimators": 100, "max_depth": 3},
+    {"n_estimators": 300, "max_depth": None, "min_samples_leaf": 2},
+    {"n_estimators": 900, "max_depth": 19, "min_samples_split": 5},
+])
+def test_flat_forest_matches_sklearn_on_full_iris(iris, params):
+    X, y = iris
+    forest = RandomForestClassifier(**params, random_state=42, n_jobs=1).fit(X, y)
+    engine = FlatForest.from_sklearn(forest)
+
+    assert np.array_equal(engine.predict(X), forest.predict(X))
+    assert np.array_equal(engine.predict_proba(X), forest.predict_proba(X))
+
+def test_flat_forest_matches_sklearn_off_distribution(iris):
+    X, y = iris
+    forest = RandomForestClassifier(n_estimators=200, random_state=0, n_jobs=1).fit(X, y)
+    engine = FlatForest.from_sklearn(forest)
+
+    rng = np.random.default_rng(0)
+    grid = pd.DataFrame(rng.uniform(0, 8, size=(5000, 4)), columns=FEATURES)
+
+    assert np.array_equal(engine.predict(grid), forest.predict(grid))
+
+def test_flat_forest_accepts_float_matrix(iris):
+    X, y = iris
+    forest = RandomForestClassifier(n_estimators=50, random_state=1, n_jobs=1).fit(X, y)
+    engine = FlatForest.from_sklearn(forest)
+
+    matrix = X.to_numpy(dtype=np.float32)
+    assert np.array_equal(engine.predict(matrix), forest.predict(X))
+
+def test_memory_mapped_forest_matches_in_memory(tmp_path):
+    X, y = load_iris(return_X_y=True)
+    forest = RandomForestClassifier(n_estimators=50, random_state=0).fit(X, y)
+    flat = FlatForest.from_sklearn(forest)
+
+    flat.save(str(tmp_path / "forest"))
+    mapped = FlatForest.open(str(tmp_path / "forest"))
+
+    assert not mapped.threshold.flags.writeable
+    np.testing.assert_array_equal(mapped.predict(X), forest.predict(X))
+    np.testing.assert_array_equal(mapped.predict_proba(X), flat.predict_proba(X))
@@ -1,11 +1,36 @@
 # tests/conftest.py
-import pytest
-from fastapi.testclient import TestClient
+import httpx
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession,create_async_engine
 from app.main import app
 from app.core.config import settings
+from app.core.database import Base
+from app.core.dependecies import get_db
 
 
-@pytest.fixture(scope="session")
-def client():
-    return TestClient(app)
+@pytest_asyncio.fixture
+async def engine(tmp_path, monkeypatch):
+    # File database , every session gets its own connection like in production
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
 
+@pytest_asyncio.fixture
+async def db(engine):
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+
+@pytest_asyncio.fixture
+async def client(engine):
+    # The app over ASGI with get_db bound to the test database
+    async def get_test_db():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = get_test_db
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()